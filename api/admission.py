@@ -0,0 +1,146 @@
+"""Admission control: per-route concurrency limits, cost weights and load shedding.
+
+Routes are assigned to an `AdmissionPool` with a cost weight. A pool admits
+requests while the summed cost of those in progress fits its capacity; beyond
+that, requests wait in a bounded FIFO queue for at most `max_wait_s`. A full
+queue or an expired deadline is answered immediately with 503 and
+`Retry-After`, so a spike in expensive calls cannot push up latency for cheap
+ones in other pools. Routes not assigned to a pool (health, metrics) are never
+queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class Shed(Exception):
+    pass
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        value = float(os.environ.get(name, ""))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+class AdmissionPool:
+    def __init__(self, name: str, capacity: int, queue_size: int, max_wait_s: float, retry_after_s: int) -> None:
+        # WYTG_ADMISSION_<NAME>_{CAPACITY,QUEUE,WAIT_S} override the defaults.
+        prefix = f"WYTG_ADMISSION_{name.upper()}"
+        self.name = name
+        self.capacity = int(_env_number(f"{prefix}_CAPACITY", capacity))
+        self.queue_size = int(_env_number(f"{prefix}_QUEUE", queue_size))
+        self.max_wait_s = _env_number(f"{prefix}_WAIT_S", max_wait_s)
+        self.retry_after_s = retry_after_s
+        self.in_use = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.max_queue_depth = 0
+
+    async def acquire(self, cost: int) -> None:
+        cost = min(cost, self.capacity)
+        if not self._waiters and self.in_use + cost <= self.capacity:
+            self.in_use += cost
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.shed_queue_full += 1
+            raise Shed(f"{self.name} queue is full")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (cost, waiter)
+        self._waiters.append(entry)
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            async with asyncio.timeout(self.max_wait_s):
+                await waiter
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self.admitted += 1  # Granted on the deadline; the slot is ours.
+                return
+            # The timeout cancels `waiter` before this handler runs, and a
+            # release() in between drops cancelled entries from the queue.
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+            self.shed_deadline += 1
+            raise Shed(f"{self.name} queue wait exceeded {self.max_wait_s:g}s") from None
+        except asyncio.CancelledError:
+            # Client went away while queued: hand back a slot granted meanwhile.
+            if waiter.done() and not waiter.cancelled():
+                self.release(cost)
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            raise
+        self.admitted += 1
+
+    def release(self, cost: int) -> None:
+        self.in_use -= min(cost, self.capacity)
+        while self._waiters:
+            next_cost, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + next_cost > self.capacity:
+                break
+            self._waiters.popleft()
+            self.in_use += next_cost
+            waiter.set_result(None)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "queue_size": self.queue_size,
+            "max_wait_s": self.max_wait_s,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_deadline": self.shed_deadline,
+        }
+
+
+@dataclass(frozen=True)
+class RouteCost:
+    pool: AdmissionPool
+    cost: int = 1
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, routes: dict[str, RouteCost]) -> None:
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await route.pool.acquire(route.cost)
+        except Shed as exc:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": str(exc)},
+                headers={"Retry-After": str(route.pool.retry_after_s)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route.pool.release(route.cost)
@@ -1,81 +1,129 @@
 from __future__ import annotations
 
-import csv
+import base64
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
 from functools import lru_cache
-from pathlib import Path
-from typing import TypeVar
+from typing import Iterator, Sequence, TypeVar
 
+from api.search import TokenPrefixIndex
+from api.snapshot import load_table
 
-ROOT = Path(__file__).resolve().parents[1]
-PROCESSED = ROOT / "data" / "processed"
 
 T = TypeVar("T")
 
 
-@lru_cache(maxsize=16)
-def _read_csv_cached(path: str) -> tuple[dict[str, str], ...]:
-    p = Path(path)
-    with p.open("r", encoding="utf-8", newline="") as f:
-        return tuple(csv.DictReader(f))
+class PageView(Sequence[T]):
+    """Read-only window onto a sequence; paging shares the cached items instead of copying them."""
 
+    __slots__ = ("_items", "_range")
 
-def _read_csv(path: Path) -> list[dict[str, str]]:
-    # Cached source reads to reduce repeated disk I/O across API requests.
-    return [dict(r) for r in _read_csv_cached(str(path.resolve()))]
+    def __init__(self, items: Sequence[T], window: range) -> None:
+        self._items = items
+        self._range = window
 
+    def __len__(self) -> int:
+        return len(self._range)
 
-def paginate_items(items: list[T], page: int, page_size: int) -> tuple[list[T], int]:
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return PageView(self._items, self._range[i])
+        return self._items[self._range[i]]
+
+    def __iter__(self) -> Iterator[T]:
+        items = self._items
+        for i in self._range:
+            yield items[i]
+
+
+def paginate_items(items: Sequence[T], page: int, page_size: int) -> tuple[PageView[T], int]:
     total = len(items)
     start = (page - 1) * page_size
-    end = start + page_size
-    return items[start:end], total
+    return PageView(items, range(total)[start : start + page_size]), total
 
 
 def load_total_uk_revenue_m_gbp(revenue_year: str) -> float:
-    rows = _read_csv(PROCESSED / "ons_regional_revenue_fye2023.csv")
-    matches = [
-        r
-        for r in rows
-        if r["year"] == revenue_year
-        and r["geography_code"] == "K02000001"
-        and r["metric"] == "total_current_receipts_excl_north_sea_oil_gas"
-    ]
-    if not matches:
-        raise ValueError(f"No UK revenue row found for year '{revenue_year}'")
-    return float(matches[0]["amount_m_gbp"])
-
-
-def _build_all_service_contributions(
-    user_total_tax_gbp: float,
-    revenue_year: str,
-    spending_year: str,
-) -> tuple[float, float, list[dict[str, float | str]]]:
-    total_uk_revenue_m_gbp = load_total_uk_revenue_m_gbp(revenue_year)
-    user_share = (user_total_tax_gbp / 1_000_000.0) / total_uk_revenue_m_gbp
+    table = load_table("ons_regional_revenue_fye2023.csv")
+    years = table.strings("year")
+    codes = table.strings("geography_code")
+    metrics = table.strings("metric")
+    amounts = table.floats("amount_m_gbp")
+    for i in range(len(table)):
+        if (
+            years[i] == revenue_year
+            and codes[i] == "K02000001"
+            and metrics[i] == "total_current_receipts_excl_north_sea_oil_gas"
+        ):
+            return float(amounts[i])
+    raise ValueError(f"No UK revenue row found for year '{revenue_year}'")
+
+
+@dataclass(frozen=True)
+class ServiceVector:
+    """Sub-function spending for one (revenue year, spending year) pair, in file order."""
+
+    total_uk_revenue_m_gbp: float
+    labels: tuple[str, ...]
+    spending_m_gbp: tuple[float, ...]
+    # Indices by spending, largest first. A household's contribution is its
+    # revenue share times spending, so this ranking is the same for everyone.
+    ranked: tuple[int, ...]
+    # Sort key (-spending, index) of each ranked position, for keyset cursors.
+    rank_keys: tuple[tuple[float, int], ...]
+    # Token prefix index over the labels, in ranked order.
+    label_index: TokenPrefixIndex
+
+
+@lru_cache(maxsize=8)
+def service_vector(revenue_year: str, spending_year: str) -> ServiceVector:
+    table = load_table("functional_spending_2024_25.csv")
+    years = table.strings("year")
+    row_types = table.strings("row_type")
+    labels = table.strings("function_label")
+    amounts = table.floats("amount_m_gbp")
+    keep = [i for i in range(len(table)) if years[i] == spending_year and row_types[i] == "sub_function"]
+    spending = tuple(float(amounts[i]) for i in keep)
+    names = tuple(labels[i] for i in keep)
+    ranked = tuple(sorted(range(len(spending)), key=lambda j: -spending[j]))
+    return ServiceVector(
+        total_uk_revenue_m_gbp=load_total_uk_revenue_m_gbp(revenue_year),
+        labels=names,
+        spending_m_gbp=spending,
+        ranked=ranked,
+        rank_keys=tuple((-spending[j], j) for j in ranked),
+        label_index=TokenPrefixIndex([names[j] for j in ranked]),
+    )
+
+
+class InvalidCursor(ValueError):
+    pass
+
 
-    func_rows = _read_csv(PROCESSED / "functional_spending_2024_25.csv")
-    selected = [
-        r
-        for r in func_rows
-        if r["year"] == spending_year and r["row_type"] == "sub_function"
-    ]
-
-    services: list[dict[str, float | str]] = []
-    for r in selected:
-        spending_m = float(r["amount_m_gbp"])
-        contribution_gbp = spending_m * user_share * 1_000_000.0
-        share_percent = (contribution_gbp / user_total_tax_gbp * 100.0) if user_total_tax_gbp else 0.0
-        services.append(
-            {
-                "function_label": r["function_label"],
-                "spending_amount_m_gbp": round(spending_m, 2),
-                "user_contribution_gbp": round(contribution_gbp, 2),
-                "share_of_user_tax_percent": round(share_percent, 4),
-            }
-        )
-
-    services.sort(key=lambda x: float(x["user_contribution_gbp"]), reverse=True)
-    return round(total_uk_revenue_m_gbp, 2), round(user_share, 10), services
+def encode_cursor(spending_m_gbp: float, index: int) -> str:
+    # Keyset cursor: the sort key of the last item returned, so pages stay
+    # consistent across processes and data rebuilds.
+    raw = f"{spending_m_gbp!r}:{index}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        spending, index = raw.split(":")
+        return float(spending), int(index)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(f"Invalid cursor '{cursor}'") from exc
+
+
+def _service_item(label: str, spending_m: float, user_share: float, user_total_tax_gbp: float) -> dict[str, float | str]:
+    contribution_gbp = spending_m * user_share * 1_000_000.0
+    share_percent = (contribution_gbp / user_total_tax_gbp * 100.0) if user_total_tax_gbp else 0.0
+    return {
+        "function_label": label,
+        "spending_amount_m_gbp": round(spending_m, 2),
+        "user_contribution_gbp": round(contribution_gbp, 2),
+        "share_of_user_tax_percent": round(share_percent, 4),
+    }
 
 
 def build_service_contributions_paginated(
@@ -84,23 +132,50 @@ def build_service_contributions_paginated(
     spending_year: str,
     page: int,
     page_size: int,
-) -> dict[str, float | str | int | list[dict[str, float | str]]]:
-    total_uk_revenue_m_gbp, user_share, services = _build_all_service_contributions(
-        user_total_tax_gbp=user_total_tax_gbp,
-        revenue_year=revenue_year,
-        spending_year=spending_year,
-    )
-    page_items, total_items = paginate_items(services, page=page, page_size=page_size)
+    cursor: str | None = None,
+    search: str | None = None,
+) -> dict[str, float | str | int | None | list[dict[str, float | str]]]:
+    """One page of services, largest contribution first.
+
+    Contributions are proportional to spending, so the order is the service
+    vector's precomputed ranking and only the returned page is built. `search`
+    restricts it to labels matching every query token by prefix; `cursor`
+    (a previous response's `next_cursor`) continues after the last item seen
+    instead of using `page`.
+    """
+    vector = service_vector(revenue_year, spending_year)
+    total_uk_revenue_m_gbp = vector.total_uk_revenue_m_gbp
+    user_share = (user_total_tax_gbp / 1_000_000.0) / total_uk_revenue_m_gbp
+
+    # Rank positions in display order, filtered by the label index.
+    positions: Sequence[int] = vector.label_index.match(search) if search else range(len(vector.ranked))
+    if cursor is not None:
+        spending, index = decode_cursor(cursor)
+        after = bisect_right(vector.rank_keys, (-spending, index))
+        start = bisect_left(positions, after)
+    else:
+        start = (page - 1) * page_size
+    window = positions[start : start + page_size]
+    services = []
+    for position in window:
+        j = vector.ranked[position]
+        services.append(_service_item(vector.labels[j], vector.spending_m_gbp[j], user_share, user_total_tax_gbp))
+
+    next_cursor = None
+    if window and start + page_size < len(positions):
+        last = vector.ranked[window[-1]]
+        next_cursor = encode_cursor(vector.spending_m_gbp[last], last)
     return {
-        "total_uk_tax_revenue_m_gbp": total_uk_revenue_m_gbp,
+        "total_uk_tax_revenue_m_gbp": round(total_uk_revenue_m_gbp, 2),
         "user_total_tax_gbp": round(user_total_tax_gbp, 2),
-        "user_share_of_total_revenue": user_share,
+        "user_share_of_total_revenue": round(user_share, 10),
         "spending_year": spending_year,
         "revenue_year": revenue_year,
         "page": page,
         "page_size": page_size,
-        "total_items": total_items,
-        "services": page_items,
+        "total_items": len(positions),
+        "services": services,
+        "next_cursor": next_cursor,
     }
 
 
@@ -125,3 +200,29 @@ def build_service_contributions(
         "revenue_year": raw["revenue_year"],
         "services": raw["services"],
     }
+
+
+def contribution_matrix(
+    household_totals_gbp: Sequence[float],
+    revenue_year: str,
+    spending_year: str,
+    top_k: int | None = None,
+) -> tuple[ServiceVector, tuple[int, ...], Iterator[list[float]]]:
+    """Households x services contributions as one outer product.
+
+    Returns the service vector, the column indices (ranked by spending, cut to
+    `top_k`), and a lazy iterator of rounded contribution rows, one per
+    household, so large cohorts can be streamed.
+    """
+    vector = service_vector(revenue_year, spending_year)
+    columns = vector.ranked[:top_k] if top_k else vector.ranked
+    spending = [vector.spending_m_gbp[j] for j in columns]
+    revenue = vector.total_uk_revenue_m_gbp
+
+    def rows() -> Iterator[list[float]]:
+        for total in household_totals_gbp:
+            # Same arithmetic as the single-household path, so figures match.
+            share = (total / 1_000_000.0) / revenue
+            yield [round(s * share * 1_000_000.0, 2) for s in spending]
+
+    return vector, columns, rows()
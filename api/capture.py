@@ -0,0 +1,188 @@
+"""Opt-in sampled capture of anonymized requests, for replay in benchmarks.
+
+With `WYTG_CAPTURE_PATH` set, a `WYTG_CAPTURE_RATE` fraction of requests to
+the listed routes are appended to that file as NDJSON: arrival time, route,
+status, end-to-end duration and the request body. Bodies are anonymized
+before they are written:
+
+  postcodes     full postcodes keep their sector and get a placeholder
+                unit ("SW1A 1AA" -> "SW1A 1ZZ"), so a replay still sends a
+                valid postcode through the lookup, cache and sector fallback,
+                but it no longer names an address; partial postcodes are cut
+                to at most their sector
+  `*_gbp`       amounts rounded to the nearest £100 (positive amounts never
+                round down to 0, so the body stays valid)
+
+Nothing else in the request (headers, client address) is kept. Capture stops
+after `WYTG_CAPTURE_MAX` records, and bodies over `MAX_BODY_BYTES` are not
+captured. Requests that are not sampled pass straight through.
+
+`scripts/replay_capture.py` replays a capture against the app in process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import time
+from typing import IO
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.postcode_sectors import normalize_prefix
+from api.postcodes import normalize_postcode
+
+
+CAPTURE_PATH = os.environ.get("WYTG_CAPTURE_PATH", "")
+CAPTURE_RATE = float(os.environ.get("WYTG_CAPTURE_RATE", "0.01"))
+CAPTURE_MAX = int(os.environ.get("WYTG_CAPTURE_MAX", "100000"))
+MAX_BODY_BYTES = 1 << 20
+# Shared by every postcode in a sector. Units like this are not issued, so a
+# real postcodes.io answers 404 and the API falls back to the sector's region.
+PLACEHOLDER_UNIT = "ZZ"
+AMOUNT_STEP_GBP = 100.0
+
+_POSTCODE_KEYS = frozenset({"postcode", "postcodes", "prefix"})
+
+
+def anonymize_postcode(text: str) -> str:
+    """A full postcode's sector plus the placeholder unit; partial ones cut to at most their sector."""
+    full = normalize_postcode(text)
+    if full is not None:
+        return full[:-2] + PLACEHOLDER_UNIT
+    cleaned = normalize_prefix(text)
+    if " " in cleaned:
+        outward, inward = cleaned.split(" ", 1)
+        return f"{outward} {inward[:1]}"
+    # Without a space the outward code cannot be told apart from the inward
+    # part, so keep no more than the longest outward code.
+    return cleaned[:4]
+
+
+def _round_amount(value: float) -> float:
+    if value <= 0:
+        return value
+    return max(AMOUNT_STEP_GBP, round(value / AMOUNT_STEP_GBP) * AMOUNT_STEP_GBP)
+
+
+def _anonymize_value(key: str, value: object) -> object:
+    if key in _POSTCODE_KEYS:
+        if isinstance(value, str):
+            return anonymize_postcode(value)
+        if isinstance(value, list):
+            return [anonymize_postcode(v) if isinstance(v, str) else v for v in value]
+    if key.endswith("_gbp"):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return _round_amount(float(value))
+        if isinstance(value, list):
+            return [_round_amount(float(v)) if isinstance(v, (int, float)) else v for v in value]
+    return anonymize(value)
+
+
+def anonymize(body: object) -> object:
+    """A copy of a decoded JSON body with postcodes and amounts coarsened."""
+    if isinstance(body, dict):
+        return {key: _anonymize_value(key, value) for key, value in body.items()}
+    if isinstance(body, list):
+        return [anonymize(item) for item in body]
+    return body
+
+
+class RequestCapture:
+    def __init__(self, path: str = CAPTURE_PATH, rate: float = CAPTURE_RATE, max_records: int = CAPTURE_MAX) -> None:
+        self.path = path
+        self.rate = rate if path else 0.0
+        self.max_records = max_records
+        self.sampled = 0
+        self.captured = 0
+        self.skipped = 0
+        self._file: IO[str] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.captured < self.max_records
+
+    def sample(self) -> bool:
+        return self.enabled and random.random() < self.rate
+
+    def write(self, arrived: float, path: str, status: int, duration_s: float, body: bytes) -> None:
+        if len(body) > MAX_BODY_BYTES or not self.enabled:
+            self.skipped += 1
+            return
+        try:
+            decoded = json.loads(body) if body else None
+        except ValueError:
+            # Undecodable bodies cannot be anonymized field by field.
+            self.skipped += 1
+            return
+        record = {
+            "ts": round(arrived, 3),
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration_s * 1000, 3),
+            "body": anonymize(decoded),
+        }
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        # Records are a few hundred bytes; a line-buffered append on the event
+        # loop is cheaper than handing each one to a thread.
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.captured += 1
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "enabled": self.rate > 0,
+            "rate": self.rate,
+            "sampled": self.sampled,
+            "captured": self.captured,
+            "skipped": self.skipped,
+            "max_records": self.max_records,
+        }
+
+
+class CaptureMiddleware:
+    def __init__(self, app: ASGIApp, capture: RequestCapture, routes: frozenset[str]) -> None:
+        self.app = app
+        self.capture = capture
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.routes or not self.capture.sample():
+            await self.app(scope, receive, send)
+            return
+        self.capture.sampled += 1
+        arrived = time.time()
+        started = time.perf_counter()
+        # Read the whole body up front (the app would anyway), so it is
+        # captured even when the request is shed before the handler reads it.
+        chunks: list[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return  # Client disconnected mid-body.
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        delivered = False
+
+        async def replay_receive() -> Message:
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_status)
+        finally:
+            self.capture.write(arrived, scope["path"], status, time.perf_counter() - started, body)
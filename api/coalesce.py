@@ -0,0 +1,45 @@
+"""Single-flight coalescing of identical in-flight work.
+
+Concurrent callers that ask for the same key while a computation is running
+wait on that one computation and share its result (or its exception). Nothing
+is cached: once the computation finishes the key is forgotten, so the next
+caller starts a fresh one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.leaders = 0
+        self.joined = 0
+        self._in_flight: dict[Hashable, asyncio.Task[T]] = {}
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _t: self._in_flight.pop(key, None))
+        else:
+            self.joined += 1
+        # Shielded so one caller disconnecting does not cancel the shared work.
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, float]:
+        calls = self.leaders + self.joined
+        return {
+            "calls": calls,
+            "computed": self.leaders,
+            "coalesced": self.joined,
+            "in_flight": len(self._in_flight),
+            "coalescing_ratio": round(self.joined / calls, 6) if calls else 0.0,
+        }
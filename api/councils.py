@@ -0,0 +1,174 @@
+"""Councils (local authority districts): names resolved offline, and their council tax.
+
+The index is built once from `council_to_region_2024.csv` in the snapshot.
+Names are normalized (case, punctuation, `&`, and filler words such as
+"Council", "Borough" or "City of" are dropped), so "Bristol City Council",
+"City of Bristol" and "Bristol, City of" are the same key. Anything that is
+not an exact key goes through a trigram index, which tolerates typos and
+partial names.
+
+`council_tax_table` holds each council's charge for every band as one flat
+council x band matrix, so an estimate reads its figure by index.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+from api.memo import memo_node
+from api.search import TrigramIndex
+from api.snapshot import PROCESSED, load_table
+from api.tax_model import COUNCIL_TAX_BAND_MULTIPLIER, COUNCIL_TAX_BANDS
+
+
+LOOKUP_TABLE = "council_to_region_2024.csv"
+BAND_D_TABLE = "council_tax_band_d_2024_25.csv"
+# Fuzzy matches below this similarity are not trusted to pick a council
+# ("Lee" is not Leeds), nor are ones this close to the runner-up.
+RESOLVE_MIN_SCORE = 0.65
+RESOLVE_MARGIN = 0.1
+
+_FILLER = frozenset({"and", "borough", "city", "council", "county", "district", "metropolitan", "of", "royal", "the"})
+_LAD_CODE = re.compile(r"^[EWSN]\d{8}$")
+
+
+@dataclass(frozen=True, slots=True)
+class Council:
+    lad_code: str
+    lad_name: str
+    region_code: str
+    region_name: str
+
+
+def _words(name: str) -> list[str]:
+    text = name.lower().replace("&", " and ").replace("'", "").replace("\u2019", "")
+    return re.sub(r"[^a-z0-9]+", " ", text).split()
+
+
+def normalize_council_name(name: str) -> str:
+    words = _words(name)
+    kept = [w for w in words if w not in _FILLER]
+    # A name made only of filler words is kept as typed rather than emptied.
+    return " ".join(kept or words)
+
+
+class CouncilIndex:
+    __slots__ = ("councils", "_by_code", "_by_key", "_padded_keys", "_regions", "_fuzzy")
+
+    def __init__(self, councils: tuple[Council, ...]) -> None:
+        self.councils = councils
+        self._by_code = {c.lad_code: c for c in councils}
+        keys = [normalize_council_name(c.lad_name) for c in councils]
+        self._by_key = dict(zip(keys, councils))
+        self._padded_keys = tuple(f" {k} " for k in keys)
+        self._regions = frozenset(normalize_council_name(c.region_name) for c in councils)
+        self._fuzzy = TrigramIndex(keys)
+
+    def _holders(self, key: str) -> int:
+        # Councils whose name contains `key` as whole words ("suffolk" is in
+        # Mid, East and West Suffolk).
+        padded = f" {key} "
+        return sum(padded in k for k in self._padded_keys)
+
+    def search(self, query: str, limit: int = 5) -> list[tuple[Council, float]]:
+        """Best matches for a council name or LAD code, with scores in (0, 1]."""
+        code = query.strip().upper()
+        if _LAD_CODE.match(code):
+            found = self._by_code.get(code)
+            return [(found, 1.0)] if found else []
+        key = normalize_council_name(query)
+        if not key:
+            return []
+        exact = self._by_key.get(key)
+        out = [(exact, 1.0)] if exact else []
+        for position, score in self._fuzzy.search(key, limit + 1):
+            council = self.councils[position]
+            if council is not exact:
+                out.append((council, score))
+        return out[:limit]
+
+    def resolve(self, name: str) -> Council | None:
+        """The council `name` refers to, or None when the name is ambiguous.
+
+        A name that is only a place (no "Council", "City of" and so on) must be
+        unique to one council and not a region: "Bristol" is Bristol, City of,
+        but "London" is not the City of London and "Norfolk" is not North
+        Norfolk.
+        """
+        matches = self.search(name, limit=2)
+        if not matches:
+            return None
+        best, score = matches[0]
+        if score == 1.0:
+            if _words(name) == _words(best.lad_name) or _LAD_CODE.match(name.strip().upper()):
+                return best
+            key = normalize_council_name(name)
+            return best if key not in self._regions and self._holders(key) == 1 else None
+        if score < RESOLVE_MIN_SCORE or self._holders(normalize_council_name(name)) > 1:
+            return None
+        if len(matches) > 1 and score - matches[1][1] < RESOLVE_MARGIN:
+            return None
+        return best
+
+
+@lru_cache(maxsize=1)
+def council_index() -> CouncilIndex:
+    table = load_table(LOOKUP_TABLE)
+    return CouncilIndex(
+        tuple(
+            Council(lad_code=code, lad_name=name, region_code=region_code, region_name=region_name)
+            for code, name, region_code, region_name in zip(
+                table.strings("lad_code"),
+                table.strings("lad_name"),
+                table.strings("region_code"),
+                table.strings("region_name"),
+            )
+        )
+    )
+
+
+@memo_node("council_name", maxsize=1024)
+def resolve_council_name(name: str) -> Council | None:
+    # Estimates resolve the same few names over and over.
+    return council_index().resolve(name)
+
+
+@dataclass(frozen=True, slots=True)
+class CouncilTaxTable:
+    year: str
+    # lad_code -> row of `rates`.
+    rows: Mapping[str, int]
+    # Annual charge in £, row-major, one column per band in `COUNCIL_TAX_BANDS`.
+    rates: array
+
+    def row(self, lad_code: str) -> memoryview | None:
+        """The council's charge for each band, or None if it is not in the table."""
+        i = self.rows.get(lad_code)
+        if i is None:
+            return None
+        width = len(COUNCIL_TAX_BANDS)
+        return memoryview(self.rates)[i * width : (i + 1) * width]
+
+
+@lru_cache(maxsize=1)
+def council_tax_table() -> CouncilTaxTable | None:
+    # The Band D table is a manual download; without it estimates use
+    # regional averages.
+    if not (PROCESSED / BAND_D_TABLE).exists():
+        return None
+    table = load_table(BAND_D_TABLE)
+    codes = table.strings("lad_code")
+    band_d = table.floats("band_d_gbp")
+    multipliers = [COUNCIL_TAX_BAND_MULTIPLIER[b] for b in COUNCIL_TAX_BANDS]
+    rates = array("d", (round(float(band_d[i]) * m, 2) for i in range(len(codes)) for m in multipliers))
+    years = table.strings("year")
+    return CouncilTaxTable(
+        year=years[0] if len(years) else "",
+        rows=MappingProxyType({code: i for i, code in enumerate(codes)}),
+        rates=rates,
+    )
@@ -0,0 +1,64 @@
+"""Size-bounded executor for the CPU-heavy part of the request path.
+
+Cheap endpoints run inline on the event loop. Batch exports, policy simulation
+and Parquet scans are submitted here instead, so they neither occupy the anyio
+threadpool that Starlette shares between routes nor queue without limit: once
+`workers + queue_size` jobs are in flight, further submissions fail fast with
+`ExecutorSaturated` (served as 503 with `Retry-After`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(RuntimeError):
+    pass
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, queue_size: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.limit = workers + queue_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., T], *args: object) -> T:
+        with self._lock:
+            if self._in_flight >= self.limit:
+                raise ExecutorSaturated(f"{self.name} executor is full ({self.limit} jobs in flight)")
+            self._in_flight += 1
+        # Released when the job finishes, not when the caller stops waiting,
+        # so a disconnected client cannot free a slot its job still holds.
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name, "")
+    return int(value) if value.isdigit() and int(value) > 0 else default
+
+
+CPU_EXECUTOR = BoundedExecutor(
+    "wytg-cpu",
+    workers=_env_int("WYTG_CPU_WORKERS", min(4, os.cpu_count() or 1)),
+    queue_size=_env_int("WYTG_CPU_QUEUE", 32),
+)
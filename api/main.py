@@ -1,17 +1,58 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 import io
-from dataclasses import replace
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
+from functools import partial
+from typing import AsyncIterator, Iterator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
-from api.attribution import build_service_contributions, build_service_contributions_paginated, paginate_items
+from api.admission import AdmissionMiddleware, AdmissionPool, RouteCost
+from api.attribution import (
+    InvalidCursor,
+    build_service_contributions,
+    build_service_contributions_paginated,
+    contribution_matrix,
+    paginate_items,
+    service_vector,
+)
+from api.capture import CaptureMiddleware, RequestCapture
+from api.coalesce import SingleFlight
+from api.councils import Council, council_index, council_tax_table, resolve_council_name
+from api.executors import CPU_EXECUTOR, ExecutorSaturated
+from api.marginal import marginal_rates, model_breakpoints
+from api.memo import MemoNode, memo_node, node_stats
 from api.models import (
+    BatchAttributionRequest,
+    BatchAttributionResponse,
+    CouncilMatch,
+    CouncilSearchRequest,
+    CouncilSearchResponse,
     JournalistExportRequest,
     JournalistExportResponse,
+    MarginalComponent,
+    OfficialBorrowingRelease,
+    OfficialBorrowingRequest,
+    OfficialBorrowingResponse,
+    PolicyOverrides,
+    PostcodeCouncil,
+    PostcodeCouncilCandidate,
+    PostcodeRegionCandidate,
+    PostcodeResolveRequest,
+    PostcodeResolveResponse,
+    PostcodeTypeaheadRequest,
+    PostcodeTypeaheadResponse,
     RegionalBalance,
     RegionalFlow,
     RegionalFlowsRequest,
@@ -19,12 +60,38 @@ from api.models import (
     ServiceContribution,
     ServicesImpactRequest,
     ServicesImpactResponse,
+    SessionDeltaRequest,
+    SessionDeltaResponse,
+    SessionOpenRequest,
+    SessionOpenResponse,
     SpendingBreakdownRequest,
     SpendingBreakdownResponse,
+    SpendingQueryRequest,
+    SpendingQueryResponse,
+    SpendingTreeNode,
+    SpendingTreeRequest,
+    SpendingTreeResponse,
+    TaxCompareRequest,
+    TaxCompareResponse,
     TaxEstimateRequest,
     TaxEstimateResponse,
+    TaxMarginalResponse,
+    TaxScenario,
+    TaxScenarioResult,
+)
+from api.postcode_sectors import council_from_sector, normalize_prefix, postcode_sector_trie
+from api.postcodes import lookup_council_from_postcode, normalize_postcode, resolve_postcodes
+from api.profiling import ProfilingMiddleware, SlowRequestProfiler, tag_request
+from api.regional import (
+    find_official_borrowing,
+    load_official_borrowing_history,
+    load_official_uk_borrowing,
+    load_precomputed_balances,
+    load_precomputed_flows,
 )
-from api.regional import load_official_uk_borrowing, load_precomputed_balances, load_precomputed_flows
+from api.sessions import KEEPALIVE_S, Listener, Session, SessionLimit, SessionStore, changed_outputs, flatten_outputs
+from api.snapshot import get_snapshot, preload_tables
+from api.spending_tree import SpendingNode, spending_tree
 from api.tax_model import (
     MARRIAGE_ALLOWANCE_CREDIT_GBP,
     estimate_council_tax,
@@ -37,12 +104,76 @@ from api.tax_model import (
     estimate_self_employed_ni,
     estimate_student_loan_repayment,
     estimate_vat,
-    lookup_council_from_postcode,
 )
 
 
-app = FastAPI(title="Where Your Taxes Go API", version="0.1.0")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Map the snapshot before serving, building it first on a worker thread
+    # if it is missing or stale, so no request builds it on the event loop.
+    # Mapping reads only the header; tables still load lazily on first use,
+    # which keeps scale-to-zero cold starts short. Long-running deployments
+    # can pay that cost at startup instead.
+    await CPU_EXECUTOR.run(get_snapshot)
+    if os.environ.get("WYTG_PRELOAD_DATA") == "1":
+        preload_tables()
+        defaults = SpendingTreeRequest()
+        service_vector(defaults.revenue_year, defaults.spending_year)
+        spending_tree(defaults.revenue_year, defaults.spending_year)
+        postcode_sector_trie()
+        council_index()
+        council_tax_table()
+    yield
+
+
+app = FastAPI(title="Where Your Taxes Go API", version="0.1.0", lifespan=_lifespan)
+
+# Identical concurrent requests (a linked scenario going viral) share one
+# computation, and identical concurrent postcodes share one upstream lookup.
+ENDPOINT_FLIGHT: SingleFlight[object] = SingleFlight("endpoint")
+POSTCODE_FLIGHT: SingleFlight[dict[str, str] | None] = SingleFlight("postcode")
+
+# Cheap estimates and heavy batch work are admitted from separate pools, so a
+# burst of exports queues (and sheds) on its own. Costs are rough multiples of
+# a single estimate; unlisted routes (health, metrics, docs) bypass admission.
+ESTIMATE_POOL = AdmissionPool("estimate", capacity=64, queue_size=256, max_wait_s=2.0, retry_after_s=1)
+HEAVY_POOL = AdmissionPool("heavy", capacity=8, queue_size=16, max_wait_s=5.0, retry_after_s=5)
+ADMISSION_ROUTES = {
+    "/tax/estimate": RouteCost(ESTIMATE_POOL),
+    "/tax/marginal": RouteCost(ESTIMATE_POOL, cost=2),
+    "/spending/breakdown": RouteCost(ESTIMATE_POOL),
+    "/spending/tree": RouteCost(ESTIMATE_POOL),
+    "/services/impact": RouteCost(ESTIMATE_POOL),
+    "/services/impact/batch": RouteCost(HEAVY_POOL, cost=4),
+    "/regional/flows": RouteCost(ESTIMATE_POOL),
+    "/borrowing/official": RouteCost(ESTIMATE_POOL),
+    "/tax/compare": RouteCost(HEAVY_POOL, cost=2),
+    "/spending/query": RouteCost(HEAVY_POOL, cost=2),
+    "/journalist/export": RouteCost(HEAVY_POOL, cost=4),
+    "/postcodes/resolve": RouteCost(HEAVY_POOL, cost=2),
+    "/postcodes/typeahead": RouteCost(ESTIMATE_POOL),
+    "/councils/search": RouteCost(ESTIMATE_POOL),
+    # `/session/stream` is long-lived and holds no capacity, so it is unlisted.
+    "/session/open": RouteCost(ESTIMATE_POOL, cost=2),
+    "/session/delta": RouteCost(ESTIMATE_POOL),
+}
+SESSIONS = SessionStore()
+# Sampled request capture for replay (off unless WYTG_CAPTURE_PATH is set).
+# Session routes are left out: their ids do not survive a replay.
+CAPTURE = RequestCapture()
+CAPTURE_ROUTES = frozenset(path for path in ADMISSION_ROUTES if not path.startswith("/session/"))
+
+# Slow-request profiles (off unless WYTG_PROFILE_DIR is set) sample the loop
+# thread and the CPU executor workers.
+PROFILER = SlowRequestProfiler(thread_prefixes=(CPU_EXECUTOR.name,))
 
+# Inside admission, so time spent queueing does not make a request "slow".
+app.add_middleware(ProfilingMiddleware, profiler=PROFILER, routes=frozenset(ADMISSION_ROUTES))
+# Added before CORS so shed responses still carry CORS headers.
+app.add_middleware(AdmissionMiddleware, routes=ADMISSION_ROUTES)
+# Outside admission, so captured durations include queueing and shed
+# requests are captured too.
+app.add_middleware(CaptureMiddleware, capture=CAPTURE, routes=CAPTURE_ROUTES)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -52,170 +183,370 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated(_request: Request, exc: ExecutorSaturated) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 @app.get("/health")
-def health() -> dict[str, str]:
+async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics() -> dict[str, object]:
+    return {
+        "coalescing": {f.name: f.stats() for f in (ENDPOINT_FLIGHT, POSTCODE_FLIGHT)},
+        "admission": {p.name: p.stats() for p in (ESTIMATE_POOL, HEAVY_POOL)},
+        "sessions": SESSIONS.stats(),
+        "estimate_nodes": node_stats(),
+        "capture": CAPTURE.stats(),
+        "profiler": PROFILER.stats(),
+        "cpu_executor": {
+            "workers": CPU_EXECUTOR.workers,
+            "limit": CPU_EXECUTOR.limit,
+            "in_flight": CPU_EXECUTOR.in_flight,
+        },
+    }
+
+
 @app.get("/public/meta")
-def public_meta() -> dict[str, object]:
+async def public_meta() -> dict[str, object]:
     return {
         "name": "Where Your Taxes Go API",
         "version": app.version,
         "generated_at_utc": datetime.now(timezone.utc).isoformat(),
         "public_endpoints": [
             "/tax/estimate",
+            "/tax/compare",
+            "/tax/marginal",
             "/spending/breakdown",
+            "/spending/query",
+            "/spending/tree",
             "/services/impact",
+            "/services/impact/batch",
             "/regional/flows",
+            "/borrowing/official",
             "/journalist/export",
+            "/postcodes/resolve",
+            "/postcodes/typeahead",
+            "/councils/search",
+            "/session/open",
+            "/session/delta",
+            "/session/stream",
             "/public/meta",
         ],
     }
 
 
-def _compute_person_tax(
-    annual_income_gbp: float,
-    p,
-    basic_rate_band_extension_gbp: float = 0.0,
-) -> dict[str, float]:
-    income_tax = estimate_income_tax_with_reliefs(
-        annual_income_gbp, p, basic_rate_band_extension_gbp=basic_rate_band_extension_gbp
-    )
-    ni = estimate_national_insurance(annual_income_gbp, p)
-    return {"income_tax_gbp": income_tax, "national_insurance_gbp": ni}
-
-
-def _apply_policy_overrides(base_params, req: TaxEstimateRequest):
-    if not req.policy_overrides:
+def _apply_policy_overrides(base_params, overrides: PolicyOverrides | None):
+    if not overrides:
         return base_params
     return replace(
         base_params,
         personal_allowance=(
-            req.policy_overrides.personal_allowance
-            if req.policy_overrides.personal_allowance is not None
+            overrides.personal_allowance
+            if overrides.personal_allowance is not None
             else base_params.personal_allowance
         ),
         basic_rate=(
-            req.policy_overrides.basic_rate
-            if req.policy_overrides.basic_rate is not None
+            overrides.basic_rate
+            if overrides.basic_rate is not None
             else base_params.basic_rate
         ),
         higher_rate=(
-            req.policy_overrides.higher_rate
-            if req.policy_overrides.higher_rate is not None
+            overrides.higher_rate
+            if overrides.higher_rate is not None
             else base_params.higher_rate
         ),
         additional_rate=(
-            req.policy_overrides.additional_rate
-            if req.policy_overrides.additional_rate is not None
+            overrides.additional_rate
+            if overrides.additional_rate is not None
             else base_params.additional_rate
         ),
         ni_main_rate=(
-            req.policy_overrides.ni_main_rate
-            if req.policy_overrides.ni_main_rate is not None
+            overrides.ni_main_rate
+            if overrides.ni_main_rate is not None
             else base_params.ni_main_rate
         ),
         ni_upper_rate=(
-            req.policy_overrides.ni_upper_rate
-            if req.policy_overrides.ni_upper_rate is not None
+            overrides.ni_upper_rate
+            if overrides.ni_upper_rate is not None
             else base_params.ni_upper_rate
         ),
         vat_rate=(
-            req.policy_overrides.vat_rate
-            if req.policy_overrides.vat_rate is not None
+            overrides.vat_rate
+            if overrides.vat_rate is not None
             else base_params.vat_rate
         ),
     )
 
 
-def _estimate_tax_totals(req: TaxEstimateRequest) -> tuple[TaxEstimateResponse, float, float]:
-    params = _apply_policy_overrides(get_tax_parameters(req.tax_year), req)
+@dataclass(frozen=True)
+class HouseholdContext:
+    """Everything about an estimate that does not depend on the tax year or policy."""
+
+    adjusted_income: float
+    adjusted_partner_income: float
+    basic_rate_band_extension: float
+    gross_household_income: float
+    adjusted_household_income: float
+    council_name: str
+    postcode_region: str
+    council_region: str
+    # Council whose own rates priced council tax ("" for a regional average
+    # or an override), and which of the three it was.
+    council_tax_council: str
+    council_tax_source: str
+    council_tax: float
+    council_tax_low: float
+    council_tax_high: float
+    savings_tax: float
+    dividend_tax: float
+    student_loan: float
+
+
+@dataclass(frozen=True)
+class ScenarioTotals:
+    income_tax: float
+    national_insurance: float
+    vat: float
+    marriage_credit: float
+    total: float
+    total_low: float
+    total_high: float
+
+
+def _household_context(
+    req: TaxEstimateRequest,
+    council_lookup: dict[str, str] | None,
+    exact: bool = False,
+) -> HouseholdContext:
     adjusted_income = max(
         0.0,
         req.annual_income_gbp - req.pension_salary_sacrifice_gbp - req.other_pre_tax_deductions_gbp,
     )
     adjusted_partner_income = max(0.0, req.partner_annual_income_gbp)
-    basic_rate_band_extension = req.pension_relief_at_source_gbp + req.gift_aid_gbp
-
-    primary_income_tax = estimate_income_tax_with_reliefs(
-        adjusted_income,
-        params,
-        basic_rate_band_extension_gbp=basic_rate_band_extension,
+    node = _uncached if exact else _cached
+    # A council name resolves offline and, being the user's own choice, takes
+    # precedence over the postcode lookup for the region. Its own council tax
+    # rates apply only if the postcode does not point elsewhere.
+    named = resolve_council_name(req.council_name) if req.council_name else None
+    if named is not None:
+        inferred_council = named.lad_name
+    else:
+        inferred_council = req.council_name or (council_lookup.get("council_name", "") if council_lookup else "")
+    inferred_region = council_lookup.get("region", "") if council_lookup else ""
+    council_region = (named.region_name if named else "") or inferred_region or req.region
+    lad = None
+    if req.council_tax_annual_override_gbp is not None:
+        council = round(req.council_tax_annual_override_gbp, 2)
+        council_low = council_high = council
+        source = "override"
+    else:
+        # The council's own rates when it is known and in the Band D table,
+        # otherwise the regional average.
+        lad = _council_for_tax(named, council_lookup)
+        council = _council_tax(council_region, req.council_tax_band, lad.lad_code if lad is not None else None)
+        council_low = round(council * 0.9, 2)
+        council_high = round(council * 1.1, 2)
+        source = "council" if lad is not None else "regional_average"
+    return HouseholdContext(
+        adjusted_income=adjusted_income,
+        adjusted_partner_income=adjusted_partner_income,
+        basic_rate_band_extension=req.pension_relief_at_source_gbp + req.gift_aid_gbp,
+        gross_household_income=req.annual_income_gbp + req.partner_annual_income_gbp,
+        adjusted_household_income=adjusted_income + adjusted_partner_income,
+        council_name=inferred_council,
+        postcode_region=inferred_region,
+        council_region=council_region,
+        council_tax_council=lad.lad_name if lad is not None else "",
+        council_tax_source=source,
+        council_tax=council,
+        council_tax_low=council_low,
+        council_tax_high=council_high,
+        savings_tax=node(_savings_tax)(adjusted_income, req.savings_interest_gbp, rounded=not exact),
+        dividend_tax=node(_dividend_tax)(adjusted_income, req.dividend_income_gbp, rounded=not exact),
+        student_loan=node(_student_loan)(adjusted_income, req.student_loan_plan, rounded=not exact),
     )
-    if req.uk_nation_for_income_tax == "scotland":
-        primary_income_tax = estimate_income_tax_scotland(adjusted_income, params)
-    primary = {
-        "income_tax_gbp": primary_income_tax,
-        "national_insurance_gbp": estimate_national_insurance(adjusted_income, params),
-    }
-    partner = _compute_person_tax(adjusted_partner_income, params)
-    if req.employment_type in {"self_employed", "mixed"}:
-        primary["national_insurance_gbp"] = estimate_self_employed_ni(adjusted_income)
 
+
+def _council_for_tax(named: Council | None, council_lookup: dict[str, str] | None) -> Council | None:
+    """The council whose own rates apply, or None to use the regional average.
+
+    Both the named council and the postcode's must resolve unambiguously, and
+    when both are known they must agree: a mistyped or misresolved name never
+    charges another council's rates.
+    """
+    looked_up = council_lookup.get("council_name", "") if council_lookup else ""
+    from_postcode = resolve_council_name(looked_up) if looked_up else None
+    if named is not None and from_postcode is not None and named.lad_code != from_postcode.lad_code:
+        return None
+    lad = named or from_postcode
+    table = council_tax_table() if lad is not None else None
+    if table is None or lad.lad_code not in table.rows:
+        return None
+    return lad
+
+
+# Estimate pipeline nodes (see api/memo.py). Each is keyed by its inputs,
+# including the outputs of the nodes it depends on:
+#
+#   person_tax(primary), person_tax(partner) -> household_tax -> vat
+#   council_tax, savings_tax, dividend_tax, student_loan (household context)
+_savings_tax = memo_node("savings_tax")(estimate_savings_tax)
+_dividend_tax = memo_node("dividend_tax")(estimate_dividend_tax)
+_student_loan = memo_node("student_loan")(estimate_student_loan_repayment)
+
+
+def _cached(n: MemoNode):
+    return n
+
+
+def _uncached(n: MemoNode):
+    return n.compute
+
+
+@memo_node("council_tax")
+def _council_tax(region: str, band: str, lad_code: str | None) -> float:
+    table = council_tax_table() if lad_code is not None else None
+    rates = table.row(lad_code) if table is not None else None
+    return estimate_council_tax(region, band, rates)
+
+
+@memo_node("person_tax")
+def _person_tax(
+    income: float,
+    params,
+    basic_rate_band_extension: float,
+    nation: str,
+    employment_type: str,
+    rounded: bool,
+) -> tuple[float, float]:
+    """(income tax, NI) for one adult."""
+    if nation == "scotland":
+        income_tax = estimate_income_tax_scotland(income, params, rounded=rounded)
+    else:
+        income_tax = estimate_income_tax_with_reliefs(
+            income, params, basic_rate_band_extension_gbp=basic_rate_band_extension, rounded=rounded
+        )
+    if employment_type in {"self_employed", "mixed"}:
+        ni = estimate_self_employed_ni(income, rounded=rounded)
+    else:
+        ni = estimate_national_insurance(income, params, rounded=rounded)
+    return income_tax, ni
+
+
+@memo_node("household_tax")
+def _household_tax(
+    primary: tuple[float, float],
+    partner: tuple[float, float],
+    marriage_allowance_transfer: bool,
+    adjusted_income: float,
+    adjusted_partner_income: float,
+    params,
+    rounded: bool,
+) -> tuple[float, float, float]:
+    """(household income tax, household NI, marriage allowance credit)."""
+    r2 = (lambda v: round(v, 2)) if rounded else (lambda v: v)
+    primary_tax, partner_tax = primary[0], partner[0]
     marriage_credit = 0.0
-    if req.marriage_allowance_transfer and adjusted_partner_income > 0:
+    if marriage_allowance_transfer and adjusted_partner_income > 0:
         lower_income = min(adjusted_income, adjusted_partner_income)
         higher_income = max(adjusted_income, adjusted_partner_income)
         if lower_income <= params.personal_allowance and higher_income <= params.higher_rate_threshold:
-            marriage_credit = min(
-                MARRIAGE_ALLOWANCE_CREDIT_GBP,
-                max(primary["income_tax_gbp"], partner["income_tax_gbp"]),
-            )
-            if primary["income_tax_gbp"] >= partner["income_tax_gbp"]:
-                primary["income_tax_gbp"] = round(primary["income_tax_gbp"] - marriage_credit, 2)
+            marriage_credit = min(MARRIAGE_ALLOWANCE_CREDIT_GBP, max(primary_tax, partner_tax))
+            if primary_tax >= partner_tax:
+                primary_tax = r2(primary_tax - marriage_credit)
             else:
-                partner["income_tax_gbp"] = round(partner["income_tax_gbp"] - marriage_credit, 2)
-
-    household_income_tax = round(primary["income_tax_gbp"] + partner["income_tax_gbp"], 2)
-    household_ni = round(primary["national_insurance_gbp"] + partner["national_insurance_gbp"], 2)
-    gross_household_income = req.annual_income_gbp + req.partner_annual_income_gbp
-    adjusted_household_income = adjusted_income + adjusted_partner_income
-    vat = estimate_vat(
-        adjusted_household_income,
-        household_income_tax,
-        household_ni,
-        req.vatable_spend_ratio,
+                partner_tax = r2(partner_tax - marriage_credit)
+    return r2(primary_tax + partner_tax), r2(primary[1] + partner[1]), marriage_credit
+
+
+@memo_node("vat")
+def _vat_range(
+    income: float,
+    income_tax: float,
+    ni: float,
+    vatable_spend_ratio: float,
+    params,
+    rounded: bool,
+) -> tuple[float, float, float]:
+    """(VAT, low, high), the range moving the vatable share by 10 points."""
+    return (
+        estimate_vat(income, income_tax, ni, vatable_spend_ratio, params, rounded=rounded),
+        estimate_vat(income, income_tax, ni, max(0.0, vatable_spend_ratio - 0.10), params, rounded=rounded),
+        estimate_vat(income, income_tax, ni, min(1.0, vatable_spend_ratio + 0.10), params, rounded=rounded),
+    )
+
+
+def _evaluate_scenario(
+    req: TaxEstimateRequest,
+    ctx: HouseholdContext,
+    params,
+    exact: bool = False,
+) -> ScenarioTotals:
+    # `exact` skips every rounding step, leaving the model's piecewise-linear
+    # values for marginal-rate analysis. Its inputs rarely repeat, so it also
+    # bypasses the node caches.
+    r2 = (lambda v: v) if exact else (lambda v: round(v, 2))
+    rounded = not exact
+    node = _uncached if exact else _cached
+    primary = node(_person_tax)(
+        ctx.adjusted_income,
         params,
+        ctx.basic_rate_band_extension,
+        req.uk_nation_for_income_tax,
+        req.employment_type,
+        rounded,
     )
-    council_lookup = (
-        lookup_council_from_postcode(req.postcode or "") if req.postcode else None
+    partner = node(_person_tax)(ctx.adjusted_partner_income, params, 0.0, "england_ni", "employed", rounded)
+    household_income_tax, household_ni, marriage_credit = node(_household_tax)(
+        primary,
+        partner,
+        req.marriage_allowance_transfer,
+        ctx.adjusted_income,
+        ctx.adjusted_partner_income,
+        params,
+        rounded,
     )
-    inferred_council = req.council_name or (council_lookup.get("council_name", "") if council_lookup else "")
-    inferred_region = council_lookup.get("region", "") if council_lookup else ""
-    council_region = inferred_region or req.region
-    if req.council_tax_annual_override_gbp is not None:
-        council = round(req.council_tax_annual_override_gbp, 2)
-    else:
-        council = estimate_council_tax(council_region, req.council_tax_band)
-    savings_tax = estimate_savings_tax(adjusted_income, req.savings_interest_gbp)
-    dividend_tax = estimate_dividend_tax(adjusted_income, req.dividend_income_gbp)
-    student_loan = estimate_student_loan_repayment(adjusted_income, req.student_loan_plan)
-    total = round(household_income_tax + household_ni + vat + council + savings_tax + dividend_tax + student_loan, 2)
+    vat, vat_low, vat_high = node(_vat_range)(
+        ctx.adjusted_household_income, household_income_tax, household_ni, req.vatable_spend_ratio, params, rounded
+    )
+    fixed = (ctx.savings_tax, ctx.dividend_tax, ctx.student_loan)
+    return ScenarioTotals(
+        income_tax=household_income_tax,
+        national_insurance=household_ni,
+        vat=vat,
+        marriage_credit=marriage_credit,
+        total=r2(sum((household_income_tax, household_ni, vat, ctx.council_tax, *fixed))),
+        total_low=r2(sum((household_income_tax, household_ni, vat_low, ctx.council_tax_low, *fixed))),
+        total_high=r2(sum((household_income_tax, household_ni, vat_high, ctx.council_tax_high, *fixed))),
+    )
+
+
+def _estimate_tax_totals(
+    req: TaxEstimateRequest,
+    council_lookup: dict[str, str] | None = None,
+    ctx: HouseholdContext | None = None,
+) -> tuple[TaxEstimateResponse, float, float]:
+    ctx = ctx or _household_context(req, council_lookup)
+    params = _apply_policy_overrides(get_tax_parameters(req.tax_year), req.policy_overrides)
+    totals = _evaluate_scenario(req, ctx, params)
+    total = totals.total
+    gross_household_income = ctx.gross_household_income
     effective = round((total / gross_household_income) if gross_household_income else 0.0, 6)
     take_home = round(gross_household_income - total, 2)
 
-    vat_low = max(0.0, req.vatable_spend_ratio - 0.10)
-    vat_high = min(1.0, req.vatable_spend_ratio + 0.10)
-    vat_est_low = estimate_vat(adjusted_household_income, household_income_tax, household_ni, vat_low, params)
-    vat_est_high = estimate_vat(adjusted_household_income, household_income_tax, household_ni, vat_high, params)
-    council_low = council if req.council_tax_annual_override_gbp is not None else round(council * 0.9, 2)
-    council_high = council if req.council_tax_annual_override_gbp is not None else round(council * 1.1, 2)
-    total_low = round(household_income_tax + household_ni + vat_est_low + council_low + savings_tax + dividend_tax + student_loan, 2)
-    total_high = round(
-        household_income_tax + household_ni + vat_est_high + council_high + savings_tax + dividend_tax + student_loan,
-        2,
-    )
-
     response = TaxEstimateResponse(
         annual_income_gbp=round(req.annual_income_gbp, 2),
-        income_tax_gbp=household_income_tax,
-        national_insurance_gbp=household_ni,
-        vat_estimate_gbp=vat,
-        council_tax_estimate_gbp=council,
-        student_loan_repayment_gbp=student_loan,
-        savings_tax_gbp=savings_tax,
-        dividend_tax_gbp=dividend_tax,
+        income_tax_gbp=totals.income_tax,
+        national_insurance_gbp=totals.national_insurance,
+        vat_estimate_gbp=totals.vat,
+        council_tax_estimate_gbp=ctx.council_tax,
+        student_loan_repayment_gbp=ctx.student_loan,
+        savings_tax_gbp=ctx.savings_tax,
+        dividend_tax_gbp=ctx.dividend_tax,
         total_estimated_tax_gbp=total,
         effective_tax_rate=effective,
         assumptions={
@@ -224,21 +555,23 @@ def _estimate_tax_totals(req: TaxEstimateRequest) -> tuple[TaxEstimateResponse,
             "vat_rate": params.vat_rate,
             "ni_main_rate": params.ni_main_rate,
             "ni_upper_rate": params.ni_upper_rate,
-            "adjusted_income_gbp": round(adjusted_income, 2),
-            "adjusted_partner_income_gbp": round(adjusted_partner_income, 2),
+            "adjusted_income_gbp": round(ctx.adjusted_income, 2),
+            "adjusted_partner_income_gbp": round(ctx.adjusted_partner_income, 2),
             "pension_salary_sacrifice_gbp": req.pension_salary_sacrifice_gbp,
             "pension_relief_at_source_gbp": req.pension_relief_at_source_gbp,
             "gift_aid_gbp": req.gift_aid_gbp,
             "other_pre_tax_deductions_gbp": req.other_pre_tax_deductions_gbp,
             "council_tax_band": req.council_tax_band,
-            "council_name": inferred_council,
-            "postcode_lookup_region": inferred_region,
-            "council_tax_region_used": council_region,
+            "council_name": ctx.council_name,
+            "postcode_lookup_region": ctx.postcode_region,
+            "council_tax_region_used": ctx.council_region,
+            "council_tax_source": ctx.council_tax_source,
+            "council_tax_council_used": ctx.council_tax_council,
             "uk_nation_for_income_tax": req.uk_nation_for_income_tax,
             "employment_type": req.employment_type,
             "student_loan_plan": req.student_loan_plan,
             "policy_simulation_active": "yes" if req.policy_overrides else "no",
-            "marriage_allowance_credit_gbp": marriage_credit,
+            "marriage_allowance_credit_gbp": totals.marriage_credit,
         },
         household_summary={
             "household_income_gbp": round(gross_household_income, 2),
@@ -247,21 +580,85 @@ def _estimate_tax_totals(req: TaxEstimateRequest) -> tuple[TaxEstimateResponse,
             "marriage_allowance_transfer": req.marriage_allowance_transfer,
         },
         take_home_gbp=take_home,
-        uncertainty_range_gbp={"low": total_low, "high": total_high},
+        uncertainty_range_gbp={"low": totals.total_low, "high": totals.total_high},
     )
-    return response, adjusted_income, adjusted_partner_income
+    return response, ctx.adjusted_income, ctx.adjusted_partner_income
 
 
-@app.post("/tax/estimate", response_model=TaxEstimateResponse)
-def tax_estimate(req: TaxEstimateRequest) -> TaxEstimateResponse:
-    response, _, _ = _estimate_tax_totals(req)
+HouseholdRequest = TaxEstimateRequest | SpendingBreakdownRequest | ServicesImpactRequest | JournalistExportRequest
+
+
+def _tax_request(req: HouseholdRequest) -> TaxEstimateRequest:
+    return TaxEstimateRequest(
+        annual_income_gbp=req.annual_income_gbp,
+        region=req.region,
+        tax_year=req.tax_year,
+        vatable_spend_ratio=req.vatable_spend_ratio,
+        pension_salary_sacrifice_gbp=req.pension_salary_sacrifice_gbp,
+        pension_relief_at_source_gbp=req.pension_relief_at_source_gbp,
+        gift_aid_gbp=req.gift_aid_gbp,
+        other_pre_tax_deductions_gbp=req.other_pre_tax_deductions_gbp,
+        partner_annual_income_gbp=req.partner_annual_income_gbp,
+        marriage_allowance_transfer=req.marriage_allowance_transfer,
+        council_tax_band=req.council_tax_band,
+        postcode=req.postcode,
+        council_name=req.council_name,
+        council_tax_annual_override_gbp=req.council_tax_annual_override_gbp,
+        uk_nation_for_income_tax=req.uk_nation_for_income_tax,
+        employment_type=req.employment_type,
+        savings_interest_gbp=req.savings_interest_gbp,
+        dividend_income_gbp=req.dividend_income_gbp,
+        student_loan_plan=req.student_loan_plan,
+        policy_overrides=req.policy_overrides,
+    )
+
+
+async def _resolve_council(req: HouseholdRequest) -> dict[str, str] | None:
+    # The only network call on the estimate path; awaited once per request and
+    # passed down, so nested estimates never repeat it.
+    key = normalize_postcode(req.postcode) if req.postcode else None
+    if key is None:
+        return None
+    return await POSTCODE_FLIGHT.do(key, lambda: _lookup_council(key))
+
+
+async def _lookup_council(postcode: str) -> dict[str, str] | None:
+    # When postcodes.io is unreachable (or does not know a new postcode) the
+    # local sector trie still gives the region, and usually the council.
+    found = await lookup_council_from_postcode(postcode)
+    return found if found is not None else council_from_sector(postcode)
+
+
+async def _run_estimate(fn, req: HouseholdRequest, council_lookup: dict[str, str] | None):
+    # A plain estimate is well under a millisecond and runs inline. Policy
+    # simulation and historical comparison go to the bounded CPU executor.
+    simulating = req.policy_overrides is not None or getattr(req, "compare_tax_year", "none") not in {"none", req.tax_year}
+    if simulating:
+        return await CPU_EXECUTOR.run(fn, req, council_lookup)
+    return fn(req, council_lookup)
+
+
+async def _coalesced_estimate(name: str, fn, req: HouseholdRequest):
+    async def compute():
+        return await _run_estimate(fn, req, await _resolve_council(req))
+
+    # The validated model (defaults filled in, fields in declaration order) is
+    # the canonical key, so equivalent JSON bodies coalesce.
+    key = f"{name}:{req.model_dump_json()}"
+    tag_request(key)
+    return await ENDPOINT_FLIGHT.do(key, compute)
+
+
+def _tax_estimate(req: TaxEstimateRequest, council_lookup: dict[str, str] | None) -> TaxEstimateResponse:
+    ctx = _household_context(req, council_lookup)
+    response, _, _ = _estimate_tax_totals(req, ctx=ctx)
     if req.compare_tax_year != "none" and req.compare_tax_year != req.tax_year:
-        compare_req = req.model_copy(update={"tax_year": req.compare_tax_year, "compare_tax_year": "none"})
-        compare_response, _, _ = _estimate_tax_totals(compare_req)
-        delta = round(compare_response.total_estimated_tax_gbp - response.total_estimated_tax_gbp, 2)
+        compare_params = _apply_policy_overrides(get_tax_parameters(req.compare_tax_year), req.policy_overrides)
+        compare_total = _evaluate_scenario(req, ctx, compare_params).total
+        delta = round(compare_total - response.total_estimated_tax_gbp, 2)
         response.historical_comparison = {
             "compare_tax_year": req.compare_tax_year,
-            "total_estimated_tax_gbp": compare_response.total_estimated_tax_gbp,
+            "total_estimated_tax_gbp": compare_total,
             "delta_vs_selected_gbp": delta,
             "delta_vs_selected_percent": round(
                 (delta / response.total_estimated_tax_gbp * 100.0)
@@ -273,32 +670,143 @@ def tax_estimate(req: TaxEstimateRequest) -> TaxEstimateResponse:
     return response
 
 
-@app.post("/spending/breakdown", response_model=SpendingBreakdownResponse)
-def spending_breakdown(req: SpendingBreakdownRequest) -> SpendingBreakdownResponse:
-    tax = tax_estimate(
-        TaxEstimateRequest(
-            annual_income_gbp=req.annual_income_gbp,
-            region=req.region,
-            tax_year=req.tax_year,
-            vatable_spend_ratio=req.vatable_spend_ratio,
-            pension_salary_sacrifice_gbp=req.pension_salary_sacrifice_gbp,
-            pension_relief_at_source_gbp=req.pension_relief_at_source_gbp,
-            gift_aid_gbp=req.gift_aid_gbp,
-            other_pre_tax_deductions_gbp=req.other_pre_tax_deductions_gbp,
-            partner_annual_income_gbp=req.partner_annual_income_gbp,
-            marriage_allowance_transfer=req.marriage_allowance_transfer,
-            council_tax_band=req.council_tax_band,
-            postcode=req.postcode,
-            council_name=req.council_name,
-            council_tax_annual_override_gbp=req.council_tax_annual_override_gbp,
-            uk_nation_for_income_tax=req.uk_nation_for_income_tax,
-            employment_type=req.employment_type,
-            savings_interest_gbp=req.savings_interest_gbp,
-            dividend_income_gbp=req.dividend_income_gbp,
-            student_loan_plan=req.student_loan_plan,
-            policy_overrides=req.policy_overrides,
+@app.post("/tax/estimate", response_model=TaxEstimateResponse)
+async def tax_estimate(req: TaxEstimateRequest) -> TaxEstimateResponse:
+    return await _coalesced_estimate("tax_estimate", _tax_estimate, req)
+
+
+def _compare_scenarios(req: TaxCompareRequest, council_lookup: dict[str, str] | None) -> TaxCompareResponse:
+    household = req.household
+    # Postcode, council tax, deductions, savings, dividends and student loan
+    # do not vary by year or policy: resolved once, shared by every scenario.
+    ctx = _household_context(household, council_lookup)
+    scenarios = [TaxScenario(label="baseline", policy_overrides=household.policy_overrides), *req.scenarios]
+    tax_years = [s.tax_year or household.tax_year for s in scenarios]
+    evaluated = [
+        _evaluate_scenario(household, ctx, _apply_policy_overrides(get_tax_parameters(year), s.policy_overrides))
+        for year, s in zip(tax_years, scenarios)
+    ]
+    gross = ctx.gross_household_income
+    baseline_total = evaluated[0].total
+    results = [
+        TaxScenarioResult(
+            label=s.label or f"scenario_{i}",
+            tax_year=year,
+            policy_simulation_active=s.policy_overrides is not None,
+            income_tax_gbp=t.income_tax,
+            national_insurance_gbp=t.national_insurance,
+            vat_estimate_gbp=t.vat,
+            marriage_allowance_credit_gbp=t.marriage_credit,
+            total_estimated_tax_gbp=t.total,
+            effective_tax_rate=round((t.total / gross) if gross else 0.0, 6),
+            take_home_gbp=round(gross - t.total, 2),
+            uncertainty_range_gbp={"low": t.total_low, "high": t.total_high},
+            delta_vs_baseline_gbp=round(t.total - baseline_total, 2),
         )
+        for i, (year, s, t) in enumerate(zip(tax_years, scenarios, evaluated))
+    ]
+    totals_row = [r.total_estimated_tax_gbp for r in results]
+    return TaxCompareResponse(
+        annual_income_gbp=round(household.annual_income_gbp, 2),
+        household_context={
+            "adjusted_income_gbp": round(ctx.adjusted_income, 2),
+            "adjusted_partner_income_gbp": round(ctx.adjusted_partner_income, 2),
+            "household_income_gbp": round(ctx.gross_household_income, 2),
+            "council_name": ctx.council_name,
+            "postcode_lookup_region": ctx.postcode_region,
+            "council_tax_region_used": ctx.council_region,
+            "council_tax_source": ctx.council_tax_source,
+            "council_tax_council_used": ctx.council_tax_council,
+            "council_tax_estimate_gbp": ctx.council_tax,
+            "student_loan_repayment_gbp": ctx.student_loan,
+            "savings_tax_gbp": ctx.savings_tax,
+            "dividend_tax_gbp": ctx.dividend_tax,
+        },
+        scenarios=results,
+        labels=[r.label for r in results],
+        delta_matrix_gbp=[[round(col - row, 2) for col in totals_row] for row in totals_row],
     )
+
+
+@app.post("/tax/compare", response_model=TaxCompareResponse)
+async def tax_compare(req: TaxCompareRequest) -> TaxCompareResponse:
+    async def compute() -> TaxCompareResponse:
+        return await CPU_EXECUTOR.run(_compare_scenarios, req, await _resolve_council(req.household))
+
+    return await ENDPOINT_FLIGHT.do(f"tax_compare:{req.model_dump_json()}", compute)
+
+
+MARGINAL_COMPONENTS = ("income_tax", "national_insurance", "student_loan", "vat", "savings_tax", "dividend_tax")
+
+
+def _tax_marginal(req: TaxEstimateRequest, council_lookup: dict[str, str] | None) -> TaxMarginalResponse:
+    params = _apply_policy_overrides(get_tax_parameters(req.tax_year), req.policy_overrides)
+    deductions = req.pension_salary_sacrifice_gbp + req.other_pre_tax_deductions_gbp
+
+    def components(gross_income: float) -> dict[str, float]:
+        r = req.model_copy(update={"annual_income_gbp": gross_income})
+        ctx = _household_context(r, council_lookup, exact=True)
+        t = _evaluate_scenario(r, ctx, params, exact=True)
+        return {
+            "income_tax": t.income_tax,
+            "national_insurance": t.national_insurance,
+            "student_loan": ctx.student_loan,
+            "vat": t.vat,
+            "savings_tax": ctx.savings_tax,
+            "dividend_tax": ctx.dividend_tax,
+            "total": t.total,
+        }
+
+    # Thresholds are in adjusted income; shift them to gross income, plus the
+    # point where deductions stop absorbing the whole salary.
+    breakpoints = [
+        b + deductions
+        for b in model_breakpoints(params, req.pension_relief_at_source_gbp + req.gift_aid_gbp, req.student_loan_plan)
+    ]
+    breakpoints.append(deductions)
+    income = req.annual_income_gbp
+    rates = marginal_rates(components, income, breakpoints)
+
+    def describe(name: str) -> MarginalComponent:
+        m = rates[name]
+        return MarginalComponent(
+            component=name,
+            marginal_rate=round(m.rate, 6),
+            next_change_at_gbp=round(m.next_change_at_gbp, 2) if m.next_change_at_gbp is not None else None,
+            distance_to_next_change_gbp=(
+                round(m.next_change_at_gbp - income, 2) if m.next_change_at_gbp is not None else None
+            ),
+            next_marginal_rate=round(m.next_rate, 6) if m.next_rate is not None else None,
+            step_at_next_change_gbp=round(m.step_gbp, 2),
+        )
+
+    return TaxMarginalResponse(
+        annual_income_gbp=round(income, 2),
+        tax_year=req.tax_year,
+        components=[describe(name) for name in MARGINAL_COMPONENTS],
+        total=describe("total"),
+        assumptions={
+            "income_basis": "primary earner gross annual income",
+            "uk_nation_for_income_tax": req.uk_nation_for_income_tax,
+            "employment_type": req.employment_type,
+            "student_loan_plan": req.student_loan_plan,
+            "vatable_spend_ratio": req.vatable_spend_ratio,
+            "policy_simulation_active": "yes" if req.policy_overrides else "no",
+        },
+    )
+
+
+@app.post("/tax/marginal", response_model=TaxMarginalResponse)
+async def tax_marginal(req: TaxEstimateRequest) -> TaxMarginalResponse:
+    return await _coalesced_estimate("tax_marginal", _tax_marginal, req)
+
+
+def _spending_breakdown(
+    req: SpendingBreakdownRequest,
+    council_lookup: dict[str, str] | None,
+    tax: TaxEstimateResponse | None = None,
+) -> SpendingBreakdownResponse:
+    tax = tax or _tax_estimate(_tax_request(req), council_lookup)
     raw = build_service_contributions(
         user_total_tax_gbp=tax.total_estimated_tax_gbp,
         revenue_year=req.revenue_year,
@@ -315,38 +823,95 @@ def spending_breakdown(req: SpendingBreakdownRequest) -> SpendingBreakdownRespon
     )
 
 
-@app.post("/services/impact", response_model=ServicesImpactResponse)
-def services_impact(req: ServicesImpactRequest) -> ServicesImpactResponse:
-    tax = tax_estimate(
-        TaxEstimateRequest(
-            annual_income_gbp=req.annual_income_gbp,
-            region=req.region,
-            tax_year=req.tax_year,
-            vatable_spend_ratio=req.vatable_spend_ratio,
-            pension_salary_sacrifice_gbp=req.pension_salary_sacrifice_gbp,
-            pension_relief_at_source_gbp=req.pension_relief_at_source_gbp,
-            gift_aid_gbp=req.gift_aid_gbp,
-            other_pre_tax_deductions_gbp=req.other_pre_tax_deductions_gbp,
-            partner_annual_income_gbp=req.partner_annual_income_gbp,
-            marriage_allowance_transfer=req.marriage_allowance_transfer,
-            council_tax_band=req.council_tax_band,
-            postcode=req.postcode,
-            council_name=req.council_name,
-            council_tax_annual_override_gbp=req.council_tax_annual_override_gbp,
-            uk_nation_for_income_tax=req.uk_nation_for_income_tax,
-            employment_type=req.employment_type,
-            savings_interest_gbp=req.savings_interest_gbp,
-            dividend_income_gbp=req.dividend_income_gbp,
-            student_loan_plan=req.student_loan_plan,
-            policy_overrides=req.policy_overrides,
-        )
+@app.post("/spending/breakdown", response_model=SpendingBreakdownResponse)
+async def spending_breakdown(req: SpendingBreakdownRequest) -> SpendingBreakdownResponse:
+    return await _coalesced_estimate("spending_breakdown", _spending_breakdown, req)
+
+
+@app.post("/spending/query", response_model=SpendingQueryResponse)
+async def spending_query(req: SpendingQueryRequest) -> SpendingQueryResponse:
+    # pyarrow is an optional extra (`query`); only this endpoint needs it.
+    try:
+        from api.spending_query import query_spending
+    except ImportError as exc:
+        raise HTTPException(status_code=503, detail="Spending query requires the 'query' extra (pyarrow)") from exc
+    scan = partial(
+        query_spending,
+        group_by=list(req.group_by),
+        limit=req.limit,
+        years=req.years,
+        levels=req.levels,
+        geographies=req.geographies,
+        functions=req.functions,
+        departments=req.departments,
+        source_tables=req.source_tables,
+        min_amount_m_gbp=req.min_amount_m_gbp,
+        max_amount_m_gbp=req.max_amount_m_gbp,
+    )
+    try:
+        # Reads Parquet from disk; keep it off the event loop.
+        raw = await CPU_EXECUTOR.run(scan)
+    except ValueError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return SpendingQueryResponse(**raw)  # type: ignore[arg-type]
+
+
+def _tree_node(node: SpendingNode, user_total_tax_gbp: float) -> SpendingTreeNode:
+    return SpendingTreeNode(
+        id=node.id,
+        label=node.label,
+        code=node.code,
+        row_type=node.row_type,
+        amount_m_gbp=round(node.amount_m_gbp, 2),
+        children_total_m_gbp=(
+            round(node.children_total_m_gbp, 2) if node.children_total_m_gbp is not None else None
+        ),
+        share_of_parent=round(node.share_of_parent, 8),
+        share_of_total_expenditure=round(node.share_of_total_expenditure, 8),
+        share_of_user_tax=round(node.share_of_user_tax, 8),
+        user_contribution_gbp=round(user_total_tax_gbp * node.share_of_user_tax, 2),
+        child_count=len(node.children),
+    )
+
+
+@app.post("/spending/tree", response_model=SpendingTreeResponse)
+async def spending_tree_node(req: SpendingTreeRequest) -> SpendingTreeResponse:
+    # The tree is built once per data year; each call is a dict lookup plus
+    # the node's direct children, so the UI can expand branches on demand.
+    try:
+        tree = spending_tree(req.revenue_year, req.spending_year)
+    except ValueError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    node_id = req.node_id or tree.root_id
+    if node_id not in tree.nodes:
+        raise HTTPException(status_code=404, detail=f"Unknown spending node '{node_id}'")
+    total = req.user_total_tax_gbp
+    node = tree.nodes[node_id]
+    return SpendingTreeResponse(
+        total_uk_tax_revenue_m_gbp=round(tree.total_uk_revenue_m_gbp, 2),
+        user_total_tax_gbp=round(total, 2),
+        spending_year=tree.spending_year,
+        revenue_year=tree.revenue_year,
+        path=[_tree_node(n, total) for n in tree.path(node_id)[:-1]],
+        node=_tree_node(node, total),
+        children=[_tree_node(tree.nodes[c], total) for c in node.children],
     )
+
+
+def _services_impact(
+    req: ServicesImpactRequest,
+    council_lookup: dict[str, str] | None,
+    tax: TaxEstimateResponse | None = None,
+) -> ServicesImpactResponse:
+    tax = tax or _tax_estimate(_tax_request(req), council_lookup)
     raw = build_service_contributions_paginated(
         user_total_tax_gbp=tax.total_estimated_tax_gbp,
         revenue_year=req.revenue_year,
         spending_year=req.spending_year,
         page=req.page,
         page_size=req.page_size,
+        cursor=req.cursor,
+        search=req.search,
     )
     return ServicesImpactResponse(
         total_uk_tax_revenue_m_gbp=float(raw["total_uk_tax_revenue_m_gbp"]),
@@ -358,11 +923,19 @@ def services_impact(req: ServicesImpactRequest) -> ServicesImpactResponse:
         page_size=int(raw["page_size"]),
         total_items=int(raw["total_items"]),
         services=[ServiceContribution(**s) for s in raw["services"]],  # type: ignore[arg-type]
+        next_cursor=raw["next_cursor"],  # type: ignore[arg-type]
     )
 
 
-@app.post("/regional/flows", response_model=RegionalFlowsResponse)
-def regional_flows(req: RegionalFlowsRequest) -> RegionalFlowsResponse:
+@app.post("/services/impact", response_model=ServicesImpactResponse)
+async def services_impact(req: ServicesImpactRequest) -> ServicesImpactResponse:
+    try:
+        return await _coalesced_estimate("services_impact", _services_impact, req)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _regional_flows(req: RegionalFlowsRequest) -> RegionalFlowsResponse:
     balances = load_precomputed_balances(year=req.year)
     flows = load_precomputed_flows(year=req.year)
     official = load_official_uk_borrowing()
@@ -372,13 +945,302 @@ def regional_flows(req: RegionalFlowsRequest) -> RegionalFlowsResponse:
         page=req.page,
         page_size=req.page_size,
         total_items=total_items,
-        official_borrowing_b_gbp=(float(official["amount_b_gbp"]) if official else None),
-        official_borrowing_year_label=(str(official["reference_period"]) if official else None),
-        official_borrowing_release_period=(str(official["release_period"]) if official else None),
-        official_borrowing_reference_period=(str(official["reference_period"]) if official else None),
+        official_borrowing_b_gbp=(official.amount_b_gbp if official else None),
+        official_borrowing_year_label=(official.reference_period if official else None),
+        official_borrowing_release_period=(official.release_period if official else None),
+        official_borrowing_reference_period=(official.reference_period if official else None),
         borrowing_method=("official_psnb_ex" if official else "implied_gap_from_regional_dataset"),
-        balances=[RegionalBalance(**b.__dict__) for b in balances],
-        flows=[RegionalFlow(**f) for f in paged_flows],  # type: ignore[arg-type]
+        balances=[RegionalBalance.model_validate(b, from_attributes=True) for b in balances],
+        flows=[RegionalFlow.model_validate(f, from_attributes=True) for f in paged_flows],
+    )
+
+
+# Larger cohorts must stream: the full matrix would be built in memory.
+BATCH_JSON_MAX_HOUSEHOLDS = 10_000
+BATCH_STREAM_CHUNK_ROWS = 512
+
+
+def _batch_attribution(req: BatchAttributionRequest) -> BatchAttributionResponse:
+    vector, columns, rows = contribution_matrix(
+        req.household_totals_gbp, req.revenue_year, req.spending_year, top_k=req.top_k
+    )
+    return BatchAttributionResponse(
+        total_uk_tax_revenue_m_gbp=round(vector.total_uk_revenue_m_gbp, 2),
+        spending_year=req.spending_year,
+        revenue_year=req.revenue_year,
+        function_labels=[vector.labels[j] for j in columns],
+        spending_amount_m_gbp=[round(vector.spending_m_gbp[j], 2) for j in columns],
+        household_totals_gbp=[round(t, 2) for t in req.household_totals_gbp],
+        contributions_gbp=list(rows),
+    )
+
+
+def _batch_attribution_ndjson(req: BatchAttributionRequest) -> Iterator[str]:
+    vector, columns, rows = contribution_matrix(
+        req.household_totals_gbp, req.revenue_year, req.spending_year, top_k=req.top_k
+    )
+    header = {
+        "total_uk_tax_revenue_m_gbp": round(vector.total_uk_revenue_m_gbp, 2),
+        "spending_year": req.spending_year,
+        "revenue_year": req.revenue_year,
+        "function_labels": [vector.labels[j] for j in columns],
+        "spending_amount_m_gbp": [round(vector.spending_m_gbp[j], 2) for j in columns],
+    }
+    yield json.dumps(header, separators=(",", ":")) + "\n"
+    lines: list[str] = []
+    for i, (total, row) in enumerate(zip(req.household_totals_gbp, rows)):
+        lines.append(
+            json.dumps({"household": i, "user_total_tax_gbp": round(total, 2), "contributions_gbp": row}, separators=(",", ":"))
+        )
+        if len(lines) == BATCH_STREAM_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _executor_chunks(first: str, stream: Iterator[str]) -> AsyncIterator[str]:
+    yield first
+    while (chunk := await CPU_EXECUTOR.run(next, stream, None)) is not None:
+        yield chunk
+
+
+@app.post("/services/impact/batch", response_model=BatchAttributionResponse)
+async def services_impact_batch(req: BatchAttributionRequest):
+    try:
+        if req.format == "ndjson":
+            # Chunks are produced as the client reads them, each on the CPU
+            # executor so the rows never run on the event loop.
+            stream = _batch_attribution_ndjson(req)
+            # Surface data errors (and a full executor) before the 200 is sent.
+            first = await CPU_EXECUTOR.run(next, stream)
+            return StreamingResponse(_executor_chunks(first, stream), media_type="application/x-ndjson")
+        if len(req.household_totals_gbp) > BATCH_JSON_MAX_HOUSEHOLDS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"More than {BATCH_JSON_MAX_HOUSEHOLDS} households: request format 'ndjson' to stream",
+            )
+        return await CPU_EXECUTOR.run(_batch_attribution, req)
+    except ValueError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+@app.post("/regional/flows", response_model=RegionalFlowsResponse)
+async def regional_flows(req: RegionalFlowsRequest) -> RegionalFlowsResponse:
+    return _regional_flows(req)
+
+
+@app.post("/borrowing/official", response_model=OfficialBorrowingResponse)
+async def official_borrowing(req: OfficialBorrowingRequest) -> OfficialBorrowingResponse:
+    history = load_official_borrowing_history()
+    release = find_official_borrowing(
+        reference_period=req.reference_period,
+        release_period=req.release_period,
+    )
+    if history is None or release is None:
+        raise HTTPException(status_code=404, detail="No official borrowing release matches the request")
+    return OfficialBorrowingResponse(
+        release=OfficialBorrowingRelease.model_validate(release, from_attributes=True),
+        reference_periods=list(history.latest_by_reference),
+        release_periods=list(history.latest_by_release_period),
+    )
+
+
+@app.post("/postcodes/resolve", response_model=PostcodeResolveResponse)
+async def postcodes_resolve(req: PostcodeResolveRequest) -> PostcodeResolveResponse:
+    # Upload workloads repeat postcodes heavily: each distinct one is looked
+    # up once, from the on-disk cache or a chunked bulk request.
+    resolved = await resolve_postcodes(req.postcodes)
+    return PostcodeResolveResponse(
+        results=[PostcodeCouncil(**r) if r is not None else None for r in resolved.results],
+        unique_postcodes=resolved.unique,
+        invalid_postcodes=resolved.invalid,
+        from_cache=resolved.from_cache,
+        fetched=resolved.fetched,
+        failed=resolved.failed,
+    )
+
+
+@app.post("/postcodes/typeahead", response_model=PostcodeTypeaheadResponse)
+async def postcodes_typeahead(req: PostcodeTypeaheadRequest) -> PostcodeTypeaheadResponse:
+    # Answered from the in-memory sector trie on every keystroke, with no
+    # upstream call; the full lookup happens once the postcode is complete.
+    trie = postcode_sector_trie()
+    if trie is None:
+        raise HTTPException(status_code=503, detail="Postcode sector data is not available")
+    prefix = normalize_prefix(req.prefix)
+    found = trie.match(prefix)
+    if found is None:
+        return PostcodeTypeaheadResponse(
+            prefix=prefix, matched_prefix="", complete=False, postcode_count=0, councils=[], regions=[]
+        )
+    return PostcodeTypeaheadResponse(
+        prefix=prefix,
+        matched_prefix=found.matched_prefix,
+        complete=found.complete,
+        postcode_count=found.postcode_count,
+        councils=[
+            PostcodeCouncilCandidate(
+                lad_code=c.lad_code,
+                council_name=c.council_name,
+                region=c.region,
+                postcode_count=c.postcode_count,
+                share=round(c.share, 4),
+            )
+            for c in found.councils
+        ],
+        regions=[
+            PostcodeRegionCandidate(region=r.region, postcode_count=r.postcode_count, share=round(r.share, 4))
+            for r in found.regions
+        ],
+    )
+
+
+@app.post("/councils/search", response_model=CouncilSearchResponse)
+async def councils_search(req: CouncilSearchRequest) -> CouncilSearchResponse:
+    return CouncilSearchResponse(
+        query=req.query,
+        results=[
+            CouncilMatch(
+                lad_code=c.lad_code,
+                council_name=c.lad_name,
+                region_code=c.region_code,
+                region=c.region_name,
+                score=round(score, 4),
+            )
+            for c, score in council_index().search(req.query, req.limit)
+        ],
+    )
+
+
+# Session fields that only change which services page or how many breakdown
+# rows are shown; any other field is part of the household.
+SESSION_SERVICES_FIELDS = frozenset({"page", "page_size", "cursor", "search"})
+SESSION_BREAKDOWN_FIELDS = frozenset({"top_n"})
+SESSION_VIEW_FIELDS = SESSION_SERVICES_FIELDS | SESSION_BREAKDOWN_FIELDS
+
+
+def _session_sections(
+    req: SessionOpenRequest,
+    council_lookup: dict[str, str] | None,
+    tax: TaxEstimateResponse | None = None,
+    changed: frozenset[str] | None = None,
+) -> dict[str, BaseModel]:
+    """Outputs affected by the `changed` fields (all of them when None), sharing one tax estimate."""
+    household = changed is None or not changed <= SESSION_VIEW_FIELDS
+    view = changed or frozenset()
+    sections: dict[str, BaseModel] = {}
+    if household or tax is None:
+        tax = _tax_estimate(_tax_request(req), council_lookup)
+        sections["tax"] = tax
+    if household or view & SESSION_BREAKDOWN_FIELDS:
+        sections["breakdown"] = _spending_breakdown(req, council_lookup, tax=tax)  # type: ignore[arg-type]
+    if household or view & SESSION_SERVICES_FIELDS:
+        sections["services"] = _services_impact(req, council_lookup, tax=tax)
+    return sections
+
+
+@app.post("/session/open", response_model=SessionOpenResponse)
+async def session_open(req: SessionOpenRequest) -> SessionOpenResponse:
+    # The validated household, its postcode lookup and the outputs stay with
+    # the session; later changes arrive as deltas on `/session/delta`.
+    council_lookup = await _resolve_council(req)
+    try:
+        sections = await _run_estimate(_session_sections, req, council_lookup)
+        session = SESSIONS.open(req, council_lookup, sections)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except SessionLimit as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"}) from exc
+    return SessionOpenResponse(
+        session_id=session.id,
+        idle_timeout_s=SESSIONS.idle_timeout_s,
+        seq=session.seq,
+        outputs=session.outputs,
+    )
+
+
+@app.post("/session/delta", response_model=SessionDeltaResponse)
+async def session_delta(req: SessionDeltaRequest) -> SessionDeltaResponse:
+    session = SESSIONS.get(req.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    unknown = sorted(set(req.fields) - set(SessionOpenRequest.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown session fields: {', '.join(unknown)}")
+    # Deltas for one session apply in arrival order.
+    async with session.lock:
+        before = session.household.model_dump()
+        try:
+            household = SessionOpenRequest.model_validate({**before, **req.fields})
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors(include_url=False)) from exc
+        after = household.model_dump()
+        changed = frozenset(k for k in after if after[k] != before[k])
+        diff: dict[str, object] = {}
+        if changed:
+            council_lookup = session.council_lookup
+            if "postcode" in changed:
+                council_lookup = await _resolve_council(household)
+            compute = partial(_session_sections, tax=session.sections["tax"], changed=changed)  # type: ignore[arg-type]
+            try:
+                sections = await _run_estimate(compute, household, council_lookup)
+            except InvalidCursor as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+            outputs = flatten_outputs(sections)
+            diff = changed_outputs(session.outputs, outputs)
+            session.household = household
+            session.council_lookup = council_lookup
+            session.sections.update(sections)
+            session.outputs.update(outputs)
+            if diff:
+                session.publish(diff)
+        session.last_active = time.monotonic()
+        SESSIONS.deltas += 1
+        return SessionDeltaResponse(session_id=session.id, seq=session.seq, changed=sorted(diff))
+
+
+def _sse(event: str, data: object, event_id: int | None = None) -> str:
+    head = f"event: {event}\n" + (f"id: {event_id}\n" if event_id is not None else "")
+    return f"{head}data: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _session_events(session: Session):
+    listener = Listener()
+    session.listeners.add(listener)
+    try:
+        yield _sse("snapshot", {"seq": session.seq, "outputs": session.outputs}, session.seq)
+        while True:
+            try:
+                await asyncio.wait_for(listener.wake.wait(), KEEPALIVE_S)
+            except TimeoutError:
+                # Expiry is checked lazily; this also closes an idle session.
+                if SESSIONS.get(session.id) is None:
+                    yield _sse("expired", {})
+                    return
+                yield ": keepalive\n\n"
+                continue
+            listener.wake.clear()
+            if session.closed:
+                yield _sse("expired", {})
+                return
+            # Everything published since the last event, latest values only.
+            changed, listener.pending = listener.pending, {}
+            if changed:
+                yield _sse("delta", {"seq": listener.seq, "changed": changed}, listener.seq)
+    finally:
+        session.listeners.discard(listener)
+
+
+@app.get("/session/stream")
+async def session_stream(session_id: str) -> StreamingResponse:
+    session = SESSIONS.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return StreamingResponse(
+        _session_events(session),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -391,83 +1253,16 @@ def _rows_to_csv(rows: list[dict[str, object]], fieldnames: list[str]) -> str:
     return out.getvalue()
 
 
-@app.post("/journalist/export", response_model=JournalistExportResponse)
-def journalist_export(req: JournalistExportRequest) -> JournalistExportResponse:
-    tax = tax_estimate(
-        TaxEstimateRequest(
-            annual_income_gbp=req.annual_income_gbp,
-            region=req.region,
-            tax_year=req.tax_year,
-            vatable_spend_ratio=req.vatable_spend_ratio,
-            pension_salary_sacrifice_gbp=req.pension_salary_sacrifice_gbp,
-            pension_relief_at_source_gbp=req.pension_relief_at_source_gbp,
-            gift_aid_gbp=req.gift_aid_gbp,
-            other_pre_tax_deductions_gbp=req.other_pre_tax_deductions_gbp,
-            partner_annual_income_gbp=req.partner_annual_income_gbp,
-            marriage_allowance_transfer=req.marriage_allowance_transfer,
-            council_tax_band=req.council_tax_band,
-            postcode=req.postcode,
-            council_name=req.council_name,
-            council_tax_annual_override_gbp=req.council_tax_annual_override_gbp,
-            uk_nation_for_income_tax=req.uk_nation_for_income_tax,
-            employment_type=req.employment_type,
-            savings_interest_gbp=req.savings_interest_gbp,
-            dividend_income_gbp=req.dividend_income_gbp,
-            student_loan_plan=req.student_loan_plan,
-            policy_overrides=req.policy_overrides,
-        )
-    )
-    breakdown = spending_breakdown(
-        SpendingBreakdownRequest(
-            annual_income_gbp=req.annual_income_gbp,
-            region=req.region,
-            tax_year=req.tax_year,
-            vatable_spend_ratio=req.vatable_spend_ratio,
-            pension_salary_sacrifice_gbp=req.pension_salary_sacrifice_gbp,
-            pension_relief_at_source_gbp=req.pension_relief_at_source_gbp,
-            gift_aid_gbp=req.gift_aid_gbp,
-            other_pre_tax_deductions_gbp=req.other_pre_tax_deductions_gbp,
-            partner_annual_income_gbp=req.partner_annual_income_gbp,
-            marriage_allowance_transfer=req.marriage_allowance_transfer,
-            council_tax_band=req.council_tax_band,
-            postcode=req.postcode,
-            council_name=req.council_name,
-            council_tax_annual_override_gbp=req.council_tax_annual_override_gbp,
-            uk_nation_for_income_tax=req.uk_nation_for_income_tax,
-            employment_type=req.employment_type,
-            savings_interest_gbp=req.savings_interest_gbp,
-            dividend_income_gbp=req.dividend_income_gbp,
-            student_loan_plan=req.student_loan_plan,
-            policy_overrides=req.policy_overrides,
-        )
-    )
-    services = services_impact(
-        ServicesImpactRequest(
-            annual_income_gbp=req.annual_income_gbp,
-            region=req.region,
-            tax_year=req.tax_year,
-            vatable_spend_ratio=req.vatable_spend_ratio,
-            pension_salary_sacrifice_gbp=req.pension_salary_sacrifice_gbp,
-            pension_relief_at_source_gbp=req.pension_relief_at_source_gbp,
-            gift_aid_gbp=req.gift_aid_gbp,
-            other_pre_tax_deductions_gbp=req.other_pre_tax_deductions_gbp,
-            partner_annual_income_gbp=req.partner_annual_income_gbp,
-            marriage_allowance_transfer=req.marriage_allowance_transfer,
-            council_tax_band=req.council_tax_band,
-            postcode=req.postcode,
-            council_name=req.council_name,
-            council_tax_annual_override_gbp=req.council_tax_annual_override_gbp,
-            uk_nation_for_income_tax=req.uk_nation_for_income_tax,
-            employment_type=req.employment_type,
-            savings_interest_gbp=req.savings_interest_gbp,
-            dividend_income_gbp=req.dividend_income_gbp,
-            student_loan_plan=req.student_loan_plan,
-            policy_overrides=req.policy_overrides,
-            page=1,
-            page_size=100,
-        )
-    )
-    regional = regional_flows(RegionalFlowsRequest(year="2022 to 2023", page=1, page_size=200))
+def _journalist_export(
+    req: JournalistExportRequest,
+    council_lookup: dict[str, str] | None,
+) -> JournalistExportResponse:
+    tax_req = _tax_request(req)
+    household = tax_req.model_dump(exclude={"compare_tax_year"})
+    tax = _tax_estimate(tax_req, council_lookup)
+    breakdown = _spending_breakdown(SpendingBreakdownRequest(**household), council_lookup)
+    services = _services_impact(ServicesImpactRequest(**household, page=1, page_size=100), council_lookup)
+    regional = _regional_flows(RegionalFlowsRequest(year="2022 to 2023", page=1, page_size=200))
 
     services_rows = [s.model_dump() for s in services.services]
     balances_rows = [b.model_dump() for b in regional.balances]
@@ -497,3 +1292,12 @@ def journalist_export(req: JournalistExportRequest) -> JournalistExportResponse:
             ],
         ),
     )
+
+
+@app.post("/journalist/export", response_model=JournalistExportResponse)
+async def journalist_export(req: JournalistExportRequest) -> JournalistExportResponse:
+    # Four estimates plus CSV rendering: batch work for the CPU executor.
+    async def compute() -> JournalistExportResponse:
+        return await CPU_EXECUTOR.run(_journalist_export, req, await _resolve_council(req))
+
+    return await ENDPOINT_FLIGHT.do(f"journalist_export:{req.model_dump_json()}", compute)
@@ -0,0 +1,133 @@
+"""Exact marginal rates from the piecewise-linear structure of the tax model.
+
+Every component in `api/tax_model.py` is linear in income between a known set
+of thresholds (allowance, band edges, taper, NI limits, loan thresholds, the
+savings and dividend cliffs). `model_breakpoints` lists those thresholds for a
+household; `marginal_rates` evaluates the unrounded model at interior points of
+each segment, so the slope it reports is exact rather than a £1 finite
+difference distorted by rounding to pence.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from api.tax_model import (
+    ADDITIONAL_RATE_INCOME_LIMIT_GBP,
+    HIGHER_RATE_INCOME_LIMIT_GBP,
+    MARRIAGE_ALLOWANCE_CREDIT_GBP,
+    PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP,
+    SCOTTISH_INCOME_TAX_BANDS,
+    SELF_EMPLOYED_NI_LOWER_PROFITS_LIMIT,
+    SELF_EMPLOYED_NI_UPPER_PROFITS_LIMIT,
+    STUDENT_LOAN_PLAN,
+    TaxParameters,
+)
+
+
+SLOPE_TOLERANCE = 1e-7
+STEP_TOLERANCE_GBP = 1e-4
+
+
+@dataclass(frozen=True)
+class MarginalRate:
+    rate: float
+    next_change_at_gbp: float | None
+    next_rate: float | None
+    # Jump in the component's value at the next change (e.g. the savings
+    # allowance cliff); zero where only the slope changes.
+    step_gbp: float
+
+
+def _taxable_income_crossings(p: TaxParameters, taxable_gbp: float) -> list[float]:
+    # Incomes at which taxable income reaches `taxable_gbp`, under each of the
+    # three personal-allowance regimes (full, tapering, fully withdrawn).
+    pa = p.personal_allowance
+    taper = PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP
+    return [pa + taxable_gbp, (taxable_gbp + pa + taper / 2.0) / 1.5, taxable_gbp]
+
+
+def model_breakpoints(
+    p: TaxParameters,
+    basic_rate_band_extension_gbp: float = 0.0,
+    student_loan_plan: str = "none",
+) -> list[float]:
+    """Adjusted incomes at which any component may change slope or jump.
+
+    A superset is fine: thresholds where nothing actually changes are skipped
+    by `marginal_rates`.
+    """
+    pa = p.personal_allowance
+    taper = PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP
+    basic_band = max(0.0, p.basic_rate_limit + basic_rate_band_extension_gbp)
+    points = [
+        pa,
+        taper,
+        taper + 2.0 * pa,
+        p.higher_rate_threshold,
+        # Higher band closes when the allowance tapers below threshold - basic band.
+        taper + 2.0 * (pa - p.higher_rate_threshold + basic_band),
+        p.higher_rate_threshold - basic_band,
+        p.ni_primary_threshold,
+        p.ni_upper_earnings_limit,
+        SELF_EMPLOYED_NI_LOWER_PROFITS_LIMIT,
+        SELF_EMPLOYED_NI_UPPER_PROFITS_LIMIT,
+        HIGHER_RATE_INCOME_LIMIT_GBP,
+        ADDITIONAL_RATE_INCOME_LIMIT_GBP,
+        *_taxable_income_crossings(p, basic_band),
+    ]
+    scottish_edge = 0.0
+    for width, _rate in SCOTTISH_INCOME_TAX_BANDS:
+        scottish_edge += width
+        points.extend(_taxable_income_crossings(p, scottish_edge))
+    # Marriage allowance: the credit is capped by the recipient's tax, which
+    # reaches the cap inside the starter (Scotland) or basic band.
+    first_scottish_rate = SCOTTISH_INCOME_TAX_BANDS[0][1]
+    for rate in (p.basic_rate, first_scottish_rate):
+        if rate > 0:
+            points.append(pa + MARRIAGE_ALLOWANCE_CREDIT_GBP / rate)
+    if student_loan_plan in STUDENT_LOAN_PLAN:
+        points.append(STUDENT_LOAN_PLAN[student_loan_plan][0])
+    return sorted({b for b in points if b > 0})
+
+
+def marginal_rates(
+    f: Callable[[float], dict[str, float]],
+    income_gbp: float,
+    breakpoints: Iterable[float],
+    horizon_gbp: float = 1_000_000.0,
+) -> dict[str, MarginalRate]:
+    """Right-hand marginal rate of every component of `f` at `income_gbp`.
+
+    `f` must be piecewise linear with kinks or jumps only at `breakpoints`.
+    Rates hold for the next pound earned; the next change is the first
+    breakpoint above `income_gbp` where a component's slope or value changes.
+    """
+    upcoming = sorted({round(b, 6) for b in breakpoints if b > income_gbp + 1e-6})
+    edges = [income_gbp, *upcoming, (upcoming[-1] if upcoming else income_gbp) + horizon_gbp]
+
+    def segment(lo: float, hi: float) -> tuple[float, dict[str, float], dict[str, float]]:
+        # Interior points only, so a jump at either edge never leaks into the slope.
+        h = (hi - lo) / 3.0
+        a, b = f(lo + h), f(lo + 2.0 * h)
+        return lo + h, a, {k: (b[k] - a[k]) / h for k in a}
+
+    anchor, values, slopes = segment(edges[0], edges[1])
+    first_slopes = slopes
+    found: dict[str, MarginalRate] = {}
+    for i in range(1, len(edges) - 1):
+        if len(found) == len(first_slopes):
+            break
+        edge = edges[i]
+        next_anchor, next_values, next_slopes = segment(edge, edges[i + 1])
+        for k, slope in first_slopes.items():
+            if k in found:
+                continue
+            left = values[k] + slopes[k] * (edge - anchor)
+            right = next_values[k] + next_slopes[k] * (edge - next_anchor)
+            step = right - left if abs(right - left) > STEP_TOLERANCE_GBP else 0.0
+            if abs(next_slopes[k] - slope) > SLOPE_TOLERANCE or step:
+                found[k] = MarginalRate(slope, edge, next_slopes[k], step)
+        anchor, values, slopes = next_anchor, next_values, next_slopes
+    return {k: found.get(k) or MarginalRate(slope, None, None, 0.0) for k, slope in first_slopes.items()}
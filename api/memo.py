@@ -0,0 +1,62 @@
+"""Memoized nodes of the estimate pipeline.
+
+Each node is a pure step keyed by its own inputs, with results of upstream
+nodes passed in as plain values. A request that differs from an earlier one
+in a single field misses only the nodes that field reaches: changing
+`vatable_spend_ratio` recomputes VAT but reuses income tax, NI, council tax
+and the rest. Caches are bounded LRUs (`functools.lru_cache`, so threads in
+the CPU executor can share them) and report hits and misses per node.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+NODE_CACHE_SIZE = 4096
+
+NODES: dict[str, MemoNode] = {}
+
+
+class MemoNode(Generic[T]):
+    __slots__ = ("name", "compute", "_cached")
+
+    def __init__(self, name: str, fn: Callable[..., T], maxsize: int = NODE_CACHE_SIZE) -> None:
+        self.name = name
+        # Uncached path, for callers whose inputs never repeat (marginal-rate
+        # sweeps) and would only churn the cache.
+        self.compute = fn
+        self._cached = lru_cache(maxsize=maxsize)(fn)
+
+    def __call__(self, *args: object, **kwargs: object) -> T:
+        return self._cached(*args, **kwargs)
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
+
+    def stats(self) -> dict[str, float]:
+        info = self._cached.cache_info()
+        calls = info.hits + info.misses
+        return {
+            "calls": calls,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / calls, 6) if calls else 0.0,
+            "size": info.currsize,
+        }
+
+
+def memo_node(name: str, maxsize: int = NODE_CACHE_SIZE) -> Callable[[Callable[..., T]], MemoNode[T]]:
+    def register(fn: Callable[..., T]) -> MemoNode[T]:
+        node = MemoNode(name, fn, maxsize)
+        NODES[name] = node
+        return node
+
+    return register
+
+
+def node_stats() -> dict[str, dict[str, float]]:
+    return {name: node.stats() for name, node in NODES.items()}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -64,6 +64,58 @@ class TaxEstimateResponse(BaseModel):
     uncertainty_range_gbp: dict[str, float] | None = None
 
 
+class TaxScenario(BaseModel):
+    label: str | None = Field(default=None, max_length=80)
+    tax_year: Literal["2023-24", "2024-25", "2025-26"] | None = None
+    policy_overrides: PolicyOverrides | None = None
+
+
+class TaxCompareRequest(BaseModel):
+    household: TaxEstimateRequest
+    scenarios: list[TaxScenario] = Field(min_length=1, max_length=20)
+
+
+class TaxScenarioResult(BaseModel):
+    label: str
+    tax_year: str
+    policy_simulation_active: bool
+    income_tax_gbp: float
+    national_insurance_gbp: float
+    vat_estimate_gbp: float
+    marriage_allowance_credit_gbp: float
+    total_estimated_tax_gbp: float
+    effective_tax_rate: float
+    take_home_gbp: float
+    uncertainty_range_gbp: dict[str, float]
+    delta_vs_baseline_gbp: float
+
+
+class TaxCompareResponse(BaseModel):
+    annual_income_gbp: float
+    household_context: dict[str, float | str]
+    scenarios: list[TaxScenarioResult]
+    labels: list[str]
+    # delta_matrix_gbp[i][j] = total of scenario j minus total of scenario i.
+    delta_matrix_gbp: list[list[float]]
+
+
+class MarginalComponent(BaseModel):
+    component: str
+    marginal_rate: float
+    next_change_at_gbp: float | None = None
+    distance_to_next_change_gbp: float | None = None
+    next_marginal_rate: float | None = None
+    step_at_next_change_gbp: float = 0.0
+
+
+class TaxMarginalResponse(BaseModel):
+    annual_income_gbp: float
+    tax_year: str
+    components: list[MarginalComponent]
+    total: MarginalComponent
+    assumptions: dict[str, float | str]
+
+
 class SpendingBreakdownRequest(BaseModel):
     annual_income_gbp: float = Field(gt=0)
     region: str = Field(default="England")
@@ -115,6 +167,10 @@ class ServicesImpactRequest(BaseModel):
     revenue_year: Literal["2022 to 2023"] = "2022 to 2023"
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
+    # `next_cursor` from the previous page; takes precedence over `page`.
+    cursor: str | None = Field(default=None, max_length=100)
+    # Keep services whose label has a word starting with each query word.
+    search: str | None = Field(default=None, max_length=100)
     pension_salary_sacrifice_gbp: float = Field(default=0.0, ge=0.0)
     pension_relief_at_source_gbp: float = Field(default=0.0, ge=0.0)
     gift_aid_gbp: float = Field(default=0.0, ge=0.0)
@@ -133,6 +189,32 @@ class ServicesImpactRequest(BaseModel):
     policy_overrides: PolicyOverrides | None = None
 
 
+class SessionOpenRequest(ServicesImpactRequest):
+    # Rows in the session's spending breakdown (as `/spending/breakdown`).
+    top_n: int = Field(default=12, ge=1, le=50)
+
+
+class SessionOpenResponse(BaseModel):
+    session_id: str
+    idle_timeout_s: float
+    seq: int
+    # Every output, keyed `tax.<field>`, `breakdown.<field>` or `services.<field>`.
+    outputs: dict[str, Any]
+
+
+class SessionDeltaRequest(BaseModel):
+    session_id: str = Field(max_length=64)
+    # Changed `SessionOpenRequest` fields only.
+    fields: dict[str, Any] = Field(max_length=40)
+
+
+class SessionDeltaResponse(BaseModel):
+    session_id: str
+    seq: int
+    # Output keys whose value changed; their values go to the session stream.
+    changed: list[str]
+
+
 class ServicesImpactResponse(BaseModel):
     total_uk_tax_revenue_m_gbp: float
     user_total_tax_gbp: float
@@ -143,6 +225,129 @@ class ServicesImpactResponse(BaseModel):
     page_size: int
     total_items: int
     services: list[ServiceContribution]
+    next_cursor: str | None = None
+
+
+class BatchAttributionRequest(BaseModel):
+    household_totals_gbp: list[Annotated[float, Field(ge=0.0)]] = Field(min_length=1, max_length=1_000_000)
+    spending_year: Literal["2024-25"] = "2024-25"
+    revenue_year: Literal["2022 to 2023"] = "2022 to 2023"
+    top_k: int | None = Field(default=None, ge=1, le=100)
+    format: Literal["json", "ndjson"] = "json"
+
+
+class BatchAttributionResponse(BaseModel):
+    total_uk_tax_revenue_m_gbp: float
+    spending_year: str
+    revenue_year: str
+    function_labels: list[str]
+    spending_amount_m_gbp: list[float]
+    household_totals_gbp: list[float]
+    # contributions_gbp[i][j]: household i's contribution to function_labels[j].
+    contributions_gbp: list[list[float]]
+
+
+class SpendingTreeRequest(BaseModel):
+    # None returns the root (Total Managed Expenditure).
+    node_id: str | None = Field(default=None, max_length=200)
+    user_total_tax_gbp: float = Field(default=0.0, ge=0.0)
+    spending_year: Literal["2024-25"] = "2024-25"
+    revenue_year: Literal["2022 to 2023"] = "2022 to 2023"
+
+
+class SpendingTreeNode(BaseModel):
+    id: str
+    label: str
+    code: str | None
+    row_type: str
+    amount_m_gbp: float
+    children_total_m_gbp: float | None
+    share_of_parent: float
+    share_of_total_expenditure: float
+    share_of_user_tax: float
+    user_contribution_gbp: float
+    child_count: int
+
+
+class SpendingTreeResponse(BaseModel):
+    total_uk_tax_revenue_m_gbp: float
+    user_total_tax_gbp: float
+    spending_year: str
+    revenue_year: str
+    # Ancestors of the requested node, root first.
+    path: list[SpendingTreeNode]
+    node: SpendingTreeNode
+    children: list[SpendingTreeNode]
+
+
+class PostcodeResolveRequest(BaseModel):
+    postcodes: list[Annotated[str, Field(max_length=16)]] = Field(min_length=1, max_length=100_000)
+
+
+class PostcodeCouncil(BaseModel):
+    postcode: str
+    council_name: str
+    region: str
+    country: str
+
+
+class PostcodeResolveResponse(BaseModel):
+    # One entry per requested postcode, in request order; null if unresolved.
+    results: list[PostcodeCouncil | None]
+    unique_postcodes: int
+    invalid_postcodes: int
+    from_cache: int
+    fetched: int
+    failed: int
+
+
+class PostcodeTypeaheadRequest(BaseModel):
+    prefix: str = Field(min_length=1, max_length=16)
+
+
+class PostcodeCouncilCandidate(BaseModel):
+    lad_code: str
+    council_name: str
+    region: str
+    postcode_count: int
+    share: float
+
+
+class PostcodeRegionCandidate(BaseModel):
+    region: str
+    postcode_count: int
+    share: float
+
+
+class PostcodeTypeaheadResponse(BaseModel):
+    prefix: str
+    # Longest prefix of `prefix` with known postcodes; empty when none match.
+    matched_prefix: str
+    # True when `matched_prefix` is a whole outward code or postcode sector.
+    complete: bool
+    postcode_count: int
+    # Most likely councils first, with their share of the matched postcodes.
+    councils: list[PostcodeCouncilCandidate]
+    regions: list[PostcodeRegionCandidate]
+
+
+class CouncilSearchRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=100)
+    limit: int = Field(default=5, ge=1, le=20)
+
+
+class CouncilMatch(BaseModel):
+    lad_code: str
+    council_name: str
+    region_code: str
+    region: str
+    # 1.0 for an exact name or code match, otherwise trigram similarity.
+    score: float
+
+
+class CouncilSearchResponse(BaseModel):
+    query: str
+    results: list[CouncilMatch]
 
 
 class RegionalBalance(BaseModel):
@@ -179,6 +384,25 @@ class RegionalFlowsResponse(BaseModel):
     flows: list[RegionalFlow]
 
 
+class OfficialBorrowingRequest(BaseModel):
+    reference_period: str | None = None
+    release_period: str | None = None
+
+
+class OfficialBorrowingRelease(BaseModel):
+    amount_b_gbp: float
+    release_period: str
+    reference_period: str
+    source_url: str
+    retrieved_at_utc: str | None = None
+
+
+class OfficialBorrowingResponse(BaseModel):
+    release: OfficialBorrowingRelease
+    reference_periods: list[str]
+    release_periods: list[str]
+
+
 class JournalistExportRequest(BaseModel):
     annual_income_gbp: float = Field(gt=0)
     region: str = Field(default="England")
@@ -210,3 +434,26 @@ class JournalistExportResponse(BaseModel):
     regional_flows: RegionalFlowsResponse
     services_csv: str
     regional_balances_csv: str
+
+
+class SpendingQueryRequest(BaseModel):
+    years: list[int] | None = None
+    levels: list[Literal["national", "region_or_country"]] | None = None
+    geographies: list[str] | None = None
+    functions: list[str] | None = None
+    departments: list[str] | None = None
+    source_tables: list[str] | None = None
+    min_amount_m_gbp: float | None = None
+    max_amount_m_gbp: float | None = None
+    group_by: list[Literal["year", "geography", "level", "function", "department", "source_table"]] = Field(
+        default_factory=list
+    )
+    limit: int = Field(default=100, ge=1, le=1000)
+
+
+class SpendingQueryResponse(BaseModel):
+    group_by: list[str]
+    total_rows: int
+    partitions_scanned: int
+    row_groups_scanned: int
+    rows: list[dict[str, str | int | float | None]]
@@ -0,0 +1,199 @@
+"""Prefix trie from partial postcodes to the councils and regions they cover.
+
+Built once from `postcode_sectors_2024.csv` (live postcode counts per postcode
+sector and council, produced by `data/scripts/build_postcode_sectors.py`).
+Keys are sectors such as `SW1A 1`; every trie node stores the council and
+region counts of everything below it, so a lookup is one step per typed
+character and never walks the subtree. Identical count tuples are shared
+between nodes, which keeps the deep, single-council part of the trie small.
+
+Before a space, a prefix covers every outward code it could still become
+(`M1` includes `M11`); after it, only that outward code.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Sequence
+
+from api.postcodes import normalize_postcode
+from api.snapshot import PROCESSED, load_table
+
+
+SECTORS_TABLE = "postcode_sectors_2024.csv"
+MAX_COUNCILS = 5
+# A district fallback names a council only when it holds most of the
+# postcodes under the matched prefix.
+DOMINANT_SHARE = 0.5
+
+_COUNTRY_BY_PREFIX = {"E": "England", "W": "Wales", "S": "Scotland", "N": "Northern Ireland"}
+
+
+@dataclass(frozen=True, slots=True)
+class CouncilCandidate:
+    lad_code: str
+    council_name: str
+    region: str
+    postcode_count: int
+    share: float
+
+
+@dataclass(frozen=True, slots=True)
+class RegionCandidate:
+    region: str
+    postcode_count: int
+    share: float
+
+
+@dataclass(frozen=True, slots=True)
+class SectorMatch:
+    # Longest prefix of the query present in the trie.
+    matched_prefix: str
+    # True when `matched_prefix` is a whole outward code or sector.
+    complete: bool
+    postcode_count: int
+    councils: tuple[CouncilCandidate, ...]
+    regions: tuple[RegionCandidate, ...]
+
+
+def normalize_prefix(text: str) -> str:
+    """Uppercase, single-spaced partial postcode; full postcodes gain their space."""
+    full = normalize_postcode(text)
+    if full is not None:
+        return full
+    cleaned = "".join(c for c in text.upper() if c.isalnum() or c.isspace())
+    return " ".join(cleaned.split())
+
+
+class PostcodeSectorTrie:
+    __slots__ = ("_children", "_totals", "_lads", "_regions", "_terminal", "_lad_info", "_region_names")
+
+    def __init__(
+        self,
+        sectors: Sequence[str],
+        lad_codes: Sequence[str],
+        lad_names: Sequence[str],
+        regions: Sequence[str],
+        counts: Sequence[int],
+    ) -> None:
+        lad_index: dict[str, int] = {}
+        region_index: dict[str, int] = {}
+        lad_info: list[tuple[str, str, int]] = []
+        region_names: list[str] = []
+        children: list[dict[str, int]] = [{}]
+        lad_counts: list[Counter[int]] = [Counter()]
+        region_counts: list[Counter[int]] = [Counter()]
+        terminal: set[int] = set()
+        for sector, lad, name, region, n in zip(sectors, lad_codes, lad_names, regions, counts):
+            if region not in region_index:
+                region_index[region] = len(region_names)
+                region_names.append(region)
+            r = region_index[region]
+            if lad not in lad_index:
+                lad_index[lad] = len(lad_info)
+                lad_info.append((lad, name, r))
+            li = lad_index[lad]
+            node = 0
+            lad_counts[0][li] += n
+            region_counts[0][r] += n
+            for position, char in enumerate(sector):
+                nxt = children[node].get(char)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][char] = nxt
+                    children.append({})
+                    lad_counts.append(Counter())
+                    region_counts.append(Counter())
+                node = nxt
+                lad_counts[node][li] += n
+                region_counts[node][r] += n
+                if position + 1 < len(sector) and sector[position + 1] == " ":
+                    terminal.add(node)
+            terminal.add(node)
+
+        shared: dict[tuple[tuple[int, int], ...], tuple[tuple[int, int], ...]] = {}
+
+        def ranked(counter: Counter[int], limit: int | None) -> tuple[tuple[int, int], ...]:
+            items = tuple(sorted(counter.items(), key=lambda kv: (-kv[1], kv[0]))[:limit])
+            return shared.setdefault(items, items)
+
+        self._children = children
+        self._totals = [sum(c.values()) for c in lad_counts]
+        self._lads = [ranked(c, MAX_COUNCILS) for c in lad_counts]
+        self._regions = [ranked(c, None) for c in region_counts]
+        self._terminal = frozenset(terminal)
+        self._lad_info = lad_info
+        self._region_names = region_names
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+    def match(self, prefix: str) -> SectorMatch | None:
+        """Candidates for the longest known prefix of `prefix`, or None if none is known."""
+        key = normalize_prefix(prefix)
+        node, depth = 0, 0
+        for char in key:
+            nxt = self._children[node].get(char)
+            if nxt is None:
+                break
+            node, depth = nxt, depth + 1
+        if depth == 0:
+            return None
+        total = self._totals[node]
+        return SectorMatch(
+            matched_prefix=key[:depth],
+            complete=node in self._terminal,
+            postcode_count=total,
+            councils=tuple(
+                CouncilCandidate(
+                    lad_code=self._lad_info[li][0],
+                    council_name=self._lad_info[li][1],
+                    region=self._region_names[self._lad_info[li][2]],
+                    postcode_count=n,
+                    share=n / total,
+                )
+                for li, n in self._lads[node]
+            ),
+            regions=tuple(
+                RegionCandidate(region=self._region_names[r], postcode_count=n, share=n / total)
+                for r, n in self._regions[node]
+            ),
+        )
+
+
+@lru_cache(maxsize=1)
+def postcode_sector_trie() -> PostcodeSectorTrie | None:
+    # The source directory is a manual download; without it there is no trie.
+    if not (PROCESSED / SECTORS_TABLE).exists():
+        return None
+    table = load_table(SECTORS_TABLE)
+    return PostcodeSectorTrie(
+        table.strings("sector"),
+        table.strings("lad_code"),
+        table.strings("lad_name"),
+        table.strings("region_name"),
+        [int(c) for c in table.strings("postcode_count")],
+    )
+
+
+def council_from_sector(postcode: str) -> dict[str, str] | None:
+    """Best guess at a postcode's council from its sector, shaped like a postcodes.io lookup.
+
+    Used when the full lookup is unavailable. The region is the dominant one
+    under the matched prefix; the council is named only when it is dominant too.
+    """
+    trie = postcode_sector_trie()
+    found = trie.match(postcode) if trie is not None else None
+    # Only a whole outward code or sector says anything about a full postcode.
+    if found is None or not found.complete or found.regions[0].share < DOMINANT_SHARE:
+        return None
+    top = found.councils[0]
+    dominant = top.share >= DOMINANT_SHARE
+    return {
+        "postcode": normalize_prefix(postcode),
+        "council_name": top.council_name if dominant else "",
+        "region": found.regions[0].region,
+        "country": _COUNTRY_BY_PREFIX.get(top.lad_code[:1], ""),
+    }
@@ -0,0 +1,294 @@
+"""Postcode to council lookup against postcodes.io, without blocking the event loop.
+
+The request is made over asyncio streams (HTTP/1.0, so the body is read to EOF
+without chunked decoding). A slow or unreachable upstream costs a suspended
+coroutine rather than a worker thread, and gives up after `LOOKUP_TIMEOUT_S`.
+
+Results are kept in a SQLite cache on disk (`WYTG_POSTCODE_CACHE`, empty to
+disable), shared by worker processes and across runs. `resolve_postcodes`
+handles batch workloads: it normalizes and deduplicates its input, answers
+what it can from the cache, and fetches the rest through the bulk endpoint in
+chunks of `BULK_CHUNK_SIZE`. Point `WYTG_POSTCODES_API` at
+`scripts/postcodes_stub.py` to run it against a local stand-in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import ssl
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Sequence
+from urllib.parse import quote, urlsplit
+
+
+ROOT = Path(__file__).resolve().parents[1]
+POSTCODES_API = os.environ.get("WYTG_POSTCODES_API", "https://api.postcodes.io")
+POSTCODE_CACHE_PATH = os.environ.get("WYTG_POSTCODE_CACHE", str(ROOT / "data" / "cache" / "postcodes.sqlite3"))
+LOOKUP_TIMEOUT_S = 8.0
+USER_AGENT = "where-your-taxes-go/0.1"
+# postcodes.io accepts at most 100 postcodes per bulk request.
+BULK_CHUNK_SIZE = 100
+BULK_CONCURRENCY = 4
+CACHE_TTL_S = 30 * 86400.0
+# Unknown postcodes are remembered for less time: new ones are issued monthly.
+CACHE_MISS_TTL_S = 86400.0
+# How long a cache read or write waits for another worker's write lock before
+# giving up (a read becomes a miss, a write is skipped). The cache runs on the
+# event loop, so this bounds how long a contended database can stall it.
+CACHE_BUSY_TIMEOUT_S = 0.05
+
+# A bulk answer for 100 postcodes is a few hundred KB; anything far larger is
+# not postcodes.io and is not read into memory.
+MAX_RESPONSE_BYTES = 4 << 20
+
+_POSTCODE = re.compile(r"^[A-Z]{1,2}[0-9][A-Z0-9]?[0-9][A-Z]{2}$")
+_STATUS_LINE = re.compile(rb"^HTTP/1\.[01] ([1-5][0-9]{2})(?: [^\r\n]*)?$")
+
+
+class UpstreamError(ValueError):
+    pass
+
+
+class UpstreamStatus(UpstreamError):
+    def __init__(self, status: int, url: str) -> None:
+        super().__init__(f"HTTP {status} from {url}")
+        self.status = status
+
+
+def normalize_postcode(postcode: str) -> str | None:
+    """Canonical `OUTWARD INWARD` form, or None if it cannot be a full UK postcode."""
+    compact = "".join(postcode.split()).upper()
+    if not _POSTCODE.match(compact):
+        return None
+    return f"{compact[:-3]} {compact[-3:]}"
+
+
+@lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    return ssl.create_default_context()
+
+
+async def _request_json(url: str, body: bytes | None, timeout_s: float) -> dict[str, object]:
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    head_lines = [
+        f"{'POST' if body is not None else 'GET'} {path} HTTP/1.0",
+        f"Host: {parts.netloc}",
+        f"User-Agent: {USER_AGENT}",
+        "Accept: application/json",
+        "Connection: close",
+    ]
+    if body is not None:
+        head_lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    request = ("\r\n".join(head_lines) + "\r\n\r\n").encode("ascii") + (body or b"")
+    async with asyncio.timeout(timeout_s):
+        reader, writer = await asyncio.open_connection(
+            parts.hostname,
+            parts.port or (443 if https else 80),
+            ssl=_ssl_context() if https else None,
+        )
+        try:
+            writer.write(request)
+            await writer.drain()
+            chunks: list[bytes] = []
+            size = 0
+            while chunk := await reader.read(65536):
+                size += len(chunk)
+                if size > MAX_RESPONSE_BYTES:
+                    raise UpstreamError(f"response from {url} exceeds {MAX_RESPONSE_BYTES} bytes")
+                chunks.append(chunk)
+        finally:
+            writer.close()
+            with suppress(OSError):
+                await writer.wait_closed()
+    head, _, payload = b"".join(chunks).partition(b"\r\n\r\n")
+    status_line = _STATUS_LINE.match(head.split(b"\r\n", 1)[0])
+    if status_line is None:
+        raise UpstreamError(f"malformed status line from {url}")
+    status = int(status_line.group(1))
+    if status != 200:
+        raise UpstreamStatus(status, url)
+    decoded = json.loads(payload)
+    if not isinstance(decoded, dict):
+        raise UpstreamError(f"response from {url} is not a JSON object")
+    return decoded
+
+
+async def fetch_json(url: str, timeout_s: float = LOOKUP_TIMEOUT_S) -> dict[str, object]:
+    return await _request_json(url, None, timeout_s)
+
+
+async def post_json(url: str, payload: object, timeout_s: float = LOOKUP_TIMEOUT_S) -> dict[str, object]:
+    return await _request_json(url, json.dumps(payload).encode("utf-8"), timeout_s)
+
+
+def council_from_result(result: dict[str, object], postcode: str) -> dict[str, str]:
+    return {
+        "postcode": str(result.get("postcode") or postcode),
+        "council_name": str(result.get("admin_district") or ""),
+        "region": str(result.get("region") or ""),
+        "country": str(result.get("country") or ""),
+    }
+
+
+class PostcodeCache:
+    """Postcode -> council results in SQLite; `None` records a postcode that does not exist."""
+
+    def __init__(self, path: Path) -> None:
+        import sqlite3
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Only the event loop thread uses the connection; each lookup is an
+        # indexed read of a few rows, cheap enough to run inline as long as
+        # it never waits long on a lock held by another worker.
+        self._db = sqlite3.connect(path, timeout=CACHE_BUSY_TIMEOUT_S, isolation_level=None, check_same_thread=False)
+        self._busy = sqlite3.OperationalError
+        self.busy_skips = 0
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS postcodes (postcode TEXT PRIMARY KEY, council TEXT, fetched_at REAL NOT NULL)"
+        )
+
+    def get_many(self, postcodes: Iterable[str]) -> dict[str, dict[str, str] | None]:
+        now = time.time()
+        found: dict[str, dict[str, str] | None] = {}
+        keys = list(postcodes)
+        try:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self._db.execute(
+                    f"SELECT postcode, council, fetched_at FROM postcodes WHERE postcode IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for postcode, council, fetched_at in rows:
+                    if now - fetched_at <= (CACHE_TTL_S if council is not None else CACHE_MISS_TTL_S):
+                        found[postcode] = json.loads(council) if council is not None else None
+        except self._busy:
+            # Locked by another worker: what was not read counts as a miss.
+            self.busy_skips += 1
+        return found
+
+    def put_many(self, results: dict[str, dict[str, str] | None]) -> None:
+        now = time.time()
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO postcodes VALUES (?, ?, ?)",
+                [(k, json.dumps(v) if v is not None else None, now) for k, v in results.items()],
+            )
+        except self._busy:
+            # Locked by another worker: the results are fetched again next time.
+            self.busy_skips += 1
+
+
+@lru_cache(maxsize=1)
+def postcode_cache() -> PostcodeCache | None:
+    if not POSTCODE_CACHE_PATH:
+        return None
+    import sqlite3
+
+    try:
+        return PostcodeCache(Path(POSTCODE_CACHE_PATH))
+    except (sqlite3.Error, OSError):
+        # Read-only deployments run uncached.
+        return None
+
+
+async def lookup_council_from_postcode(postcode: str) -> dict[str, str] | None:
+    key = normalize_postcode(postcode)
+    if key is None:
+        return None
+    cache = postcode_cache()
+    if cache is not None:
+        hit = cache.get_many([key])
+        if key in hit:
+            return hit[key]
+    try:
+        payload = await fetch_json(f"{POSTCODES_API}/postcodes/{quote(key)}")
+    except UpstreamStatus as exc:
+        if exc.status == 404 and cache is not None:
+            cache.put_many({key: None})
+        return None
+    except (OSError, TimeoutError, ValueError, IndexError):
+        return None
+    result = payload.get("result")
+    if not isinstance(result, dict):
+        return None  # Not a postcodes.io answer; not cached.
+    council = council_from_result(result, key)
+    if cache is not None:
+        cache.put_many({key: council})
+    return council
+
+
+@dataclass(frozen=True)
+class BulkResolution:
+    # One entry per input postcode, in input order.
+    results: list[dict[str, str] | None]
+    unique: int
+    invalid: int
+    from_cache: int
+    fetched: int
+    # Unique postcodes whose bulk request failed; not cached, retried next time.
+    failed: int
+
+
+async def _fetch_bulk(chunk: list[str], limit: asyncio.Semaphore) -> dict[str, dict[str, str] | None] | None:
+    async with limit:
+        try:
+            payload = await post_json(f"{POSTCODES_API}/postcodes", {"postcodes": chunk})
+        except (OSError, TimeoutError, ValueError, IndexError):
+            return None
+    out: dict[str, dict[str, str] | None] = {}
+    items = payload.get("result")
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        key = normalize_postcode(str(item.get("query") or ""))
+        if key is None:
+            continue
+        result = item.get("result")
+        out[key] = council_from_result(result, key) if isinstance(result, dict) else None
+    return out
+
+
+async def resolve_postcodes(
+    postcodes: Sequence[str],
+    chunk_size: int = BULK_CHUNK_SIZE,
+    concurrency: int = BULK_CONCURRENCY,
+) -> BulkResolution:
+    keys = [normalize_postcode(p) for p in postcodes]
+    unique = {k for k in keys if k is not None}
+    cache = postcode_cache()
+    resolved = cache.get_many(unique) if cache is not None else {}
+    from_cache = len(resolved)
+
+    missing = sorted(unique - resolved.keys())
+    limit = asyncio.Semaphore(concurrency)
+    chunks = [missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    fetched: dict[str, dict[str, str] | None] = {}
+    failed = 0
+    for chunk, part in zip(chunks, await asyncio.gather(*(_fetch_bulk(c, limit) for c in chunks))):
+        if part is None:
+            failed += len(chunk)
+            continue
+        fetched.update(part)
+    if cache is not None and fetched:
+        cache.put_many(fetched)
+    resolved.update(fetched)
+    return BulkResolution(
+        results=[resolved.get(k) if k is not None else None for k in keys],
+        unique=len(unique),
+        invalid=sum(1 for k in keys if k is None),
+        from_cache=from_cache,
+        fetched=len(fetched),
+        failed=failed,
+    )
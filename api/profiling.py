@@ -0,0 +1,276 @@
+"""Opt-in sampling profiler for slow requests.
+
+With `WYTG_PROFILE_DIR` set, a background thread samples the Python stacks of
+the threads serving requests every `WYTG_PROFILE_INTERVAL_MS` while any
+request is in flight. Those are the event loop thread the request arrived on
+and the CPU executor workers, skipping workers that are idle. Samples are
+counted per request. A request is written out when it took at least
+`WYTG_PROFILE_SLOW_MS`, or when it was picked by the `WYTG_PROFILE_RATE`
+sampling fraction. Other requests' samples are dropped.
+
+Each profile is a collapsed-stack file (`frame;frame;frame count` per line),
+which `flamegraph.pl`, inferno and speedscope read directly. The root frame is
+the route and the second frame is the thread. The file name carries the end
+time, duration, route and a hash of the canonical request key, so repeats of
+the same slow request group together. Only the newest `WYTG_PROFILE_KEEP`
+files are kept.
+
+Samples are wall clock, so waiting (a postcodes.io call, an idle event loop)
+shows up as well as work. Requests sharing the event loop run interleaved,
+so a sample of the loop thread is counted for every request in flight on it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import partial
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+PROFILE_DIR = os.environ.get("WYTG_PROFILE_DIR", "")
+PROFILE_SLOW_MS = float(os.environ.get("WYTG_PROFILE_SLOW_MS", "250"))
+PROFILE_RATE = float(os.environ.get("WYTG_PROFILE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.environ.get("WYTG_PROFILE_INTERVAL_MS", "10"))
+PROFILE_KEEP = int(os.environ.get("WYTG_PROFILE_KEEP", "200"))
+MAX_STACK_DEPTH = 128
+SUFFIX = ".collapsed"
+_POOL_MODULE = os.path.join("concurrent", "futures", "thread.py")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_CURRENT: ContextVar[RequestProfile | None] = ContextVar("wytg_request_profile", default=None)
+
+
+def request_key_hash(key: str | bytes) -> str:
+    data = key.encode("utf-8") if isinstance(key, str) else key
+    return hashlib.sha1(data).hexdigest()[:12]
+
+
+def tag_request(key: str) -> None:
+    """Name the request being profiled by its canonical key, if one is."""
+    profile = _CURRENT.get()
+    if profile is not None:
+        profile.key = request_key_hash(key)
+
+
+class RequestProfile:
+    __slots__ = ("route", "thread", "started", "sampled", "key", "stacks", "samples")
+
+    def __init__(self, route: str, thread: int, sampled: bool) -> None:
+        self.route = route
+        self.thread = thread
+        self.started = time.perf_counter()
+        self.sampled = sampled
+        self.key: str | None = None
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+
+_labels: dict[CodeType, str] = {}
+
+
+def _label(code: CodeType) -> str:
+    label = _labels.get(code)
+    if label is None:
+        path = Path(code.co_filename)
+        try:
+            where = path.relative_to(ROOT).as_posix()
+        except ValueError:
+            where = f"{path.parent.name}/{path.name}"
+        label = f"{code.co_qualname} ({where}:{code.co_firstlineno})".replace(";", ":")
+        _labels[code] = label
+    return label
+
+
+def collapse(frame: FrameType | None) -> list[str]:
+    """Frame labels from the outermost call to `frame`."""
+    labels: list[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _idle_worker(frame: FrameType) -> bool:
+    # A pool thread with nothing to do sits in `_worker`, blocked on its queue.
+    return frame.f_code.co_name == "_worker" and frame.f_code.co_filename.endswith(_POOL_MODULE)
+
+
+class SlowRequestProfiler:
+    def __init__(
+        self,
+        directory: str = PROFILE_DIR,
+        slow_ms: float = PROFILE_SLOW_MS,
+        rate: float = PROFILE_RATE,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+        keep: int = PROFILE_KEEP,
+        thread_prefixes: tuple[str, ...] = (),
+    ) -> None:
+        self.directory = Path(directory) if directory else None
+        self.slow_s = slow_ms / 1000
+        self.rate = rate
+        self.interval_s = max(interval_ms, 1.0) / 1000
+        self.keep = max(keep, 1)
+        self.thread_prefixes = thread_prefixes
+        self.observed = 0
+        self.written = 0
+        self.removed = 0
+        self.ticks = 0
+        self._active: set[RequestProfile] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._files: deque[Path] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def begin(self, route: str) -> RequestProfile:
+        profile = RequestProfile(route, threading.get_ident(), random.random() < self.rate)
+        with self._lock:
+            self._active.add(profile)
+            self._wake.set()
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="wytg-profiler", daemon=True)
+                self._sampler.start()
+        self.observed += 1
+        return profile
+
+    def end(self, profile: RequestProfile, fallback_key: Callable[[], bytes]) -> Path | None:
+        elapsed = time.perf_counter() - profile.started
+        with self._lock:
+            self._active.discard(profile)
+            if not self._active:
+                self._wake.clear()
+        if (elapsed < self.slow_s and not profile.sampled) or not profile.stacks:
+            return None
+        return self._write(profile, profile.key or request_key_hash(fallback_key()), elapsed)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval_s)
+            self._sample()
+
+    def _sample(self) -> None:
+        with self._lock:
+            threads = {profile.thread for profile in self._active}
+        if not threads:
+            return
+        # Stacks are captured and collapsed without the lock, so the event
+        # loop's begin()/end() never wait on a stack walk.
+        frames = sys._current_frames()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        workers = []
+        for ident, name in names.items():
+            frame = frames.get(ident)
+            if frame is not None and name.startswith(self.thread_prefixes) and not _idle_worker(frame):
+                workers.append(";".join([name, *collapse(frame)]))
+        loops = {
+            ident: ";".join([names.get(ident, "loop"), *collapse(frames[ident])])
+            for ident in threads
+            if ident in frames
+        }
+        del frames
+        # The lock is held only to add counts, so a request never ends (and
+        # has its counts written) while a sample is being added to them.
+        # Requests that began since the snapshot get no share of it.
+        with self._lock:
+            for profile in self._active:
+                stack = loops.get(profile.thread)
+                if stack is None:
+                    continue
+                profile.stacks[stack] += 1
+                for worker in workers:
+                    profile.stacks[worker] += 1
+                profile.samples += 1
+            self.ticks += 1
+
+    def _write(self, profile: RequestProfile, key: str, elapsed: float) -> Path:
+        assert self.directory is not None
+        if self._files is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._files = deque(sorted(self.directory.glob(f"*{SUFFIX}")))
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        millis = int(time.time() * 1000) % 1000
+        slug = profile.route.strip("/").replace("/", "_") or "root"
+        path = self.directory / f"{stamp}{millis:03d}-{slug}-{key}-{elapsed * 1000:.0f}ms{SUFFIX}"
+        root = profile.route.replace(";", ":")
+        # Slow requests are rare and a profile is a few KB, so it is written
+        # inline rather than handed to another thread.
+        path.write_text(
+            "".join(f"{root};{stack} {count}\n" for stack, count in profile.stacks.most_common()),
+            encoding="utf-8",
+        )
+        self.written += 1
+        self._files.append(path)
+        while len(self._files) > self.keep:
+            self._files.popleft().unlink(missing_ok=True)
+            self.removed += 1
+        return path
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_s * 1000,
+            "rate": self.rate,
+            "interval_ms": self.interval_s * 1000,
+            "observed": self.observed,
+            "in_flight": len(self._active),
+            "sampler_ticks": self.ticks,
+            "written": self.written,
+            "removed": self.removed,
+            "keep": self.keep,
+        }
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, profiler: SlowRequestProfiler, routes: frozenset[str]) -> None:
+        self.app = app
+        self.profiler = profiler
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.profiler.enabled or scope["type"] != "http" or scope["path"] not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        body: list[bytes] = []
+
+        async def receive_body() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.append(message.get("body", b""))
+            return message
+
+        profile = self.profiler.begin(scope["path"])
+        token = _CURRENT.set(profile)
+        try:
+            await self.app(scope, receive_body, send)
+        finally:
+            _CURRENT.reset(token)
+            self.profiler.end(profile, partial(_fallback_key, scope, body))
+
+
+def _fallback_key(scope: Scope, chunks: list[bytes]) -> bytes:
+    # Handlers that coalesce tag the request with their validated key; for the
+    # rest, JSON bodies are keyed on their sorted form.
+    body = b"".join(chunks)
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        canonical = body
+    return scope["path"].encode("utf-8") + b"?" + scope.get("query_string", b"") + b"\n" + canonical
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import csv
+import re
+import sys
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 
+from api.snapshot import load_table
+
 
 ROOT = Path(__file__).resolve().parents[1]
 PROCESSED = ROOT / "data" / "processed"
@@ -24,7 +27,9 @@ TARGET_CODES = {
 }
 
 
-@dataclass(frozen=True)
+# Cached results are shared by every request, so they are immutable slotted
+# records (no per-instance dict) held in tuples, with region names interned.
+@dataclass(frozen=True, slots=True)
 class RegionBalance:
     geography_code: str
     geography_name: str
@@ -33,27 +38,30 @@ class RegionBalance:
     net_balance_m_gbp: float
 
 
-@lru_cache(maxsize=16)
-def _read_csv(path: str) -> tuple[dict[str, str], ...]:
-    with Path(path).open("r", encoding="utf-8", newline="") as f:
-        return tuple(csv.DictReader(f))
-
+@dataclass(frozen=True, slots=True)
+class RegionFlow:
+    origin_region: str
+    destination_region: str
+    value_m_gbp: float
 
-def compute_regional_balances(year: str = "2022 to 2023") -> list[RegionBalance]:
-    rev_rows = _read_csv(str((PROCESSED / "ons_regional_revenue_fye2023.csv").resolve()))
-    exp_rows = _read_csv(str((PROCESSED / "ons_regional_expenditure_fye2023.csv").resolve()))
 
-    rev = {
-        r["geography_code"]: (r["geography_name"], float(r["amount_m_gbp"]))
-        for r in rev_rows
-        if r["year"] == year and r["geography_code"] in TARGET_CODES
-    }
-    exp = {
-        r["geography_code"]: (r["geography_name"], float(r["amount_m_gbp"]))
-        for r in exp_rows
-        if r["year"] == year and r["geography_code"] in TARGET_CODES
+def _amounts_by_code(name: str, year: str) -> dict[str, tuple[str, float]]:
+    table = load_table(name)
+    years = table.strings("year")
+    codes = table.strings("geography_code")
+    names = table.strings("geography_name")
+    amounts = table.floats("amount_m_gbp")
+    return {
+        codes[i]: (names[i], float(amounts[i]))
+        for i in range(len(table))
+        if years[i] == year and codes[i] in TARGET_CODES
     }
 
+
+def compute_regional_balances(year: str = "2022 to 2023") -> list[RegionBalance]:
+    rev = _amounts_by_code("ons_regional_revenue_fye2023.csv", year)
+    exp = _amounts_by_code("ons_regional_expenditure_fye2023.csv", year)
+
     balances: list[RegionBalance] = []
     for code, (name, contrib) in rev.items():
         spending = exp.get(code, (name, 0.0))[1]
@@ -70,7 +78,7 @@ def compute_regional_balances(year: str = "2022 to 2023") -> list[RegionBalance]
     return balances
 
 
-def compute_flows(year: str = "2022 to 2023") -> list[dict[str, float | str]]:
+def compute_flows(year: str = "2022 to 2023") -> list[RegionFlow]:
     balances = compute_regional_balances(year=year)
     donors = [b for b in balances if b.net_balance_m_gbp > 0]
     recipients = [b for b in balances if b.net_balance_m_gbp < 0]
@@ -81,7 +89,7 @@ def compute_flows(year: str = "2022 to 2023") -> list[dict[str, float | str]]:
         return []
 
     transfer_total = min(total_surplus, total_deficit)
-    flows: list[dict[str, float | str]] = []
+    flows: list[RegionFlow] = []
     for d in donors:
         donor_weight = d.net_balance_m_gbp / total_surplus
         donor_transfer = transfer_total * donor_weight
@@ -91,66 +99,87 @@ def compute_flows(year: str = "2022 to 2023") -> list[dict[str, float | str]]:
             if value < 0.01:
                 continue
             flows.append(
-                {
-                    "origin_region": d.geography_name,
-                    "destination_region": r.geography_name,
-                    "value_m_gbp": round(value, 4),
-                }
+                RegionFlow(
+                    origin_region=sys.intern(d.geography_name),
+                    destination_region=sys.intern(r.geography_name),
+                    value_m_gbp=round(value, 4),
+                )
             )
-    flows.sort(key=lambda x: float(x["value_m_gbp"]), reverse=True)
+    flows.sort(key=lambda x: x.value_m_gbp, reverse=True)
     return flows
 
 
 def _read_precomputed(path: Path) -> list[dict[str, str]]:
-    with path.open("r", encoding="utf-8", newline="") as f:
-        return list(csv.DictReader(f))
+    return load_table(path.name).rows()
 
 
 @lru_cache(maxsize=8)
-def load_precomputed_balances(year: str = "2022 to 2023") -> list[RegionBalance]:
+def load_precomputed_balances(year: str = "2022 to 2023") -> tuple[RegionBalance, ...]:
     pre = PROCESSED / "regional_balances_2022_2023.csv"
     if pre.exists() and year == "2022 to 2023":
-        rows = _read_precomputed(pre)
-        return [
+        # Read column-wise from the snapshot rather than via per-row dicts.
+        table = load_table(pre.name)
+        years = table.strings("year")
+        codes = table.strings("geography_code")
+        names = table.strings("geography_name")
+        contributions = table.floats("contribution_m_gbp")
+        spending = table.floats("spending_m_gbp")
+        net = table.floats("net_balance_m_gbp")
+        return tuple(
             RegionBalance(
-                geography_code=r["geography_code"],
-                geography_name=r["geography_name"],
-                contribution_m_gbp=float(r["contribution_m_gbp"]),
-                spending_m_gbp=float(r["spending_m_gbp"]),
-                net_balance_m_gbp=float(r["net_balance_m_gbp"]),
+                geography_code=sys.intern(codes[i]),
+                geography_name=sys.intern(names[i]),
+                contribution_m_gbp=float(contributions[i]),
+                spending_m_gbp=float(spending[i]),
+                net_balance_m_gbp=float(net[i]),
             )
-            for r in rows
-            if r["year"] == year
-        ]
-    return compute_regional_balances(year=year)
+            for i in range(len(table))
+            if years[i] == year
+        )
+    return tuple(compute_regional_balances(year=year))
 
 
 @lru_cache(maxsize=8)
-def load_precomputed_flows(year: str = "2022 to 2023") -> list[dict[str, float | str]]:
+def load_precomputed_flows(year: str = "2022 to 2023") -> tuple[RegionFlow, ...]:
     pre = PROCESSED / "flows_2022_2023.csv"
     if pre.exists() and year == "2022 to 2023":
-        rows = _read_precomputed(pre)
-        return [
-            {
-                "origin_region": r["origin_region"],
-                "destination_region": r["destination_region"],
-                "value_m_gbp": float(r["value_m_gbp"]),
-            }
-            for r in rows
-            if r["year"] == year
-        ]
-    return compute_flows(year=year)
+        table = load_table(pre.name)
+        years = table.strings("year")
+        origins = table.strings("origin_region")
+        destinations = table.strings("destination_region")
+        values = table.floats("value_m_gbp")
+        return tuple(
+            RegionFlow(
+                origin_region=sys.intern(origins[i]),
+                destination_region=sys.intern(destinations[i]),
+                value_m_gbp=float(values[i]),
+            )
+            for i in range(len(table))
+            if years[i] == year
+        )
+    return tuple(compute_flows(year=year))
 
 
-@lru_cache(maxsize=2)
-def load_official_uk_borrowing() -> dict[str, str | float] | None:
-    path = PROCESSED / "official_uk_borrowing.csv"
-    if not path.exists():
-        return None
-    rows = _read_precomputed(path)
-    if not rows:
-        return None
-    row = rows[0]
+@dataclass(frozen=True, slots=True)
+class BorrowingRelease:
+    amount_b_gbp: float
+    release_period: str
+    reference_period: str
+    source_url: str
+    retrieved_at_utc: str
+
+
+@dataclass(frozen=True)
+class BorrowingHistory:
+    # Releases oldest first by publication date (`release_order`); the last
+    # one is the most recent, whatever order they were fetched in.
+    releases: tuple[BorrowingRelease, ...]
+    by_release: dict[tuple[str, str], BorrowingRelease]
+    latest_by_reference: dict[str, BorrowingRelease]
+    latest_by_release_period: dict[str, BorrowingRelease]
+
+
+def normalize_borrowing_row(row: dict[str, str]) -> BorrowingRelease:
     release_period = row.get("release_period", "").strip()
     reference_period = row.get("reference_period", "").strip()
     # Backward compatibility with older schema.
@@ -159,9 +188,74 @@ def load_official_uk_borrowing() -> dict[str, str | float] | None:
     if not release_period:
         source_url = row.get("source_url", "")
         release_period = source_url.rstrip("/").split("/")[-1] if source_url else ""
-    return {
-        "amount_b_gbp": float(row["amount_b_gbp"]),
-        "release_period": release_period or "Unknown release",
-        "reference_period": reference_period or "Unknown reference period",
-        "source_url": row["source_url"],
-    }
+    return BorrowingRelease(
+        amount_b_gbp=float(row["amount_b_gbp"]),
+        release_period=release_period or "Unknown release",
+        reference_period=reference_period or "Unknown reference period",
+        source_url=row["source_url"],
+        retrieved_at_utc=row.get("retrieved_at_utc", "").strip(),
+    )
+
+
+_MONTH_NAMES = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+_MONTHS = {name: i for i, name in enumerate(_MONTH_NAMES, start=1)}
+_RELEASE_PERIOD = re.compile(r"([a-z]+)\s*(\d{4})")
+
+
+def release_order(release: BorrowingRelease) -> tuple[int, int, str]:
+    """Sort key by bulletin month ("January 2026"); retrieval time breaks ties.
+
+    Releases whose period cannot be read sort before every dated one.
+    """
+    for text in (release.release_period, release.source_url.rstrip("/").rsplit("/", 1)[-1]):
+        match = _RELEASE_PERIOD.fullmatch(text.strip().lower())
+        if match and match.group(1) in _MONTHS:
+            return int(match.group(2)), _MONTHS[match.group(1)], release.retrieved_at_utc
+    return 0, 0, release.retrieved_at_utc
+
+
+@lru_cache(maxsize=2)
+def load_official_borrowing_history() -> BorrowingHistory | None:
+    path = PROCESSED / "official_uk_borrowing.csv"
+    if not path.exists():
+        return None
+    # Stable sort: file order still settles releases of the same month.
+    releases = tuple(sorted((normalize_borrowing_row(r) for r in _read_precomputed(path)), key=release_order))
+    if not releases:
+        return None
+    by_release: dict[tuple[str, str], BorrowingRelease] = {}
+    latest_by_reference: dict[str, BorrowingRelease] = {}
+    latest_by_release_period: dict[str, BorrowingRelease] = {}
+    for r in releases:
+        by_release[(r.reference_period, r.release_period)] = r
+        latest_by_reference[r.reference_period] = r
+        latest_by_release_period[r.release_period] = r
+    return BorrowingHistory(
+        releases=releases,
+        by_release=by_release,
+        latest_by_reference=latest_by_reference,
+        latest_by_release_period=latest_by_release_period,
+    )
+
+
+def find_official_borrowing(
+    reference_period: str | None = None,
+    release_period: str | None = None,
+) -> BorrowingRelease | None:
+    history = load_official_borrowing_history()
+    if history is None:
+        return None
+    if reference_period and release_period:
+        return history.by_release.get((reference_period, release_period))
+    if reference_period:
+        return history.latest_by_reference.get(reference_period)
+    if release_period:
+        return history.latest_by_release_period.get(release_period)
+    return history.releases[-1]
+
+
+def load_official_uk_borrowing() -> BorrowingRelease | None:
+    return find_official_borrowing()
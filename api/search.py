@@ -0,0 +1,94 @@
+"""Search indexes over a fixed list of labels.
+
+`TokenPrefixIndex`: labels are split into lowercase word and number tokens
+once. The sorted vocabulary is searched with `bisect`, so a query touches only
+the tokens sharing its prefixes and the posting lists under them, never the
+labels themselves.
+
+`TrigramIndex`: labels are broken into character trigrams for typo-tolerant
+matching. A query scores only the labels sharing at least one trigram with
+it, by Dice similarity of the two trigram sets.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Sequence
+
+
+_FOOTNOTE = re.compile(r"\(\d+\)")
+_TOKEN = re.compile(r"\d+(?:\.\d+)*|[^\W\d_]+")
+
+
+def tokenize(text: str) -> list[str]:
+    # Footnote markers such as "(2), (3)" are not part of the label.
+    return _TOKEN.findall(_FOOTNOTE.sub(" ", text.lower()))
+
+
+class TokenPrefixIndex:
+    __slots__ = ("_size", "_vocab", "_postings")
+
+    def __init__(self, labels: Sequence[str]) -> None:
+        postings: dict[str, set[int]] = {}
+        for position, label in enumerate(labels):
+            for token in tokenize(label):
+                postings.setdefault(token, set()).add(position)
+        self._size = len(labels)
+        self._vocab = sorted(postings)
+        self._postings = [tuple(sorted(postings[t])) for t in self._vocab]
+
+    def _prefix(self, prefix: str) -> set[int]:
+        found: set[int] = set()
+        i = bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            found.update(self._postings[i])
+            i += 1
+        return found
+
+    def match(self, query: str) -> tuple[int, ...]:
+        """Positions (ascending) of labels where every query token prefixes some label token."""
+        tokens = tokenize(query)
+        if not tokens:
+            return tuple(range(self._size))
+        # Longest tokens first: they usually have the smallest posting sets.
+        tokens.sort(key=len, reverse=True)
+        matches = self._prefix(tokens[0])
+        for token in tokens[1:]:
+            if not matches:
+                break
+            matches &= self._prefix(token)
+        return tuple(sorted(matches))
+
+
+def trigrams(text: str) -> set[str]:
+    # Two leading pads make the first letters count most, which suits names
+    # typed from the start; one trailing pad marks a complete word.
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    __slots__ = ("_sizes", "_postings")
+
+    def __init__(self, labels: Sequence[str]) -> None:
+        postings: dict[str, list[int]] = {}
+        sizes = []
+        for position, label in enumerate(labels):
+            grams = trigrams(label)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self._sizes = tuple(sizes)
+        self._postings = {g: tuple(p) for g, p in postings.items()}
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """Up to `limit` (position, score) pairs, best first; scores are in (0, 1]."""
+        grams = trigrams(query)
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = [(p, 2.0 * n / (len(grams) + self._sizes[p])) for p, n in shared.items()]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
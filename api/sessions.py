@@ -0,0 +1,138 @@
+"""Live-update sessions for the interactive calculator.
+
+A session holds one validated household, its postcode lookup and the latest
+outputs, flattened to `section.field` keys. The client sends field deltas;
+only output fields whose value changed are pushed to its event stream.
+Bursts are coalesced per listener: a stream that falls behind receives the
+latest value of each changed field, never a backlog.
+
+Sessions live in process memory and expire after `SESSION_IDLE_TIMEOUT_S`
+without a delta. With several workers, a session is only known to the worker
+that opened it, so deployments need sticky routing for these endpoints.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Mapping
+
+from pydantic import BaseModel
+
+
+SESSION_IDLE_TIMEOUT_S = float(os.environ.get("WYTG_SESSION_IDLE_S", "300"))
+MAX_SESSIONS = int(os.environ.get("WYTG_SESSION_MAX", "5000"))
+# Streams send a comment line this often so proxies keep them open.
+KEEPALIVE_S = 15.0
+
+
+class SessionLimit(Exception):
+    pass
+
+
+def flatten_outputs(sections: Mapping[str, BaseModel]) -> dict[str, object]:
+    return {
+        f"{name}.{key}": value
+        for name, model in sections.items()
+        for key, value in model.model_dump(mode="json").items()
+    }
+
+
+def changed_outputs(old: Mapping[str, object], new: Mapping[str, object]) -> dict[str, object]:
+    return {key: value for key, value in new.items() if key not in old or old[key] != value}
+
+
+class Listener:
+    __slots__ = ("pending", "seq", "wake")
+
+    def __init__(self) -> None:
+        self.pending: dict[str, object] = {}
+        self.seq = 0
+        self.wake = asyncio.Event()
+
+
+@dataclass(eq=False)
+class Session:
+    id: str
+    household: BaseModel
+    council_lookup: dict[str, str] | None
+    sections: dict[str, BaseModel]
+    outputs: dict[str, object]
+    last_active: float = field(default_factory=time.monotonic)
+    seq: int = 0
+    closed: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    listeners: set[Listener] = field(default_factory=set)
+
+    def publish(self, changed: dict[str, object]) -> None:
+        self.seq += 1
+        for listener in self.listeners:
+            listener.pending.update(changed)
+            listener.seq = self.seq
+            listener.wake.set()
+
+    def close(self) -> None:
+        self.closed = True
+        for listener in self.listeners:
+            listener.wake.set()
+
+
+class SessionStore:
+    def __init__(self, idle_timeout_s: float = SESSION_IDLE_TIMEOUT_S, max_sessions: int = MAX_SESSIONS) -> None:
+        self.idle_timeout_s = idle_timeout_s
+        self.max_sessions = max_sessions
+        self._sessions: dict[str, Session] = {}
+        self.opened = 0
+        self.expired = 0
+        self.deltas = 0
+
+    def expired_at(self, session: Session, now: float) -> bool:
+        return now - session.last_active > self.idle_timeout_s
+
+    def sweep(self) -> None:
+        now = time.monotonic()
+        for session_id in [s.id for s in self._sessions.values() if self.expired_at(s, now)]:
+            self._sessions.pop(session_id).close()
+            self.expired += 1
+
+    def open(
+        self,
+        household: BaseModel,
+        council_lookup: dict[str, str] | None,
+        sections: dict[str, BaseModel],
+    ) -> Session:
+        if len(self._sessions) >= self.max_sessions:
+            self.sweep()
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionLimit(f"Session limit reached ({self.max_sessions})")
+        session = Session(
+            id=secrets.token_urlsafe(16),
+            household=household,
+            council_lookup=council_lookup,
+            sections=sections,
+            outputs=flatten_outputs(sections),
+        )
+        self._sessions[session.id] = session
+        self.opened += 1
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        session = self._sessions.get(session_id)
+        if session is not None and self.expired_at(session, time.monotonic()):
+            self._sessions.pop(session_id).close()
+            self.expired += 1
+            return None
+        return session
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "active": len(self._sessions),
+            "opened": self.opened,
+            "expired": self.expired,
+            "deltas": self.deltas,
+            "streams": sum(len(s.listeners) for s in self._sessions.values()),
+            "idle_timeout_s": self.idle_timeout_s,
+        }
@@ -0,0 +1,299 @@
+"""Read-only, memory-mapped snapshot of the processed CSVs served by the API.
+
+The snapshot is a single binary file built once (by `data/scripts/run_pipeline.py`,
+`python -m api.snapshot`, or the API's startup when it is missing or stale)
+and mapped read-only by every worker, so `uvicorn --workers N` shares one copy
+of the data in the page cache instead of parsing every CSV N times.
+
+Layout (little-endian):
+
+    magic (8 bytes) | version (u32) | header length (u32) | header JSON | pad to 8
+    column buffers, each 8-byte aligned
+
+Every column is stored as strings (int64 end offsets + UTF-8 blob); numeric
+`*_gbp` columns are additionally stored as float64 arrays that are read through
+`memoryview` without copying.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized across processes.
+    fcntl = None
+
+
+ROOT = Path(__file__).resolve().parents[1]
+PROCESSED = ROOT / "data" / "processed"
+SNAPSHOT_PATH = ROOT / "data" / "snapshot" / "api_snapshot.bin"
+MAGIC = b"WYTGSNAP"
+VERSION = 1
+PREFIX = struct.Struct("<8sII")
+ALIGN = 8
+SNAPSHOT_SOURCES = (
+    "functional_spending_2024_25.csv",
+    "ons_regional_revenue_fye2023.csv",
+    "ons_regional_expenditure_fye2023.csv",
+    "regional_balances_2022_2023.csv",
+    "flows_2022_2023.csv",
+    "official_uk_borrowing.csv",
+    "council_to_region_2024.csv",
+    "council_tax_band_d_2024_25.csv",
+    "postcode_sectors_2024.csv",
+)
+NUMERIC_SUFFIX = "_gbp"
+
+
+class StringColumn:
+    """Lazily decoded string column backed by the mapped buffer."""
+
+    __slots__ = ("_ends", "_blob")
+
+    def __init__(self, ends: memoryview, blob: memoryview) -> None:
+        self._ends = ends
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self._ends)
+        start = self._ends[i - 1] if i > 0 else 0
+        return bytes(self._blob[start : self._ends[i]]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self._ends)):
+            yield self[i]
+
+
+class MappedTable:
+    __slots__ = ("name", "columns", "_rows", "_strings", "_floats")
+
+    def __init__(self, name: str, buf: memoryview, spec: dict[str, object]) -> None:
+        self.name = name
+        self._rows = int(spec["rows"])  # type: ignore[arg-type]
+        self.columns: tuple[str, ...] = tuple(spec["columns"])  # type: ignore[arg-type]
+        self._strings: dict[str, StringColumn] = {}
+        self._floats: dict[str, memoryview] = {}
+        for col, (ends_off, blob_off, blob_len) in spec["strings"].items():  # type: ignore[union-attr]
+            ends = buf[ends_off : ends_off + 8 * self._rows].cast("q")
+            self._strings[col] = StringColumn(ends, buf[blob_off : blob_off + blob_len])
+        for col, off in spec["floats"].items():  # type: ignore[union-attr]
+            self._floats[col] = buf[off : off + 8 * self._rows].cast("d")
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def strings(self, column: str) -> StringColumn:
+        return self._strings[column]
+
+    def floats(self, column: str) -> memoryview:
+        return self._floats[column]
+
+    def rows(self) -> list[dict[str, str]]:
+        cols = [(c, self._strings[c]) for c in self.columns]
+        return [{c: values[i] for c, values in cols} for i in range(self._rows)]
+
+
+class MemoryTable:
+    """CSV-backed table with the same accessors, used when no snapshot is available."""
+
+    __slots__ = ("name", "columns", "_rows", "_strings", "_floats")
+
+    def __init__(self, name: str, rows: list[dict[str, str]], columns: tuple[str, ...]) -> None:
+        self.name = name
+        self.columns = columns
+        self._rows = len(rows)
+        self._strings = {c: tuple(r[c] for r in rows) for c in columns}
+        self._floats = {c: tuple(float(v) for v in self._strings[c]) for c in _numeric_columns(columns, rows)}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def strings(self, column: str) -> tuple[str, ...]:
+        return self._strings[column]
+
+    def floats(self, column: str) -> tuple[float, ...]:
+        return self._floats[column]
+
+    def rows(self) -> list[dict[str, str]]:
+        return [{c: self._strings[c][i] for c in self.columns} for i in range(self._rows)]
+
+
+def _numeric_columns(columns: tuple[str, ...], rows: list[dict[str, str]]) -> list[str]:
+    numeric = []
+    for c in columns:
+        if not c.endswith(NUMERIC_SUFFIX):
+            continue
+        try:
+            for r in rows:
+                float(r[c])
+        except ValueError:
+            continue
+        numeric.append(c)
+    return numeric
+
+
+def _read_source(name: str) -> tuple[list[dict[str, str]], tuple[str, ...]]:
+    with (PROCESSED / name).open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        return rows, tuple(reader.fieldnames or ())
+
+
+def _source_stamp(name: str) -> list[int]:
+    st = (PROCESSED / name).stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _pad(out: bytearray) -> None:
+    out.extend(b"\0" * (-len(out) % ALIGN))
+
+
+def build_snapshot(path: Path = SNAPSHOT_PATH) -> Path:
+    body = bytearray()
+    tables: dict[str, object] = {}
+    for name in SNAPSHOT_SOURCES:
+        if not (PROCESSED / name).exists():
+            continue
+        rows, columns = _read_source(name)
+        strings: dict[str, list[int]] = {}
+        floats: dict[str, int] = {}
+        for c in columns:
+            encoded = [r[c].encode("utf-8") for r in rows]
+            ends, total = [], 0
+            for e in encoded:
+                total += len(e)
+                ends.append(total)
+            ends_off = len(body)
+            body.extend(struct.pack(f"<{len(ends)}q", *ends))
+            blob_off = len(body)
+            body.extend(b"".join(encoded))
+            strings[c] = [ends_off, blob_off, total]
+            _pad(body)
+        for c in _numeric_columns(columns, rows):
+            floats[c] = len(body)
+            body.extend(struct.pack(f"<{len(rows)}d", *(float(r[c]) for r in rows)))
+        tables[name] = {
+            "rows": len(rows),
+            "columns": list(columns),
+            "source": _source_stamp(name),
+            "strings": strings,
+            "floats": floats,
+        }
+
+    header = json.dumps({"tables": tables}, separators=(",", ":")).encode("utf-8")
+    head = bytearray(PREFIX.pack(MAGIC, VERSION, len(header)) + header)
+    _pad(head)
+    # Offsets in the header are relative to the end of the padded header.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(bytes(head) + bytes(body))
+    os.replace(tmp, path)
+    return path
+
+
+def _read_header(mm: mmap.mmap) -> tuple[dict[str, object], int]:
+    magic, version, header_len = PREFIX.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unsupported snapshot format")
+    start = PREFIX.size
+    header = json.loads(mm[start : start + header_len])
+    data_start = start + header_len
+    return header, data_start + (-data_start % ALIGN)
+
+
+def _is_fresh(header: dict[str, object]) -> bool:
+    tables = header["tables"]  # type: ignore[index]
+    for name in SNAPSHOT_SOURCES:
+        exists = (PROCESSED / name).exists()
+        if exists != (name in tables):
+            return False
+        if exists and tables[name]["source"] != _source_stamp(name):  # type: ignore[index]
+            return False
+    return True
+
+
+def snapshot_is_fresh(path: Path = SNAPSHOT_PATH) -> bool:
+    if not path.exists():
+        return False
+    try:
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header, _ = _read_header(mm)
+    except (ValueError, OSError, struct.error):
+        return False
+    return _is_fresh(header)
+
+
+def ensure_snapshot(path: Path = SNAPSHOT_PATH) -> None:
+    """Build the snapshot unless a fresh one exists; concurrent callers build once."""
+    if snapshot_is_fresh(path):
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(f"{path.name}.lock").open("w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        if not snapshot_is_fresh(path):
+            build_snapshot(path)
+
+
+class Snapshot:
+    __slots__ = ("_mm", "_tables")
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f:
+            # The mapping stays valid after the file object is closed.
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header, data_start = _read_header(self._mm)
+        if not _is_fresh(header):
+            self._mm.close()
+            raise ValueError("Snapshot is older than its source CSVs")
+        buf = memoryview(self._mm)[data_start:]
+        self._tables = {
+            name: MappedTable(name, buf, spec)  # type: ignore[arg-type]
+            for name, spec in header["tables"].items()  # type: ignore[union-attr]
+        }
+
+    def table(self, name: str) -> MappedTable | None:
+        return self._tables.get(name)
+
+
+@lru_cache(maxsize=1)
+def get_snapshot() -> Snapshot | None:
+    try:
+        ensure_snapshot()
+        return Snapshot(SNAPSHOT_PATH)
+    except (OSError, ValueError):
+        # Read-only deployments without a prebuilt snapshot fall back to CSVs.
+        return None
+
+
+@lru_cache(maxsize=16)
+def load_table(name: str) -> MappedTable | MemoryTable:
+    snapshot = get_snapshot()
+    table = snapshot.table(name) if snapshot is not None else None
+    if table is not None:
+        return table
+    rows, columns = _read_source(name)
+    return MemoryTable(name, rows, columns)
+
+
+def preload_tables() -> None:
+    for name in SNAPSHOT_SOURCES:
+        if (PROCESSED / name).exists():
+            load_table(name)
+
+
+if __name__ == "__main__":
+    out = build_snapshot(Path(sys.argv[1]) if len(sys.argv) > 1 else SNAPSHOT_PATH)
+    print(f"Wrote {out} ({out.stat().st_size} bytes)")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DATASET = ROOT / "data" / "normalized" / "spending"
+COLUMNS = ("year", "geography", "level", "function", "department", "amount_m_gbp", "source_table")
+
+
+@lru_cache(maxsize=1)
+def _spending_dataset() -> ds.Dataset:
+    if not DATASET.exists():
+        raise ValueError(f"Normalized spending dataset not found at {DATASET}")
+    return ds.dataset(DATASET, format="parquet", partitioning="hive")
+
+
+def _in_filter(column: str, values: list[str] | list[int] | None) -> ds.Expression | None:
+    if not values:
+        return None
+    if len(values) == 1:
+        return pc.field(column) == values[0]
+    return pc.field(column).isin(values)
+
+
+def build_filter(
+    years: list[int] | None = None,
+    levels: list[str] | None = None,
+    geographies: list[str] | None = None,
+    functions: list[str] | None = None,
+    departments: list[str] | None = None,
+    source_tables: list[str] | None = None,
+    min_amount_m_gbp: float | None = None,
+    max_amount_m_gbp: float | None = None,
+) -> ds.Expression | None:
+    parts = [
+        _in_filter("year", years),
+        _in_filter("level", levels),
+        _in_filter("geography", geographies),
+        _in_filter("function", functions),
+        _in_filter("department", departments),
+        _in_filter("source_table", source_tables),
+    ]
+    if min_amount_m_gbp is not None:
+        parts.append(pc.field("amount_m_gbp") >= min_amount_m_gbp)
+    if max_amount_m_gbp is not None:
+        parts.append(pc.field("amount_m_gbp") <= max_amount_m_gbp)
+    expr = None
+    for part in parts:
+        if part is not None:
+            expr = part if expr is None else expr & part
+    return expr
+
+
+def _scan(expr: ds.Expression | None, columns: list[str]) -> tuple[pa.Table, int, int]:
+    # Partition pruning happens in get_fragments; split_by_row_group then drops
+    # row groups whose min/max statistics cannot satisfy the filter, so only
+    # the surviving row groups are read from disk.
+    dataset = _spending_dataset()
+    tables: list[pa.Table] = []
+    partitions_scanned = 0
+    row_groups_scanned = 0
+    for fragment in dataset.get_fragments(filter=expr):
+        partitions_scanned += 1
+        for row_group in fragment.split_by_row_group(filter=expr, schema=dataset.schema):
+            row_groups_scanned += 1
+            tables.append(row_group.to_table(schema=dataset.schema, columns=columns, filter=expr))
+    if not tables:
+        return dataset.schema.empty_table().select(columns), partitions_scanned, row_groups_scanned
+    return pa.concat_tables(tables), partitions_scanned, row_groups_scanned
+
+
+def _largest_first(row: dict[str, object]) -> tuple[bool, float]:
+    # Null amounts (missing in a partition) sort last instead of failing.
+    amount = row["amount_m_gbp"]
+    return (amount is None, -float(amount) if amount is not None else 0.0)
+
+
+def query_spending(
+    group_by: list[str],
+    limit: int,
+    **filters: object,
+) -> dict[str, object]:
+    expr = build_filter(**filters)  # type: ignore[arg-type]
+    columns = [*group_by, "amount_m_gbp"] if group_by else list(COLUMNS)
+    table, partitions_scanned, row_groups_scanned = _scan(expr, columns)
+
+    if group_by:
+        grouped = table.group_by(group_by).aggregate([("amount_m_gbp", "sum"), ("amount_m_gbp", "count")])
+        rows = [
+            {
+                **{k: r[k] for k in group_by},
+                # A group whose amounts are all null sums to null.
+                "amount_m_gbp": None if r["amount_m_gbp_sum"] is None else round(float(r["amount_m_gbp_sum"]), 2),
+                "row_count": int(r["amount_m_gbp_count"]),
+            }
+            for r in grouped.to_pylist()
+        ]
+    else:
+        rows = table.to_pylist()
+    rows.sort(key=_largest_first)
+    return {
+        "group_by": group_by,
+        "total_rows": len(rows),
+        "partitions_scanned": partitions_scanned,
+        "row_groups_scanned": row_groups_scanned,
+        "rows": rows[:limit],
+    }
@@ -0,0 +1,186 @@
+"""Function -> sub-function spending tree built once from the PESA table.
+
+`functional_spending_2024_25.csv` lists sub-functions (and their `of which`
+breakdowns) followed by the `Total ...` row that closes each function, then
+the aggregates that make up Total Managed Expenditure. `spending_tree` turns
+that into an immutable tree with precomputed subtotals and shares, indexed by
+node id so a drill-down is a single dict lookup.
+
+Node ids are URL-safe slugs: functions and top-level rows use a bare slug
+(`social-protection`), rows inside a function are qualified by their parent
+(`social-protection/old-age/pensions`).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+from api.attribution import load_total_uk_revenue_m_gbp
+from api.snapshot import load_table
+
+
+# Published totals are rounded to the nearest £1m each.
+ROUNDING_TOLERANCE_M_GBP = 0.5
+
+_CODE = re.compile(r"^(\d+(?:\.\d+)?)\s+")
+_FOOTNOTES = re.compile(r"(\s*\(\d+\),?)+\s*$")
+
+
+@dataclass(frozen=True)
+class SpendingNode:
+    id: str
+    label: str
+    code: str | None
+    row_type: str
+    amount_m_gbp: float
+    parent_id: str | None
+    children: tuple[str, ...]
+    # Sum of the additive children (`of which` rows overlap their siblings and
+    # are excluded); None when there are none.
+    children_total_m_gbp: float | None
+    share_of_parent: float
+    share_of_total_expenditure: float
+    # Fraction of UK revenue this node spends, which is also the fraction of
+    # any household's tax attributed to it.
+    share_of_user_tax: float
+
+
+@dataclass(frozen=True)
+class SpendingTree:
+    spending_year: str
+    revenue_year: str
+    total_uk_revenue_m_gbp: float
+    root_id: str
+    nodes: Mapping[str, SpendingNode]
+
+    def path(self, node_id: str) -> list[SpendingNode]:
+        """Ancestors of `node_id`, root first, ending with the node itself."""
+        out = []
+        current: str | None = node_id
+        while current is not None:
+            node = self.nodes[current]
+            out.append(node)
+            current = node.parent_id
+        return out[::-1]
+
+
+@dataclass
+class _Row:
+    label: str
+    row_type: str
+    amount: float
+    children: list[_Row] = field(default_factory=list)
+
+
+def _slug(label: str) -> str:
+    text = _FOOTNOTES.sub("", _CODE.sub("", label))
+    text = re.sub(r"^of which:\s*", "", text, flags=re.IGNORECASE)
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "item"
+
+
+def _parse(labels: list[str], row_types: list[str], amounts: list[float]) -> _Row:
+    functions: list[_Row] = []
+    group: list[_Row] = []
+    current_sub: _Row | None = None
+    root: _Row | None = None
+    for label, row_type, amount in zip(labels, row_types, amounts):
+        row = _Row(label, row_type, amount)
+        if row_type == "of_which":
+            # Breakdown of the preceding sub-function, or of the whole
+            # function when it comes first (social protection).
+            (current_sub.children if current_sub else group).append(row)
+        elif row_type == "function_total":
+            row.children = group
+            functions.append(row)
+            root = row
+            group, current_sub = [], None
+        else:
+            group.append(row)
+            current_sub = row if row_type == "sub_function" else None
+    if root is None:
+        raise ValueError("No function totals found in the spending table")
+
+    # The last total (Total Managed Expenditure) closes the aggregate rows
+    # rather than a function. PESA prints one aggregate as the sum of the
+    # function totals; it adopts them when the published figures agree.
+    functions.pop()
+    root.row_type = "total"
+    expected = sum(f.amount for f in functions)
+    tolerance = ROUNDING_TOLERANCE_M_GBP * len(functions)
+    adopted = False
+    for aggregate in root.children:
+        if aggregate.row_type == "other" and abs(aggregate.amount - expected) <= tolerance:
+            aggregate.children = functions
+            adopted = True
+            break
+    if not adopted:
+        root.children = [*functions, *root.children]
+    return root
+
+
+def _freeze(root: _Row, revenue_m_gbp: float) -> tuple[str, dict[str, SpendingNode]]:
+    nodes: dict[str, SpendingNode] = {}
+    total = root.amount
+
+    def visit(row: _Row, node_id: str, parent: _Row | None, parent_id: str | None) -> None:
+        child_ids = []
+        for child in row.children:
+            slug = _slug(child.label[len("Total "):] if child.row_type == "function_total" else child.label)
+            qualified = child.row_type != "function_total" and row.row_type not in {"total", "other"}
+            child_id = f"{node_id}/{slug}" if qualified else slug
+            while child_id in nodes or child_id in child_ids:
+                child_id += "-2"
+            child_ids.append(child_id)
+        code = _CODE.match(row.label)
+        label = row.label
+        if row.row_type == "function_total":
+            label = label[len("Total "):]
+            label = label[:1].upper() + label[1:]
+        if row.row_type in {"function_total", "total"}:
+            label = _FOOTNOTES.sub("", label)
+        additive = [c.amount for c in row.children if c.row_type != "of_which"]
+        nodes[node_id] = SpendingNode(
+            id=node_id,
+            label=label,
+            code=code.group(1) if code else None,
+            row_type=row.row_type,
+            amount_m_gbp=row.amount,
+            parent_id=parent_id,
+            children=tuple(child_ids),
+            children_total_m_gbp=sum(additive) if additive else None,
+            share_of_parent=(row.amount / parent.amount) if parent and parent.amount else 1.0,
+            share_of_total_expenditure=(row.amount / total) if total else 0.0,
+            share_of_user_tax=row.amount / revenue_m_gbp,
+        )
+        for child, child_id in zip(row.children, child_ids):
+            visit(child, child_id, row, node_id)
+
+    root_id = _slug(root.label)
+    visit(root, root_id, None, None)
+    return root_id, nodes
+
+
+@lru_cache(maxsize=8)
+def spending_tree(revenue_year: str, spending_year: str) -> SpendingTree:
+    table = load_table("functional_spending_2024_25.csv")
+    years = table.strings("year")
+    row_types = table.strings("row_type")
+    labels = table.strings("function_label")
+    amounts = table.floats("amount_m_gbp")
+    keep = [i for i in range(len(table)) if years[i] == spending_year]
+    if not keep:
+        raise ValueError(f"No spending rows found for year '{spending_year}'")
+    root = _parse([labels[i] for i in keep], [row_types[i] for i in keep], [float(amounts[i]) for i in keep])
+    revenue = load_total_uk_revenue_m_gbp(revenue_year)
+    root_id, nodes = _freeze(root, revenue)
+    return SpendingTree(
+        spending_year=spending_year,
+        revenue_year=revenue_year,
+        total_uk_revenue_m_gbp=revenue,
+        root_id=root_id,
+        nodes=MappingProxyType(nodes),
+    )
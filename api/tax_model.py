@@ -1,10 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from urllib.parse import quote
-from urllib.request import Request, urlopen
-
-import json
+from typing import Sequence
 
 
 @dataclass(frozen=True)
@@ -30,6 +27,11 @@ TAX_PARAMETERS_BY_YEAR: dict[str, TaxParameters] = {
 }
 
 MARRIAGE_ALLOWANCE_CREDIT_GBP = 252.0
+# The personal allowance falls by £1 for every £2 of income above this.
+PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP = 100000.0
+# Income limits that set the savings and dividend rates (whole-amount cliffs).
+HIGHER_RATE_INCOME_LIMIT_GBP = 50270.0
+ADDITIONAL_RATE_INCOME_LIMIT_GBP = 125140.0
 
 
 COUNCIL_TAX_AVERAGE_BY_REGION = {
@@ -58,14 +60,19 @@ COUNCIL_TAX_BAND_MULTIPLIER = {
     "G": 15.0 / 9.0,
     "H": 18.0 / 9.0,
 }
+# Column order of per-council rate rows (see `api.councils.CouncilTaxTable`).
+COUNCIL_TAX_BANDS = tuple(COUNCIL_TAX_BAND_MULTIPLIER)
+_BAND_INDEX = {band: i for i, band in enumerate(COUNCIL_TAX_BANDS)}
 
 
-def _round2(value: float) -> float:
-    return round(value, 2)
+def _round2(value: float, rounded: bool = True) -> float:
+    # `rounded=False` keeps the exact piecewise-linear value for marginal-rate
+    # analysis; every published estimate is rounded to pence.
+    return round(value, 2) if rounded else value
 
 
 def estimate_income_tax(annual_income_gbp: float, p: TaxParameters) -> float:
-    taper_reduction = max(0.0, annual_income_gbp - 100000.0) / 2.0
+    taper_reduction = max(0.0, annual_income_gbp - PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP) / 2.0
     personal_allowance = max(0.0, p.personal_allowance - taper_reduction)
     taxable = max(0.0, annual_income_gbp - personal_allowance)
 
@@ -86,8 +93,10 @@ def estimate_income_tax_with_reliefs(
     annual_income_gbp: float,
     p: TaxParameters,
     basic_rate_band_extension_gbp: float = 0.0,
+    *,
+    rounded: bool = True,
 ) -> float:
-    taper_reduction = max(0.0, annual_income_gbp - 100000.0) / 2.0
+    taper_reduction = max(0.0, annual_income_gbp - PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP) / 2.0
     personal_allowance = max(0.0, p.personal_allowance - taper_reduction)
     taxable = max(0.0, annual_income_gbp - personal_allowance)
 
@@ -102,50 +111,65 @@ def estimate_income_tax_with_reliefs(
         + higher_taxable * p.higher_rate
         + additional_taxable * p.additional_rate
     )
-    return _round2(tax)
+    return _round2(tax, rounded)
+
+
+# Simplified Scottish non-savings/non-dividend bands as (width, rate) above the
+# personal allowance, with everything beyond the last band at the top rate.
+SCOTTISH_INCOME_TAX_BANDS = (
+    (2306.0, 0.19),
+    (13991.0 - 2306.0, 0.20),
+    (31092.0 - 13991.0, 0.21),
+    (62943.0 - 31092.0, 0.42),
+)
+SCOTTISH_TOP_RATE = 0.47
 
 
-def estimate_income_tax_scotland(annual_income_gbp: float, p: TaxParameters) -> float:
+def estimate_income_tax_scotland(annual_income_gbp: float, p: TaxParameters, *, rounded: bool = True) -> float:
     # Simplified Scottish non-savings/non-dividend rates for modelling mode.
-    taper_reduction = max(0.0, annual_income_gbp - 100000.0) / 2.0
+    taper_reduction = max(0.0, annual_income_gbp - PERSONAL_ALLOWANCE_TAPER_THRESHOLD_GBP) / 2.0
     personal_allowance = max(0.0, p.personal_allowance - taper_reduction)
     taxable = max(0.0, annual_income_gbp - personal_allowance)
-    bands = [
-        (2306.0, 0.19),
-        (13991.0 - 2306.0, 0.20),
-        (31092.0 - 13991.0, 0.21),
-        (62943.0 - 31092.0, 0.42),
-    ]
     total = 0.0
     remaining = taxable
-    for width, rate in bands:
+    for width, rate in SCOTTISH_INCOME_TAX_BANDS:
         take = min(remaining, width)
         if take <= 0:
             break
         total += take * rate
         remaining -= take
     if remaining > 0:
-        total += remaining * 0.47
-    return _round2(total)
+        total += remaining * SCOTTISH_TOP_RATE
+    return _round2(total, rounded)
 
 
-def estimate_national_insurance(annual_income_gbp: float, p: TaxParameters) -> float:
+def estimate_national_insurance(annual_income_gbp: float, p: TaxParameters, *, rounded: bool = True) -> float:
     if annual_income_gbp <= p.ni_primary_threshold:
         return 0.0
     if annual_income_gbp <= p.ni_upper_earnings_limit:
-        return _round2((annual_income_gbp - p.ni_primary_threshold) * p.ni_main_rate)
+        return _round2((annual_income_gbp - p.ni_primary_threshold) * p.ni_main_rate, rounded)
 
     main = (p.ni_upper_earnings_limit - p.ni_primary_threshold) * p.ni_main_rate
     upper = (annual_income_gbp - p.ni_upper_earnings_limit) * p.ni_upper_rate
-    return _round2(main + upper)
+    return _round2(main + upper, rounded)
 
 
-def estimate_self_employed_ni(annual_income_gbp: float) -> float:
+SELF_EMPLOYED_NI_CLASS2_GBP = 179.4
+SELF_EMPLOYED_NI_LOWER_PROFITS_LIMIT = 12570.0
+SELF_EMPLOYED_NI_UPPER_PROFITS_LIMIT = 50270.0
+SELF_EMPLOYED_NI_MAIN_RATE = 0.06
+SELF_EMPLOYED_NI_UPPER_RATE = 0.02
+
+
+def estimate_self_employed_ni(annual_income_gbp: float, *, rounded: bool = True) -> float:
     # Simplified Class 2 + Class 4 model.
-    class2 = 179.4 if annual_income_gbp >= 12570.0 else 0.0
-    class4_main = max(0.0, min(annual_income_gbp, 50270.0) - 12570.0) * 0.06
-    class4_upper = max(0.0, annual_income_gbp - 50270.0) * 0.02
-    return _round2(class2 + class4_main + class4_upper)
+    class2 = SELF_EMPLOYED_NI_CLASS2_GBP if annual_income_gbp >= SELF_EMPLOYED_NI_LOWER_PROFITS_LIMIT else 0.0
+    class4_main = (
+        max(0.0, min(annual_income_gbp, SELF_EMPLOYED_NI_UPPER_PROFITS_LIMIT) - SELF_EMPLOYED_NI_LOWER_PROFITS_LIMIT)
+        * SELF_EMPLOYED_NI_MAIN_RATE
+    )
+    class4_upper = max(0.0, annual_income_gbp - SELF_EMPLOYED_NI_UPPER_PROFITS_LIMIT) * SELF_EMPLOYED_NI_UPPER_RATE
+    return _round2(class2 + class4_main + class4_upper, rounded)
 
 
 def estimate_vat(
@@ -154,14 +178,25 @@ def estimate_vat(
     national_insurance_gbp: float,
     vatable_spend_ratio: float,
     p: TaxParameters,
+    *,
+    rounded: bool = True,
 ) -> float:
     disposable = max(0.0, annual_income_gbp - income_tax_gbp - national_insurance_gbp)
     vatable_spend = disposable * vatable_spend_ratio
     vat_component = vatable_spend * (p.vat_rate / (1.0 + p.vat_rate))
-    return _round2(vat_component)
+    return _round2(vat_component, rounded)
 
 
-def estimate_council_tax(region: str, council_tax_band: str = "auto") -> float:
+def estimate_council_tax(
+    region: str,
+    council_tax_band: str = "auto",
+    council_rates: Sequence[float] | None = None,
+) -> float:
+    # `council_rates` is the council's row of precomputed band charges; without
+    # one the regional Band D average is scaled by the band multiplier.
+    if council_rates is not None:
+        band = council_tax_band.strip().upper()
+        return council_rates[_BAND_INDEX.get(band, _BAND_INDEX["D"])]
     key = region.strip().lower()
     base = COUNCIL_TAX_AVERAGE_BY_REGION.get(key, COUNCIL_TAX_AVERAGE_BY_REGION["england"])
     band = council_tax_band.strip().upper()
@@ -173,34 +208,34 @@ def estimate_council_tax(region: str, council_tax_band: str = "auto") -> float:
     return _round2(base * multiplier)
 
 
-def estimate_savings_tax(annual_income_gbp: float, savings_interest_gbp: float) -> float:
+def estimate_savings_tax(annual_income_gbp: float, savings_interest_gbp: float, *, rounded: bool = True) -> float:
     if savings_interest_gbp <= 0:
         return 0.0
-    if annual_income_gbp <= 50270.0:
+    if annual_income_gbp <= HIGHER_RATE_INCOME_LIMIT_GBP:
         allowance = 1000.0
         rate = 0.20
-    elif annual_income_gbp <= 125140.0:
+    elif annual_income_gbp <= ADDITIONAL_RATE_INCOME_LIMIT_GBP:
         allowance = 500.0
         rate = 0.40
     else:
         allowance = 0.0
         rate = 0.45
     taxable = max(0.0, savings_interest_gbp - allowance)
-    return _round2(taxable * rate)
+    return _round2(taxable * rate, rounded)
 
 
-def estimate_dividend_tax(annual_income_gbp: float, dividend_income_gbp: float) -> float:
+def estimate_dividend_tax(annual_income_gbp: float, dividend_income_gbp: float, *, rounded: bool = True) -> float:
     if dividend_income_gbp <= 0:
         return 0.0
     allowance = 500.0
     taxable = max(0.0, dividend_income_gbp - allowance)
-    if annual_income_gbp <= 50270.0:
+    if annual_income_gbp <= HIGHER_RATE_INCOME_LIMIT_GBP:
         rate = 0.0875
-    elif annual_income_gbp <= 125140.0:
+    elif annual_income_gbp <= ADDITIONAL_RATE_INCOME_LIMIT_GBP:
         rate = 0.3375
     else:
         rate = 0.3935
-    return _round2(taxable * rate)
+    return _round2(taxable * rate, rounded)
 
 
 STUDENT_LOAN_PLAN = {
@@ -212,32 +247,12 @@ STUDENT_LOAN_PLAN = {
 }
 
 
-def estimate_student_loan_repayment(annual_income_gbp: float, plan: str) -> float:
+def estimate_student_loan_repayment(annual_income_gbp: float, plan: str, *, rounded: bool = True) -> float:
     if plan == "none":
         return 0.0
     threshold, rate = STUDENT_LOAN_PLAN.get(plan, (10**9, 0.0))
     repay = max(0.0, annual_income_gbp - threshold) * rate
-    return _round2(repay)
-
-
-def lookup_council_from_postcode(postcode: str) -> dict[str, str] | None:
-    p = postcode.strip()
-    if not p:
-        return None
-    url = f"https://api.postcodes.io/postcodes/{quote(p)}"
-    req = Request(url, headers={"User-Agent": "where-your-taxes-go/0.1"})
-    try:
-        raw = urlopen(req, timeout=8).read().decode("utf-8")
-        payload = json.loads(raw)
-        result = payload.get("result") or {}
-        return {
-            "postcode": result.get("postcode", p),
-            "council_name": result.get("admin_district", ""),
-            "region": result.get("region", ""),
-            "country": result.get("country", ""),
-        }
-    except Exception:
-        return None
+    return _round2(repay, rounded)
 
 
 def get_tax_parameters(tax_year: str) -> TaxParameters:
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""Build the memory-mapped API snapshot shared by all uvicorn workers."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from api.snapshot import build_snapshot
+
+
+def main() -> None:
+    out = build_snapshot()
+    print(f"Wrote {out} ({out.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
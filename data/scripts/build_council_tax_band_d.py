@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Build the per-council Band D council tax table for 2024-25.
+
+Reads the DLUHC "Band D council tax by billing authority" table, saved as CSV
+at `data/raw/council_tax_band_d_2024_25.csv`. Title rows above the header are
+skipped. The ONS code column is found by its values and the Band D column by
+its heading (the area-wide figure including parish precepts is preferred).
+Rows are joined to `council_to_region_2024.csv` on `lad_code`; billing
+authorities without a match are reported and dropped.
+
+The table is a manual download, so the stage is skipped with a message when
+it is absent and estimates keep using regional averages.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+RAW = ROOT / "data" / "raw" / "council_tax_band_d_2024_25.csv"
+LOOKUP = ROOT / "data" / "processed" / "council_to_region_2024.csv"
+OUT = ROOT / "data" / "processed" / "council_tax_band_d_2024_25.csv"
+YEAR = "2024-25"
+
+_LAD_CODE = re.compile(r"^[EW]0[6-9]\d{6}$")
+
+
+def _amount(text: str) -> float | None:
+    cleaned = text.replace("£", "").replace(",", "").strip()
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def _band_d_column(header: list[str]) -> int:
+    candidates = [i for i, h in enumerate(header) if "band d" in h.lower()]
+    if not candidates:
+        raise ValueError(f"{RAW.name}: no Band D column in header {header}")
+    for i in candidates:
+        heading = header[i].lower()
+        if "area" in heading or "including parish" in heading:
+            return i
+    return candidates[0]
+
+
+def read_band_d(path: Path) -> dict[str, float]:
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    # The header is the last row before the first row carrying a LAD code.
+    first = next((i for i, r in enumerate(rows) if any(_LAD_CODE.match(c.strip()) for c in r)), None)
+    if first is None or first == 0:
+        raise ValueError(f"{RAW.name}: no rows with ONS LAD codes")
+    header = rows[first - 1]
+    code_col = next(j for j, c in enumerate(rows[first]) if _LAD_CODE.match(c.strip()))
+    band_col = _band_d_column(header)
+    out: dict[str, float] = {}
+    for row in rows[first:]:
+        if len(row) <= max(code_col, band_col):
+            continue
+        code = row[code_col].strip()
+        amount = _amount(row[band_col])
+        if _LAD_CODE.match(code) and amount is not None and amount > 0:
+            out[code] = amount
+    return out
+
+
+def main() -> None:
+    if not RAW.exists():
+        print(f"Skipping council tax Band D: {RAW.relative_to(ROOT)} not present (manual download).")
+        return
+    with LOOKUP.open("r", encoding="utf-8", newline="") as f:
+        lookup = {r["lad_code"]: r for r in csv.DictReader(f)}
+    band_d = read_band_d(RAW)
+    unmatched = sorted(set(band_d) - set(lookup))
+    rows = [
+        {
+            "year": YEAR,
+            "lad_code": code,
+            "lad_name": lookup[code]["lad_name"],
+            "region_code": lookup[code]["region_code"],
+            "region_name": lookup[code]["region_name"],
+            "band_d_gbp": f"{band_d[code]:.2f}",
+        }
+        for code in sorted(band_d)
+        if code in lookup
+    ]
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    with OUT.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=["year", "lad_code", "lad_name", "region_code", "region_name", "band_d_gbp"]
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+    missing = len(set(lookup) - set(band_d))
+    print(f"Wrote {OUT.relative_to(ROOT)} ({len(rows)} councils, {missing} without a Band D figure)")
+    if unmatched:
+        print(f"Dropped {len(unmatched)} codes not in {LOOKUP.name}: {', '.join(unmatched[:10])}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,43 @@
 #!/usr/bin/env python3
+"""Build the static frontend data bundle as content-hashed chunks.
+
+Each chunk (services, regional, borrowing, population, schedule) is written once under
+`web/data/chunks/<name>.<hash>.json` with precompressed `.gz` (and `.br` when the
+`brotli` module is available) siblings. `web/data/frontend_manifest.json` maps
+chunk names to their current file, so clients can cache chunks indefinitely and
+only re-download the ones whose content changed.
+"""
+
 from __future__ import annotations
 
 import csv
+import gzip
+import hashlib
 import json
+import sys
+from dataclasses import asdict
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:  # Optional: .br siblings are skipped without it.
+    brotli = None
+
 
 ROOT = Path(__file__).resolve().parents[2]
 PROCESSED = ROOT / "data" / "processed"
-OUT = ROOT / "web" / "data" / "frontend_bundle.json"
+WEB_DATA = ROOT / "web" / "data"
+OUT = WEB_DATA / "frontend_bundle.json"
+MANIFEST = WEB_DATA / "frontend_manifest.json"
+CHUNKS = WEB_DATA / "chunks"
+MANIFEST_VERSION = 1
+HASH_LENGTH = 12
+# Bump when the shape of the schedule chunk changes, not when rates change.
+TAX_SCHEDULE_VERSION = 1
+sys.path.insert(0, str(ROOT))
+
+from api import tax_model
+from api.regional import normalize_borrowing_row, release_order
 
 
 def read_csv(path: Path) -> list[dict[str, str]]:
@@ -16,9 +45,11 @@ def read_csv(path: Path) -> list[dict[str, str]]:
         return list(csv.DictReader(f))
 
 
-def main() -> None:
-    OUT.parent.mkdir(parents=True, exist_ok=True)
+def encode(payload: object) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=True, sort_keys=True).encode("utf-8")
+
 
+def build_services_chunk() -> dict[str, object]:
     services_rows = read_csv(PROCESSED / "functional_spending_2024_25.csv")
     services = [
         {
@@ -38,8 +69,18 @@ def main() -> None:
         and r["geography_code"] == "K02000001"
         and r["metric"] == "total_current_receipts_excl_north_sea_oil_gas"
     )
-    total_uk_revenue_m_gbp = float(revenue_match["amount_m_gbp"])
+    return {
+        "meta": {
+            "generated_from": "data/processed snapshots",
+            "revenue_year": "2022 to 2023",
+            "spending_year": "2024-25",
+        },
+        "total_uk_revenue_m_gbp": float(revenue_match["amount_m_gbp"]),
+        "services": services,
+    }
 
+
+def build_regional_chunk() -> dict[str, object]:
     balance_rows = read_csv(PROCESSED / "regional_balances_2022_2023.csv")
     balances = [
         {
@@ -63,50 +104,156 @@ def main() -> None:
         for r in flow_rows
         if r["year"] == "2022 to 2023"
     ]
+    return {"year": "2022 to 2023", "balances": balances, "flows": flows}
+
 
+def build_borrowing_chunk() -> dict[str, object]:
     official_rows = read_csv(PROCESSED / "official_uk_borrowing.csv")
-    official = official_rows[0] if official_rows else None
+    # Same choice as `/borrowing/official`: the latest bulletin by date, not
+    # the last row fetched; among rows of one bulletin the last row wins.
+    official = max(
+        reversed(official_rows),
+        key=lambda r: release_order(normalize_borrowing_row(r)),
+        default=None,
+    )
+    return {
+        "official_borrowing": {
+            "amount_b_gbp": (float(official["amount_b_gbp"]) if official else None),
+            "release_period": (official.get("release_period") if official else None),
+            "reference_period": (official.get("reference_period") if official else None),
+            "source_url": (official.get("source_url") if official else None),
+        },
+    }
+
 
+def build_population_chunk() -> dict[str, object]:
     population_rows = read_csv(PROCESSED / "ons_itl1_population_mid2022.csv")
     population_by_region = {
         r["geography_name"]: int(float(r["population"]))
         for r in population_rows
         if r.get("population")
     }
-    population_year = (
-        population_rows[0].get("year") if population_rows else None
-    )
-    population_source_url = (
-        population_rows[0].get("source_url") if population_rows else None
-    )
+    return {
+        "population_year": population_rows[0].get("year") if population_rows else None,
+        "population_source_url": population_rows[0].get("source_url") if population_rows else None,
+        "population_by_region": population_by_region,
+    }
 
-    payload = {
-        "meta": {
-            "generated_from": "data/processed snapshots",
-            "revenue_year": "2022 to 2023",
-            "spending_year": "2024-25",
+
+def build_schedule_chunk() -> dict[str, object]:
+    # Everything the client-side evaluator needs to mirror api/tax_model.py.
+    return {
+        "version": TAX_SCHEDULE_VERSION,
+        "default_tax_year": "2025-26",
+        "tax_parameters_by_year": {
+            year: asdict(p) for year, p in sorted(tax_model.TAX_PARAMETERS_BY_YEAR.items())
         },
-        "total_uk_revenue_m_gbp": total_uk_revenue_m_gbp,
-        "services": services,
+        "marriage_allowance_credit_gbp": tax_model.MARRIAGE_ALLOWANCE_CREDIT_GBP,
+        "scottish_income_tax": {
+            "bands": [list(b) for b in tax_model.SCOTTISH_INCOME_TAX_BANDS],
+            "top_rate": tax_model.SCOTTISH_TOP_RATE,
+        },
+        "self_employed_ni": {
+            "class2_gbp": tax_model.SELF_EMPLOYED_NI_CLASS2_GBP,
+            "lower_profits_limit": tax_model.SELF_EMPLOYED_NI_LOWER_PROFITS_LIMIT,
+            "upper_profits_limit": tax_model.SELF_EMPLOYED_NI_UPPER_PROFITS_LIMIT,
+            "main_rate": tax_model.SELF_EMPLOYED_NI_MAIN_RATE,
+            "upper_rate": tax_model.SELF_EMPLOYED_NI_UPPER_RATE,
+        },
+        "student_loan_plans": {plan: list(v) for plan, v in tax_model.STUDENT_LOAN_PLAN.items()},
+        "council_tax": {
+            "average_by_region": tax_model.COUNCIL_TAX_AVERAGE_BY_REGION,
+            "band_multiplier": tax_model.COUNCIL_TAX_BAND_MULTIPLIER,
+        },
+    }
+
+
+CHUNK_BUILDERS = {
+    "services": build_services_chunk,
+    "regional": build_regional_chunk,
+    "borrowing": build_borrowing_chunk,
+    "population": build_population_chunk,
+    "schedule": build_schedule_chunk,
+}
+
+
+def assemble_bundle(chunks: dict[str, dict[str, object]]) -> dict[str, object]:
+    # Same shape as the historical single-file bundle, rebuilt from the chunks.
+    services = chunks["services"]
+    return {
+        "meta": services["meta"],
+        "total_uk_revenue_m_gbp": services["total_uk_revenue_m_gbp"],
+        "services": services["services"],
         "regional": {
-            "year": "2022 to 2023",
-            "population_year": population_year,
-            "population_source_url": population_source_url,
-            "population_by_region": population_by_region,
-            "balances": balances,
-            "flows": flows,
-            "official_borrowing": {
-                "amount_b_gbp": (float(official["amount_b_gbp"]) if official else None),
-                "release_period": (official.get("release_period") if official else None),
-                "reference_period": (official.get("reference_period") if official else None),
-                "source_url": (official.get("source_url") if official else None),
-            },
+            "year": chunks["regional"]["year"],
+            "population_year": chunks["population"]["population_year"],
+            "population_source_url": chunks["population"]["population_source_url"],
+            "population_by_region": chunks["population"]["population_by_region"],
+            "balances": chunks["regional"]["balances"],
+            "flows": chunks["regional"]["flows"],
+            "official_borrowing": chunks["borrowing"]["official_borrowing"],
         },
+        "tax_schedule": chunks["schedule"],
     }
 
-    with OUT.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, separators=(",", ":"), ensure_ascii=True)
-    print(f"Wrote {OUT}")
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def write_precompressed(path: Path, data: bytes) -> None:
+    # mtime=0 keeps the gzip output byte-identical across rebuilds.
+    write_if_changed(path.with_name(path.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_if_changed(path.with_name(path.name + ".br"), brotli.compress(data, quality=11))
+
+
+def write_chunk(name: str, data: bytes) -> dict[str, object]:
+    digest = hashlib.sha256(data).hexdigest()
+    path = CHUNKS / f"{name}.{digest[:HASH_LENGTH]}.json"
+    if path.exists():
+        print(f"Unchanged {path}")
+    else:
+        path.write_bytes(data)
+        print(f"Wrote {path}")
+    write_precompressed(path, data)
+    return {
+        "path": path.relative_to(WEB_DATA).as_posix(),
+        "sha256": digest,
+        "bytes": len(data),
+    }
+
+
+def prune_stale_chunks(keep: set[str]) -> None:
+    for path in CHUNKS.iterdir():
+        base = path.name.removesuffix(".gz").removesuffix(".br")
+        if base not in keep:
+            path.unlink()
+            print(f"Removed {path}")
+
+
+def main() -> None:
+    CHUNKS.mkdir(parents=True, exist_ok=True)
+
+    chunks = {name: build() for name, build in CHUNK_BUILDERS.items()}
+    entries = {name: write_chunk(name, encode(payload)) for name, payload in chunks.items()}
+    prune_stale_chunks({Path(str(e["path"])).name for e in entries.values()})
+
+    manifest = {"version": MANIFEST_VERSION, "chunks": entries}
+    if write_if_changed(MANIFEST, encode(manifest)):
+        print(f"Wrote {MANIFEST}")
+    else:
+        print(f"Unchanged {MANIFEST}")
+
+    # Single-file bundle kept for consumers that predate the manifest.
+    bundle = json.dumps(assemble_bundle(chunks), separators=(",", ":"), ensure_ascii=True).encode("utf-8")
+    if write_if_changed(OUT, bundle):
+        print(f"Wrote {OUT}")
+    else:
+        print(f"Unchanged {OUT}")
 
 
 if __name__ == "__main__":
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
-"""Build normalized spending parquet snapshots from Phase 1 processed CSVs."""
+"""Build normalized spending parquet snapshots from Phase 1 processed CSVs.
+
+Writes one file per year plus a Hive-partitioned dataset (`year=/level=`) for
+the API's `/spending/query` endpoint. Dataset files are sorted, dictionary
+encoded and split into small row groups with min/max statistics, so filtered
+reads can skip partitions and row groups entirely.
+"""
 
 from __future__ import annotations
 
 import csv
 import re
+import shutil
 from collections import defaultdict
 from pathlib import Path
 
@@ -15,6 +22,19 @@ import pyarrow.parquet as pq
 ROOT = Path(__file__).resolve().parents[2]
 PROCESSED = ROOT / "data" / "processed"
 NORMALIZED = ROOT / "data" / "normalized"
+DATASET = NORMALIZED / "spending"
+# Partition columns (year, level) live in the directory names, not the files.
+DATASET_SCHEMA = pa.schema(
+    [
+        ("geography", pa.string()),
+        ("function", pa.string()),
+        ("department", pa.string()),
+        ("amount_m_gbp", pa.float64()),
+        ("source_table", pa.string()),
+    ]
+)
+DATASET_SORT_KEYS = ("source_table", "function", "department", "geography")
+DATASET_ROW_GROUP_SIZE = 32
 
 
 def slugify(text: str) -> str:
@@ -110,9 +130,36 @@ def write_snapshots(rows: list[dict[str, object]]) -> None:
         print(f"Wrote {out} ({len(year_rows)} rows)")
 
 
+def write_partitioned_dataset(rows: list[dict[str, object]]) -> None:
+    partitions: dict[tuple[int, str], list[dict[str, object]]] = defaultdict(list)
+    for r in rows:
+        partitions[(int(r["year"]), str(r["level"]))].append(r)
+
+    if DATASET.exists():
+        shutil.rmtree(DATASET)
+    for (year, level), part_rows in sorted(partitions.items()):
+        part_rows.sort(key=lambda r: tuple(str(r[k] or "") for k in DATASET_SORT_KEYS))
+        table = pa.Table.from_pylist(
+            [{name: r[name] for name in DATASET_SCHEMA.names} for r in part_rows],
+            schema=DATASET_SCHEMA,
+        )
+        out = DATASET / f"year={year}" / f"level={level}" / "part-0.parquet"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(
+            table,
+            out,
+            compression="snappy",
+            use_dictionary=["geography", "function", "department", "source_table"],
+            write_statistics=True,
+            row_group_size=DATASET_ROW_GROUP_SIZE,
+        )
+        print(f"Wrote {out} ({len(part_rows)} rows)")
+
+
 def main() -> None:
     rows = normalize_rows()
     write_snapshots(rows)
+    write_partitioned_dataset(rows)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Aggregate the ONS Postcode Directory into postcode sector -> council counts.
+
+Reads the ONSPD (or NSPL) CSV placed at `data/raw/ons_postcode_directory_2024.csv`
+and counts live postcodes per postcode sector (`SW1A 1`, the outward code plus
+the first inward digit) and local authority district. Names and regions come
+from `council_to_region_2024.csv`; outside England the country stands in for
+the region. Terminated postcodes and pseudo-codes (Channel Islands, Isle of
+Man) are dropped.
+
+The directory is a manual download of well over a gigabyte, so the stage is
+skipped with a message when it is absent; the API then answers typeahead
+requests with 503 and full lookups go to postcodes.io only.
+"""
+
+from __future__ import annotations
+
+import csv
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+RAW = ROOT / "data" / "raw" / "ons_postcode_directory_2024.csv"
+LOOKUP = ROOT / "data" / "processed" / "council_to_region_2024.csv"
+OUT = ROOT / "data" / "processed" / "postcode_sectors_2024.csv"
+
+# Column names differ between ONSPD and NSPL releases.
+POSTCODE_COLUMNS = ("pcds", "pcd")
+LAD_COLUMNS = ("lad24cd", "oslaua", "laua")
+LAD_NAME_COLUMNS = ("lad24nm", "ladnm")
+COUNTRY_BY_PREFIX = {"W": "Wales", "S": "Scotland", "N": "Northern Ireland"}
+COUNTRY_CODE_BY_PREFIX = {"W": "W92000004", "S": "S92000003", "N": "N92000002"}
+
+
+def _column(header: list[str], candidates: tuple[str, ...], required: bool = True) -> int | None:
+    lowered = [h.strip().lower() for h in header]
+    for name in candidates:
+        if name in lowered:
+            return lowered.index(name)
+    if required:
+        raise ValueError(f"{RAW.name}: none of the columns {candidates} found")
+    return None
+
+
+def count_sectors(path: Path) -> tuple[Counter[tuple[str, str]], dict[str, str]]:
+    counts: Counter[tuple[str, str]] = Counter()
+    names: dict[str, str] = {}
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        pc_col = _column(header, POSTCODE_COLUMNS)
+        lad_col = _column(header, LAD_COLUMNS)
+        name_col = _column(header, LAD_NAME_COLUMNS, required=False)
+        term_col = _column(header, ("doterm",), required=False)
+        for row in reader:
+            if term_col is not None and row[term_col].strip():
+                continue
+            lad = row[lad_col].strip()
+            if lad[:1] not in {"E", "W", "S", "N"}:
+                continue
+            compact = "".join(row[pc_col].split()).upper()
+            if len(compact) < 5:
+                continue
+            # Sector: outward code, a space, first digit of the inward code.
+            counts[(f"{compact[:-3]} {compact[-3]}", lad)] += 1
+            if name_col is not None and lad not in names:
+                names[lad] = row[name_col].strip()
+    return counts, names
+
+
+def main() -> None:
+    if not RAW.exists():
+        print(f"Skipping postcode sectors: {RAW.relative_to(ROOT)} not present (manual download).")
+        return
+    with LOOKUP.open("r", encoding="utf-8", newline="") as f:
+        lookup = {r["lad_code"]: r for r in csv.DictReader(f)}
+    counts, names = count_sectors(RAW)
+    rows = []
+    for (sector, lad), n in sorted(counts.items()):
+        known = lookup.get(lad)
+        rows.append(
+            {
+                "sector": sector,
+                "lad_code": lad,
+                "lad_name": known["lad_name"] if known else names.get(lad, ""),
+                "region_code": known["region_code"] if known else COUNTRY_CODE_BY_PREFIX.get(lad[0], ""),
+                "region_name": known["region_name"] if known else COUNTRY_BY_PREFIX.get(lad[0], "England"),
+                "postcode_count": n,
+            }
+        )
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    with OUT.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=["sector", "lad_code", "lad_name", "region_code", "region_name", "postcode_count"]
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+    sectors = len({r["sector"] for r in rows})
+    print(f"Wrote {OUT.relative_to(ROOT)} ({sectors} sectors, {sum(counts.values())} live postcodes)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -52,7 +52,15 @@ def main() -> None:
     )
     write_csv(
         OUT / "flows_2022_2023.csv",
-        [{"year": year, **f} for f in flows],
+        [
+            {
+                "year": year,
+                "origin_region": f.origin_region,
+                "destination_region": f.destination_region,
+                "value_m_gbp": f.value_m_gbp,
+            }
+            for f in flows
+        ],
         ["year", "origin_region", "destination_region", "value_m_gbp"],
     )
     print(f"Wrote {OUT / 'regional_balances_2022_2023.csv'} ({len(balance_rows)} rows)")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Run a golden corpus through api/tax_model.py and record expected outputs.
+
+The written file pairs every case's inputs with the server's result, so the
+client-side evaluator in `web/app.js` (driven by the bundle's tax schedule) can
+be checked against the API without a network round trip.
+
+Run with:
+  python3 data/scripts/build_tax_conformance.py          # regenerate
+  python3 data/scripts/build_tax_conformance.py --check  # fail on drift
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+OUT = ROOT / "data" / "conformance" / "tax_model_golden.json"
+sys.path.insert(0, str(ROOT))
+
+from api import tax_model
+
+
+# Incomes straddle every threshold in the model: allowances, NI limits,
+# student loan thresholds, the taper band and the additional-rate threshold.
+INCOMES = (
+    0.0,
+    8000.0,
+    12570.0,
+    12571.0,
+    14876.0,
+    21000.0,
+    25000.0,
+    27295.0,
+    31395.0,
+    43662.0,
+    50270.0,
+    50271.0,
+    75000.0,
+    100000.0,
+    110000.0,
+    125140.0,
+    125141.0,
+    200000.0,
+)
+BAND_EXTENSIONS = (0.0, 2500.0)
+VAT_RATIOS = (0.0, 0.6, 1.0)
+COUNCIL_REGIONS = ("England", "London", "Scotland", "Wales", "Northern Ireland", "Atlantis")
+COUNCIL_BANDS = ("auto", "A", "D", "H")
+SAVINGS = (0.0, 800.0, 3000.0)
+DIVIDENDS = (0.0, 400.0, 5000.0)
+
+
+def build_cases() -> list[dict[str, object]]:
+    cases: list[dict[str, object]] = []
+    for tax_year in sorted(tax_model.TAX_PARAMETERS_BY_YEAR):
+        p = tax_model.get_tax_parameters(tax_year)
+        for income in INCOMES:
+            for extension in BAND_EXTENSIONS:
+                cases.append(
+                    {
+                        "fn": "income_tax_with_reliefs",
+                        "args": {"tax_year": tax_year, "income": income, "extension": extension},
+                        "expected": tax_model.estimate_income_tax_with_reliefs(
+                            income, p, basic_rate_band_extension_gbp=extension
+                        ),
+                    }
+                )
+            cases.append(
+                {
+                    "fn": "income_tax_scotland",
+                    "args": {"tax_year": tax_year, "income": income},
+                    "expected": tax_model.estimate_income_tax_scotland(income, p),
+                }
+            )
+            cases.append(
+                {
+                    "fn": "national_insurance",
+                    "args": {"tax_year": tax_year, "income": income},
+                    "expected": tax_model.estimate_national_insurance(income, p),
+                }
+            )
+            income_tax = tax_model.estimate_income_tax_with_reliefs(income, p)
+            ni = tax_model.estimate_national_insurance(income, p)
+            for ratio in VAT_RATIOS:
+                cases.append(
+                    {
+                        "fn": "vat",
+                        "args": {
+                            "tax_year": tax_year,
+                            "income": income,
+                            "income_tax": income_tax,
+                            "ni": ni,
+                            "ratio": ratio,
+                        },
+                        "expected": tax_model.estimate_vat(income, income_tax, ni, ratio, p),
+                    }
+                )
+
+    for income in INCOMES:
+        cases.append(
+            {
+                "fn": "self_employed_ni",
+                "args": {"income": income},
+                "expected": tax_model.estimate_self_employed_ni(income),
+            }
+        )
+        for plan in ("none", *tax_model.STUDENT_LOAN_PLAN):
+            cases.append(
+                {
+                    "fn": "student_loan",
+                    "args": {"income": income, "plan": plan},
+                    "expected": tax_model.estimate_student_loan_repayment(income, plan),
+                }
+            )
+        for savings in SAVINGS:
+            cases.append(
+                {
+                    "fn": "savings_tax",
+                    "args": {"income": income, "savings": savings},
+                    "expected": tax_model.estimate_savings_tax(income, savings),
+                }
+            )
+        for dividends in DIVIDENDS:
+            cases.append(
+                {
+                    "fn": "dividend_tax",
+                    "args": {"income": income, "dividends": dividends},
+                    "expected": tax_model.estimate_dividend_tax(income, dividends),
+                }
+            )
+
+    for region in COUNCIL_REGIONS:
+        for band in COUNCIL_BANDS:
+            cases.append(
+                {
+                    "fn": "council_tax",
+                    "args": {"region": region, "band": band},
+                    "expected": tax_model.estimate_council_tax(region, band),
+                }
+            )
+    return cases
+
+
+def encode(cases: list[dict[str, object]]) -> str:
+    # One case per line keeps the file compact and its diffs readable.
+    lines = ",\n".join(json.dumps(c, sort_keys=True, separators=(",", ":")) for c in cases)
+    return f'{{"cases":[\n{lines}\n]}}\n'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="compare against the stored corpus instead of writing")
+    args = parser.parse_args()
+
+    cases = build_cases()
+    if args.check:
+        stored = json.loads(OUT.read_text(encoding="utf-8"))["cases"]
+        mismatches = [(old, new) for old, new in zip(stored, cases) if old != new]
+        if mismatches or len(stored) != len(cases):
+            for old, new in mismatches[:10]:
+                print(f"{new['fn']} {new['args']}: stored {old['expected']} != model {new['expected']}")
+            raise SystemExit(f"{OUT} is out of date ({len(mismatches)} mismatched, {len(stored)} vs {len(cases)} cases)")
+        print(f"OK {OUT} ({len(cases)} cases)")
+        return
+
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    OUT.write_text(encode(cases), encoding="utf-8")
+    print(f"Wrote {OUT} ({len(cases)} cases)")
+
+
+if __name__ == "__main__":
+    main()
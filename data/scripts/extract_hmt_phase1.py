@@ -9,6 +9,7 @@ from __future__ import annotations
 
 import csv
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from openpyxl import load_workbook
@@ -49,9 +50,9 @@ def extract_functional_categories() -> Path:
     wb = load_workbook(RAW / "pesa_2025_ch5_tables.xlsx", data_only=True, read_only=True)
     ws = wb["5_2"]
     rows = []
-    for r in range(1, ws.max_row + 1):
-        label = ws.cell(r, 2).value
-        amount = to_number(ws.cell(r, 7).value)  # 2024-25 outturn
+    # Columns B..G only: label in B, 2024-25 outturn in G.
+    for label, *_, raw_amount in ws.iter_rows(min_col=2, max_col=7, values_only=True):
+        amount = to_number(raw_amount)
         if not label or amount is None:
             continue
         rows.append(
@@ -63,6 +64,7 @@ def extract_functional_categories() -> Path:
                 "amount_m_gbp": amount,
             }
         )
+    wb.close()
 
     out_path = OUT / "functional_spending_2024_25.csv"
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -92,9 +94,9 @@ def extract_departmental_totals() -> Path:
     )
     ws = wb["Table_1_12"]
     rows = []
-    for r in range(1, ws.max_row + 1):
-        label = ws.cell(r, 1).value
-        amount = to_number(ws.cell(r, 6).value)  # 2024-25 outturn
+    # Columns A..F only: label in A, 2024-25 outturn in F.
+    for label, *_, raw_amount in ws.iter_rows(min_col=1, max_col=6, values_only=True):
+        amount = to_number(raw_amount)
         if not label or amount is None:
             continue
         label = str(label).strip()
@@ -107,6 +109,7 @@ def extract_departmental_totals() -> Path:
                 "amount_m_gbp": amount,
             }
         )
+    wb.close()
 
     out_path = OUT / "departmental_spending_2024_25.csv"
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -120,8 +123,12 @@ def extract_departmental_totals() -> Path:
 
 
 def main() -> None:
-    functional = extract_functional_categories()
-    departmental = extract_departmental_totals()
+    # Workbook parsing is CPU-bound pure Python, so each workbook gets a process.
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        functional_job = pool.submit(extract_functional_categories)
+        departmental_job = pool.submit(extract_departmental_totals)
+        functional = functional_job.result()
+        departmental = departmental_job.result()
     print(f"Wrote {functional}")
     print(f"Wrote {departmental}")
 
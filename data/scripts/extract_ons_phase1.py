@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import csv
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from openpyxl import load_workbook
@@ -32,38 +33,43 @@ GEOGRAPHY_CODE_BY_SHEET = {
 }
 
 
-def find_latest_year_col(ws, header_row: int = 3) -> tuple[str, int]:
-    latest_col = None
-    latest_year = None
-    for col in range(2, ws.max_column + 1):
-        value = ws.cell(header_row, col).value
-        if isinstance(value, str) and "to" in value:
-            latest_col = col
-            latest_year = value
-    if latest_col is None or latest_year is None:
-        raise ValueError(f"Could not find latest year header in sheet {ws.title}")
-    return latest_year, latest_col
-
+def extract_latest_value(ws, prefix: str, header_row: int = 3) -> tuple[str, object]:
+    """Return (latest year label, value) for the row whose first cell starts with prefix.
 
-def find_row_by_prefix(ws, prefix: str) -> int:
+    Streams the sheet once with `iter_rows`: the header row yields the right-most
+    year column and the first matching label row yields the value. Random
+    `ws.cell()` access on read-only sheets re-parses the sheet on every call.
+    """
     wanted = prefix.strip().lower()
-    for row in range(1, ws.max_row + 1):
-        value = ws.cell(row, 1).value
-        if isinstance(value, str) and value.strip().lower().startswith(wanted):
-            return row
-    raise ValueError(f"Could not find row with prefix '{prefix}' in sheet {ws.title}")
+    latest_year = None
+    latest_idx = None
+    data_row = None
+    for row_number, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        if row_number == header_row:
+            for idx, value in enumerate(row[1:], start=1):
+                if isinstance(value, str) and "to" in value:
+                    latest_idx = idx
+                    latest_year = value
+        label = row[0] if row else None
+        if data_row is None and isinstance(label, str) and label.strip().lower().startswith(wanted):
+            data_row = row
+        if data_row is not None and row_number >= header_row:
+            break
+    if latest_idx is None or latest_year is None:
+        raise ValueError(f"Could not find latest year header in sheet {ws.title}")
+    if data_row is None:
+        raise ValueError(f"Could not find row with prefix '{prefix}' in sheet {ws.title}")
+    amount = data_row[latest_idx] if latest_idx < len(data_row) else None
+    return latest_year, amount
 
 
 def extract_regional_revenue() -> Path:
     wb = load_workbook(RAW / "ons_regional_revenue_fye2023.xlsx", read_only=True, data_only=True)
     rows: list[dict[str, object]] = []
     for sheet_name, geography_code in GEOGRAPHY_CODE_BY_SHEET.items():
-        ws = wb[sheet_name]
-        year_label, latest_col = find_latest_year_col(ws, header_row=3)
-        data_row = find_row_by_prefix(
-            ws, "Total current receipts (excl. North Sea Oil & Gas revenues)"
+        year_label, amount = extract_latest_value(
+            wb[sheet_name], "Total current receipts (excl. North Sea Oil & Gas revenues)"
         )
-        amount = ws.cell(data_row, latest_col).value
         rows.append(
             {
                 "year": year_label,
@@ -74,6 +80,7 @@ def extract_regional_revenue() -> Path:
                 "source_table": "ONS_CRPSF_Revenue_FYE2023",
             }
         )
+    wb.close()
 
     out_path = OUT / "ons_regional_revenue_fye2023.csv"
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -100,10 +107,7 @@ def extract_regional_expenditure() -> Path:
     )
     rows: list[dict[str, object]] = []
     for sheet_name, geography_code in GEOGRAPHY_CODE_BY_SHEET.items():
-        ws = wb[sheet_name]
-        year_label, latest_col = find_latest_year_col(ws, header_row=3)
-        data_row = find_row_by_prefix(ws, "Total managed expenditure")
-        amount = ws.cell(data_row, latest_col).value
+        year_label, amount = extract_latest_value(wb[sheet_name], "Total managed expenditure")
         rows.append(
             {
                 "year": year_label,
@@ -114,6 +118,7 @@ def extract_regional_expenditure() -> Path:
                 "source_table": "ONS_CRPSF_Expenditure_FYE2023",
             }
         )
+    wb.close()
 
     out_path = OUT / "ons_regional_expenditure_fye2023.csv"
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -160,9 +165,14 @@ def extract_council_to_region_lookup() -> Path:
 
 
 def main() -> None:
-    revenue = extract_regional_revenue()
-    expenditure = extract_regional_expenditure()
-    lookup = extract_council_to_region_lookup()
+    # Workbook parsing is CPU-bound pure Python, so each workbook gets a process.
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        revenue_job = pool.submit(extract_regional_revenue)
+        expenditure_job = pool.submit(extract_regional_expenditure)
+        lookup_job = pool.submit(extract_council_to_region_lookup)
+        revenue = revenue_job.result()
+        expenditure = expenditure_job.result()
+        lookup = lookup_job.result()
     print(f"Wrote {revenue}")
     print(f"Wrote {expenditure}")
     print(f"Wrote {lookup}")
@@ -1,18 +1,41 @@
 #!/usr/bin/env python3
-"""Fetch official UK borrowing (PSNB ex) from ONS bulletin text."""
+"""Fetch official UK borrowing (PSNB ex) from ONS bulletin text.
+
+`official_uk_borrowing.csv` is an append-only release history: each distinct
+(release period, reference period) pair is recorded once. Requests are
+conditional (ETag / If-Modified-Since) against a local HTTP cache in
+`data/cache/http/`, and the bulletin is only parsed when its content changed.
+
+Run with:
+  python3 data/scripts/fetch_official_borrowing.py
+  python3 data/scripts/fetch_official_borrowing.py --url http://127.0.0.1:8000/january2026
+"""
 
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
+import json
 import re
 from datetime import datetime, timezone
 from pathlib import Path
+from urllib.error import HTTPError
 from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
 
 ROOT = Path(__file__).resolve().parents[2]
 OUT = ROOT / "data" / "processed" / "official_uk_borrowing.csv"
+HTTP_CACHE = ROOT / "data" / "cache" / "http"
+FIELDNAMES = [
+    "metric",
+    "release_period",
+    "reference_period",
+    "amount_b_gbp",
+    "source_url",
+    "retrieved_at_utc",
+]
 
 # ONS Public sector finances bulletin (January 2026 release).
 SOURCE_URL = "https://www.ons.gov.uk/economy/governmentpublicsectorandtaxes/publicsectorfinance/bulletins/publicsectorfinances/january2026"
@@ -36,47 +59,110 @@ def extract_release_period_from_url(source_url: str) -> str:
     return f"{month} {year}"
 
 
-def main() -> None:
-    req = Request(
-        SOURCE_URL,
-        headers={"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"},
+def cache_paths(url: str, cache_dir: Path) -> tuple[Path, Path]:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{key}.json", cache_dir / f"{key}.body"
+
+
+def write_cache(url: str, cache_dir: Path, body: bytes, etag: str | None, last_modified: str | None) -> None:
+    meta_path, body_path = cache_paths(url, cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    body_path.write_bytes(body)
+    meta_path.write_text(
+        json.dumps(
+            {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": hashlib.sha256(body).hexdigest(),
+                "fetched_at_utc": datetime.now(timezone.utc).isoformat(),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
     )
-    html = urlopen(req, timeout=30).read().decode("utf-8", errors="ignore")
+
+
+def fetch_if_changed(url: str, cache_dir: Path) -> tuple[bytes, str | None, str | None] | None:
+    """Return (body, etag, last_modified), or None when unchanged since the last fetch."""
+    meta_path, body_path = cache_paths(url, cache_dir)
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"}
+    if body_path.exists():
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        with urlopen(Request(url, headers=headers), timeout=30) as resp:
+            body = resp.read()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except HTTPError as exc:
+        if exc.code == 304:
+            print(f"Not modified: {url}")
+            return None
+        raise
+
+    if body_path.exists() and hashlib.sha256(body).hexdigest() == meta.get("sha256"):
+        # Server ignored the validators but sent identical bytes; refresh them.
+        write_cache(url, cache_dir, body, etag, last_modified)
+        print(f"Unchanged content: {url}")
+        return None
+    return body, etag, last_modified
+
+
+def parse_release(html: str, source_url: str) -> dict[str, str]:
     match = PATTERN.search(html)
     if not match:
         raise RuntimeError("Could not parse official borrowing figure from ONS bulletin")
+    return {
+        "metric": "psnb_ex_fye",
+        "release_period": extract_release_period_from_url(source_url),
+        "reference_period": f"FYE March {int(match.group(2))}",
+        "amount_b_gbp": f"{float(match.group(1)):.1f}",
+        "source_url": source_url,
+        "retrieved_at_utc": datetime.now(timezone.utc).isoformat(),
+    }
 
-    amount_b = float(match.group(1))
-    year = int(match.group(2))
-    release_period = extract_release_period_from_url(SOURCE_URL)
-    reference_period = f"FYE March {year}"
-    retrieved_at = datetime.now(timezone.utc).isoformat()
-
-    OUT.parent.mkdir(parents=True, exist_ok=True)
-    with OUT.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "metric",
-                "release_period",
-                "reference_period",
-                "amount_b_gbp",
-                "source_url",
-                "retrieved_at_utc",
-            ],
-        )
-        writer.writeheader()
-        writer.writerow(
-            {
-                "metric": "psnb_ex_fye",
-                "release_period": release_period,
-                "reference_period": reference_period,
-                "amount_b_gbp": f"{amount_b:.1f}",
-                "source_url": SOURCE_URL,
-                "retrieved_at_utc": retrieved_at,
-            }
-        )
-    print(f"Wrote {OUT}")
+
+def append_release(row: dict[str, str], out: Path) -> bool:
+    existing: set[tuple[str, str]] = set()
+    if out.exists():
+        with out.open("r", encoding="utf-8", newline="") as f:
+            existing = {(r["release_period"], r["reference_period"]) for r in csv.DictReader(f)}
+    if (row["release_period"], row["reference_period"]) in existing:
+        return False
+    out.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not out.exists() or out.stat().st_size == 0
+    with out.open("a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+        writer.writerow(row)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fetch the official PSNB ex figure from an ONS bulletin.")
+    parser.add_argument("--url", default=SOURCE_URL, help="bulletin URL (the last path segment names the release)")
+    parser.add_argument("--cache-dir", type=Path, default=HTTP_CACHE, help="local HTTP cache directory")
+    parser.add_argument("--out", type=Path, default=OUT, help="release history CSV")
+    args = parser.parse_args()
+
+    fetched = fetch_if_changed(args.url, args.cache_dir)
+    if fetched is None:
+        print(f"No new release; {args.out} left unchanged")
+        return
+    body, etag, last_modified = fetched
+    row = parse_release(body.decode("utf-8", errors="ignore"), args.url)
+    if append_release(row, args.out):
+        print(f"Appended {row['release_period']} / {row['reference_period']} to {args.out}")
+    else:
+        print(f"Release {row['release_period']} / {row['reference_period']} already recorded in {args.out}")
+    # Cache only after a successful parse so a bad page is retried next run.
+    write_cache(args.url, args.cache_dir, body, etag, last_modified)
 
 
 if __name__ == "__main__":
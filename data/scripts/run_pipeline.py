@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Run the data pipeline as a DAG, skipping stages whose inputs are unchanged.
+
+Each stage is one of the scripts in `data/scripts/`, declared with the files it
+reads and writes. A stage is up to date when its outputs exist and the hash of
+its inputs (plus the script itself) matches the previous run. Independent stages
+(for example HMT and ONS extraction) run concurrently as separate processes.
+Per-stage status and timings are written to `data/pipeline_manifest.json`.
+
+Run with:
+  uv run --with openpyxl --with pyarrow python data/scripts/run_pipeline.py
+  uv run --with openpyxl --with pyarrow python data/scripts/run_pipeline.py --fetch --jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS = ROOT / "data" / "scripts"
+MANIFEST = ROOT / "data" / "pipeline_manifest.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    script: str
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    # Stages that hit the network only run when asked (`--fetch`) or when an
+    # output is missing; their inputs are remote, so hashing cannot detect change.
+    network: bool = False
+    # Inputs under `data/raw/` that are downloaded by hand. The script is a
+    # no-op without them, so the stage is reported as skipped instead of ran.
+    manual_inputs: tuple[str, ...] = ()
+
+
+STAGES = (
+    Stage(
+        name="extract_hmt",
+        script="extract_hmt_phase1.py",
+        inputs=(
+            "data/raw/pesa_2025_ch5_tables.xlsx",
+            "data/raw/public_spending_departmental_budgets_july_2025.xlsx",
+        ),
+        outputs=(
+            "data/processed/functional_spending_2024_25.csv",
+            "data/processed/departmental_spending_2024_25.csv",
+        ),
+    ),
+    Stage(
+        name="extract_ons",
+        script="extract_ons_phase1.py",
+        inputs=(
+            "data/raw/ons_regional_revenue_fye2023.xlsx",
+            "data/raw/ons_regional_expenditure_fye2023.xlsx",
+            "data/raw/ons_lad_to_region_2024.csv",
+        ),
+        outputs=(
+            "data/processed/ons_regional_revenue_fye2023.csv",
+            "data/processed/ons_regional_expenditure_fye2023.csv",
+            "data/processed/council_to_region_2024.csv",
+        ),
+    ),
+    Stage(
+        name="postcode_sectors",
+        script="build_postcode_sectors.py",
+        inputs=(
+            "data/raw/ons_postcode_directory_2024.csv",
+            "data/processed/council_to_region_2024.csv",
+        ),
+        outputs=("data/processed/postcode_sectors_2024.csv",),
+        manual_inputs=("data/raw/ons_postcode_directory_2024.csv",),
+    ),
+    Stage(
+        name="council_tax_band_d",
+        script="build_council_tax_band_d.py",
+        inputs=(
+            "data/raw/council_tax_band_d_2024_25.csv",
+            "data/processed/council_to_region_2024.csv",
+        ),
+        outputs=("data/processed/council_tax_band_d_2024_25.csv",),
+        manual_inputs=("data/raw/council_tax_band_d_2024_25.csv",),
+    ),
+    Stage(
+        name="fetch_borrowing",
+        script="fetch_official_borrowing.py",
+        inputs=(),
+        outputs=("data/processed/official_uk_borrowing.csv",),
+        network=True,
+    ),
+    Stage(
+        name="normalize_spending",
+        script="build_normalized_spending.py",
+        inputs=(
+            "data/processed/functional_spending_2024_25.csv",
+            "data/processed/departmental_spending_2024_25.csv",
+            "data/processed/ons_regional_expenditure_fye2023.csv",
+        ),
+        outputs=(
+            "data/normalized/spending_2022.parquet",
+            "data/normalized/spending_2024.parquet",
+            "data/normalized/spending/year=2022/level=region_or_country/part-0.parquet",
+            "data/normalized/spending/year=2024/level=national/part-0.parquet",
+        ),
+    ),
+    Stage(
+        name="regional_flows",
+        script="build_regional_flows.py",
+        inputs=(
+            "data/processed/ons_regional_revenue_fye2023.csv",
+            "data/processed/ons_regional_expenditure_fye2023.csv",
+            "api/regional.py",
+        ),
+        outputs=(
+            "data/processed/regional_balances_2022_2023.csv",
+            "data/processed/flows_2022_2023.csv",
+        ),
+    ),
+    Stage(
+        name="api_snapshot",
+        script="build_api_snapshot.py",
+        inputs=(
+            "data/processed/functional_spending_2024_25.csv",
+            "data/processed/ons_regional_revenue_fye2023.csv",
+            "data/processed/ons_regional_expenditure_fye2023.csv",
+            "data/processed/regional_balances_2022_2023.csv",
+            "data/processed/flows_2022_2023.csv",
+            "data/processed/official_uk_borrowing.csv",
+            "data/processed/council_to_region_2024.csv",
+            "data/processed/council_tax_band_d_2024_25.csv",
+            "data/processed/postcode_sectors_2024.csv",
+            "api/snapshot.py",
+        ),
+        outputs=("data/snapshot/api_snapshot.bin",),
+    ),
+    Stage(
+        name="tax_conformance",
+        script="build_tax_conformance.py",
+        inputs=("api/tax_model.py",),
+        outputs=("data/conformance/tax_model_golden.json",),
+    ),
+    Stage(
+        name="frontend_bundle",
+        script="build_frontend_bundle.py",
+        inputs=(
+            "data/processed/functional_spending_2024_25.csv",
+            "data/processed/ons_regional_revenue_fye2023.csv",
+            "data/processed/regional_balances_2022_2023.csv",
+            "data/processed/flows_2022_2023.csv",
+            "data/processed/official_uk_borrowing.csv",
+            "data/processed/ons_itl1_population_mid2022.csv",
+            "api/regional.py",
+            "api/tax_model.py",
+        ),
+        outputs=(
+            "web/data/frontend_manifest.json",
+            "web/data/frontend_bundle.json",
+        ),
+    ),
+)
+
+
+def stage_dependencies(stages: tuple[Stage, ...]) -> dict[str, set[str]]:
+    producer = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: {producer[i] for i in s.inputs if i in producer and producer[i] != s.name} for s in stages}
+
+
+def check_acyclic(stages: tuple[Stage, ...], deps: dict[str, set[str]]) -> None:
+    remaining = {s.name: set(deps[s.name]) for s in stages}
+    while remaining:
+        ready = [name for name, d in remaining.items() if not d]
+        if not ready:
+            raise ValueError(f"Pipeline stages form a cycle: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+
+
+def input_digest(stage: Stage) -> str:
+    digest = hashlib.sha256()
+    for rel in (f"data/scripts/{stage.script}", *stage.inputs):
+        path = ROOT / rel
+        digest.update(rel.encode("utf-8"))
+        if not path.exists():
+            digest.update(b"<missing>")
+            continue
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def load_previous_digests() -> dict[str, str]:
+    if not MANIFEST.exists():
+        return {}
+    previous = json.loads(MANIFEST.read_text(encoding="utf-8"))
+    return {
+        name: s["input_sha256"]
+        for name, s in previous.get("stages", {}).items()
+        if s.get("status") in {"ran", "skipped"} and s.get("input_sha256")
+    }
+
+
+def skip_reason(stage: Stage, digest: str, previous: dict[str, str], args: argparse.Namespace) -> str | None:
+    if any(not (ROOT / raw).exists() for raw in stage.manual_inputs):
+        return "raw input missing"
+    if args.force or stage.name in (args.only or ()):
+        return None
+    if any(not (ROOT / out).exists() for out in stage.outputs):
+        return None
+    if stage.network:
+        return None if args.fetch else "network stage (use --fetch)"
+    if previous.get(stage.name) == digest:
+        return "inputs unchanged"
+    return None
+
+
+def run_stage(stage: Stage) -> tuple[int, float, str]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(SCRIPTS / stage.script)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return proc.returncode, time.perf_counter() - started, proc.stdout + proc.stderr
+
+
+def run_pipeline(args: argparse.Namespace) -> dict[str, dict[str, object]]:
+    deps = stage_dependencies(STAGES)
+    check_acyclic(STAGES, deps)
+    previous = load_previous_digests()
+    by_name = {s.name: s for s in STAGES}
+    results: dict[str, dict[str, object]] = {}
+    pending = {s.name for s in STAGES}
+    running: dict[Future[tuple[int, float, str]], tuple[Stage, str]] = {}
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        while pending or running:
+            for name in sorted(pending):
+                if any(d not in results for d in deps[name]):
+                    continue
+                pending.discard(name)
+                stage = by_name[name]
+                failed = [d for d in deps[name] if results[d]["status"] in {"failed", "blocked"}]
+                if failed:
+                    results[name] = {"status": "blocked", "blocked_by": sorted(failed)}
+                    print(f"[blocked] {name} (upstream failed: {', '.join(sorted(failed))})")
+                    continue
+                # Digest is taken only once upstream stages have finished writing.
+                digest = input_digest(stage)
+                reason = skip_reason(stage, digest, previous, args)
+                if reason is not None:
+                    results[name] = {"status": "skipped", "reason": reason, "input_sha256": digest, "seconds": 0.0}
+                    print(f"[skip] {name} ({reason})")
+                elif args.dry_run:
+                    results[name] = {"status": "would_run", "input_sha256": digest}
+                    print(f"[would run] {name}")
+                else:
+                    print(f"[run] {name}")
+                    running[pool.submit(run_stage, stage)] = (stage, digest)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, digest = running.pop(future)
+                code, seconds, output = future.result()
+                status = "ran" if code == 0 else "failed"
+                results[stage.name] = {"status": status, "input_sha256": digest, "seconds": round(seconds, 3)}
+                print(f"[{'done' if code == 0 else 'FAILED'}] {stage.name} in {seconds:.2f}s")
+                if code != 0 or args.verbose:
+                    print(output.rstrip())
+    return results
+
+
+def write_manifest(results: dict[str, dict[str, object]], started_at: str, wall_seconds: float) -> None:
+    manifest = {
+        "started_at_utc": started_at,
+        "wall_seconds": round(wall_seconds, 3),
+        "stages": {s.name: {"script": s.script, **results[s.name]} for s in STAGES},
+    }
+    MANIFEST.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {MANIFEST}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run data pipeline stages whose inputs changed.")
+    parser.add_argument("--jobs", type=int, default=2, help="maximum stages run concurrently")
+    parser.add_argument("--force", action="store_true", help="run every stage regardless of input hashes")
+    parser.add_argument("--fetch", action="store_true", help="also run network stages")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="always run these stages")
+    parser.add_argument("--dry-run", action="store_true", help="report what would run without running it")
+    parser.add_argument("--verbose", action="store_true", help="print stage output even on success")
+    args = parser.parse_args()
+    unknown = set(args.only or ()) - {s.name for s in STAGES}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+    results = run_pipeline(args)
+    if not args.dry_run:
+        write_manifest(results, started_at, time.perf_counter() - started)
+    if any(r["status"] in {"failed", "blocked"} for r in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Measure API cold-start cost: import time and time to first response.
+
+Every measurement starts a fresh interpreter, so nothing is warm except the OS
+page cache. Reported per run and as medians:
+
+  import_ms        `import api.main` in a new process
+  first_health_ms  process spawn until `GET /health` answers under uvicorn
+  first_data_ms    first `POST /spending/breakdown` (loads the dataset snapshot)
+  second_data_ms   the same request again, for comparison
+
+Run with:
+  uv run python scripts/bench_cold_start.py
+  uv run python scripts/bench_cold_start.py --runs 10 --importtime
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BREAKDOWN_BODY = json.dumps({"annual_income_gbp": 45000, "region": "London"}).encode("utf-8")
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import api.main; print((time.perf_counter() - t) * 1000)"
+
+
+def _env(preload: bool) -> dict[str, str]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    env["WYTG_PRELOAD_DATA"] = "1" if preload else "0"
+    return env
+
+
+def measure_import(preload: bool) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT,
+        env=_env(preload),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip())
+
+
+def top_imports(limit: int) -> list[tuple[int, str]]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=ROOT,
+        env=_env(False),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows: list[tuple[int, str]] = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    # Only top-level packages, otherwise parents and children double count.
+    return sorted((r for r in rows if "." not in r[1]), reverse=True)[:limit]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request_ms(url: str, body: bytes | None = None) -> float:
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    started = time.perf_counter()
+    with urlopen(Request(url, data=body, headers=headers), timeout=30) as resp:
+        resp.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_server(preload: bool, timeout_s: float = 30.0) -> dict[str, float]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=_env(preload),
+    )
+    try:
+        while True:
+            try:
+                _request_ms(f"{base}/health")
+                break
+            except (URLError, ConnectionError):
+                if proc.poll() is not None or time.perf_counter() - started > timeout_s:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.005)
+        first_health = (time.perf_counter() - started) * 1000
+        first_data = _request_ms(f"{base}/spending/breakdown", BREAKDOWN_BODY)
+        second_data = _request_ms(f"{base}/spending/breakdown", BREAKDOWN_BODY)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"first_health_ms": first_health, "first_data_ms": first_data, "second_data_ms": second_data}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API import time and time to first response.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument("--preload", action="store_true", help="start with WYTG_PRELOAD_DATA=1")
+    parser.add_argument("--importtime", action="store_true", help="also list the slowest top-level imports")
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {"import_ms": []}
+    for i in range(args.runs):
+        samples["import_ms"].append(measure_import(args.preload))
+        for key, value in measure_server(args.preload).items():
+            samples.setdefault(key, []).append(value)
+        print(f"run {i + 1}: " + ", ".join(f"{k}={v[-1]:.1f}" for k, v in samples.items()))
+
+    mode = "preload" if args.preload else "lazy"
+    print(f"\nmedian over {args.runs} runs ({mode}):")
+    for key, values in samples.items():
+        print(f"  {key:<16} {statistics.median(values):8.1f}")
+
+    if args.importtime:
+        print("\nslowest top-level imports (cumulative ms):")
+        for micros, name in top_imports(10):
+            print(f"  {micros / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
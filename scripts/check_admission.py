@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Regression checks for admission control (`api/admission.py`).
+
+Each check drives an `AdmissionPool` on a private event loop and exits
+non-zero on the first failure.
+
+Run with:
+  uv run python scripts/check_admission.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from api.admission import AdmissionPool, Shed  # noqa: E402
+
+
+async def release_between_deadline_and_handler() -> None:
+    # The deadline cancels the waiter; a release() that runs before the
+    # waiting task resumes drops the cancelled entry. The waiter must still
+    # be shed cleanly rather than fail on its own bookkeeping.
+    pool = AdmissionPool("check", capacity=1, queue_size=4, max_wait_s=0.05, retry_after_s=1)
+    await pool.acquire(1)
+    waiting = asyncio.ensure_future(pool.acquire(1))
+    await asyncio.sleep(0)
+    asyncio.get_running_loop().call_later(0.06, pool.release, 1)
+    await asyncio.sleep(0.04)
+    time.sleep(0.1)  # Block the loop past both the deadline and the release.
+    try:
+        await waiting
+    except Shed:
+        pass
+    else:
+        pool.release(1)
+        raise AssertionError("waiter past its deadline was admitted")
+    assert pool.shed_deadline == 1, pool.stats()
+    assert pool.in_use == 0 and not pool._waiters, pool.stats()
+
+
+async def queue_full_sheds() -> None:
+    pool = AdmissionPool("check", capacity=1, queue_size=1, max_wait_s=1.0, retry_after_s=1)
+    await pool.acquire(1)
+    queued = asyncio.ensure_future(pool.acquire(1))
+    await asyncio.sleep(0)
+    try:
+        await pool.acquire(1)
+    except Shed:
+        pass
+    else:
+        raise AssertionError("full queue admitted a request")
+    pool.release(1)
+    await queued
+    pool.release(1)
+    assert pool.in_use == 0 and pool.shed_queue_full == 1, pool.stats()
+
+
+CHECKS = (release_between_deadline_and_handler, queue_full_sheds)
+
+
+def main() -> int:
+    for check in CHECKS:
+        asyncio.run(check())
+        print(f"ok  {check.__name__}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
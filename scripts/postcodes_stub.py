@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Local stand-in for the postcodes.io endpoints the API uses.
+
+Serves `GET /postcodes/<postcode>` and bulk `POST /postcodes` with
+deterministic answers: each well-formed postcode maps to a council from
+`data/processed/council_to_region_2024.csv` chosen by a hash of the postcode,
+and postcodes in the `ZZ` area do not exist. Every request is counted and
+`GET /_stats` reports the totals, so tests can check how many upstream calls
+a workload made.
+
+Run with:
+  uv run python scripts/postcodes_stub.py --port 8765
+  WYTG_POSTCODES_API=http://127.0.0.1:8765 uv run uvicorn api.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from api.postcodes import BULK_CHUNK_SIZE, normalize_postcode  # noqa: E402
+
+
+def load_councils() -> list[dict[str, str]]:
+    with (ROOT / "data" / "processed" / "council_to_region_2024.csv").open(encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def make_handler(councils: list[dict[str, str]], delay_s: float) -> type[BaseHTTPRequestHandler]:
+    stats = {"get": 0, "bulk": 0, "bulk_postcodes": 0}
+    lock = threading.Lock()
+
+    def result(query: str) -> dict[str, str] | None:
+        postcode = normalize_postcode(query)
+        if postcode is None or postcode.startswith("ZZ"):
+            return None
+        council = councils[zlib.crc32(postcode.encode("ascii")) % len(councils)]
+        code = council["lad_code"]
+        country = {"E": "England", "W": "Wales", "S": "Scotland", "N": "Northern Ireland"}[code[0]]
+        return {
+            "postcode": postcode,
+            "admin_district": council["lad_name"],
+            "region": council["region_name"] if country == "England" else None,
+            "country": country,
+        }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def _send(self, status: int, payload: object) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/_stats":
+                with lock:
+                    self._send(200, dict(stats))
+                return
+            if not self.path.startswith("/postcodes/"):
+                self._send(404, {"status": 404, "error": "Not found"})
+                return
+            with lock:
+                stats["get"] += 1
+            time.sleep(delay_s)
+            found = result(unquote(self.path[len("/postcodes/") :]))
+            if found is None:
+                self._send(404, {"status": 404, "error": "Invalid postcode"})
+            else:
+                self._send(200, {"status": 200, "result": found})
+
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path != "/postcodes":
+                self._send(404, {"status": 404, "error": "Not found"})
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"{}")
+            queries = body.get("postcodes") or []
+            if len(queries) > BULK_CHUNK_SIZE:
+                self._send(400, {"status": 400, "error": f"No more than {BULK_CHUNK_SIZE} postcodes per request"})
+                return
+            with lock:
+                stats["bulk"] += 1
+                stats["bulk_postcodes"] += len(queries)
+            time.sleep(delay_s)
+            self._send(200, {"status": 200, "result": [{"query": q, "result": result(q)} for q in queries]})
+
+        def log_message(self, *_args: object) -> None:
+            pass
+
+    return Handler
+
+
+def serve(port: int = 0, delay_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; port 0 picks a free one."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(load_councils(), delay_ms / 1000.0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="latency added to every request")
+    args = parser.parse_args()
+    server = serve(args.port, args.delay_ms)
+    print(f"postcodes.io stand-in on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Replay a request capture against the API in process.
+
+Reads an NDJSON capture written by `api/capture.py` (`WYTG_CAPTURE_PATH`)
+and sends each request straight to the ASGI app, with no server or socket in
+between. Requests go out at their captured spacing divided by `--speed`
+(open loop, so bursts in the capture stay bursts), or as fast as
+`--concurrency` allows with `--speed 0`. Reported:
+
+  throughput     requests per second over the replay
+  latency        p50 / p90 / p99 / max, overall and per route
+  status         replayed status codes, and requests whose status differs
+                 from the captured one
+  outputs        with `--baseline`, responses that differ from a saved run
+
+To check an optimization against real traffic, save the outputs of a run on
+the base revision and compare a run on the change against them:
+
+  uv run python scripts/replay_capture.py capture.ndjson --save base.ndjson
+  uv run python scripts/replay_capture.py capture.ndjson --baseline base.ndjson
+
+Captured full postcodes carry a placeholder unit ("SW1A 1ZZ"), so they take
+the same lookup path as the original request. Point `WYTG_POSTCODES_API` at
+`scripts/postcodes_stub.py` so the replay does not time the real postcodes.io,
+which answers 404 for them and leaves the API to the sector trie.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from api.main import app  # noqa: E402
+
+
+@dataclass(frozen=True, slots=True)
+class Captured:
+    offset_s: float
+    path: str
+    status: int
+    body: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class Replayed:
+    index: int
+    path: str
+    status: int
+    latency_s: float
+    output: object
+
+
+def load_capture(path: Path, limit: int | None) -> list[Captured]:
+    records = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+            if limit is not None and len(records) >= limit:
+                break
+    records.sort(key=lambda r: r["ts"])
+    start = records[0]["ts"] if records else 0.0
+    return [
+        Captured(
+            offset_s=r["ts"] - start,
+            path=r["path"],
+            status=r["status"],
+            body=json.dumps(r["body"]).encode("utf-8") if r["body"] is not None else b"",
+        )
+        for r in records
+    ]
+
+
+async def send(path: str, body: bytes) -> tuple[int, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))],
+        "client": ("127.0.0.1", 0),
+        "server": ("replay", 80),
+    }
+    delivered = False
+    status = 0
+    chunks: list[bytes] = []
+
+    async def receive() -> dict[str, object]:
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()  # Never disconnects.
+        return {"type": "http.disconnect"}
+
+    async def respond(message: dict[str, object]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, respond)
+    return status, b"".join(chunks)
+
+
+def _decode(raw: bytes) -> object:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw.decode("utf-8", "replace")
+
+
+async def replay(records: list[Captured], speed: float, concurrency: int) -> tuple[list[Replayed], float]:
+    results: list[Replayed | None] = [None] * len(records)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(index: int, record: Captured) -> None:
+        started = time.perf_counter()
+        status, raw = await send(record.path, record.body)
+        results[index] = Replayed(index, record.path, status, time.perf_counter() - started, _decode(raw))
+
+    async def bounded(index: int, record: Captured) -> None:
+        async with limit:
+            await one(index, record)
+
+    began = time.perf_counter()
+    tasks = []
+    for index, record in enumerate(records):
+        if speed > 0:
+            delay = record.offset_s / speed - (time.perf_counter() - began)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(one(index, record)))
+        else:
+            tasks.append(asyncio.ensure_future(bounded(index, record)))
+    await asyncio.gather(*tasks)
+    return [r for r in results if r is not None], time.perf_counter() - began
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def first_difference(old: object, new: object, tolerance: float, where: str = "") -> str | None:
+    """Path of the first differing value, or None when the outputs match."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(old.keys() | new.keys()):
+            if key not in old or key not in new:
+                return f"{where}.{key}"
+            found = first_difference(old[key], new[key], tolerance, f"{where}.{key}")
+            if found:
+                return found
+        return None
+    if isinstance(old, list) and isinstance(new, list):
+        if len(old) != len(new):
+            return f"{where}[len {len(old)} != {len(new)}]"
+        for i, (a, b) in enumerate(zip(old, new)):
+            found = first_difference(a, b, tolerance, f"{where}[{i}]")
+            if found:
+                return found
+        return None
+    numbers = (int, float)
+    if isinstance(old, numbers) and isinstance(new, numbers) and not isinstance(old, bool):
+        return None if abs(old - new) <= tolerance else where or "."
+    return None if old == new else where or "."
+
+
+def _latency_line(label: str, latencies: list[float]) -> str:
+    ms = sorted(v * 1000 for v in latencies)
+    return (
+        f"  {label:<24} {len(ms):>7}  p50 {percentile(ms, 0.50):8.2f}  p90 {percentile(ms, 0.90):8.2f}"
+        f"  p99 {percentile(ms, 0.99):8.2f}  max {ms[-1] if ms else 0.0:8.2f}"
+    )
+
+
+def report(records: list[Captured], results: list[Replayed], elapsed: float) -> None:
+    print(f"replayed {len(results)} requests in {elapsed:.2f}s ({len(results) / elapsed if elapsed else 0.0:.1f} req/s)")
+    if records:
+        span = records[-1].offset_s
+        print(f"captured span {span:.2f}s ({len(records) / span if span else 0.0:.1f} req/s)")
+    print("\nlatency (ms)")
+    print(_latency_line("all", [r.latency_s for r in results]))
+    by_route: dict[str, list[float]] = defaultdict(list)
+    for r in results:
+        by_route[r.path].append(r.latency_s)
+    for path in sorted(by_route):
+        print(_latency_line(path, by_route[path]))
+    statuses = Counter(r.status for r in results)
+    print("\nstatus " + ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items())))
+    mismatched = [r for r in results if r.status != records[r.index].status]
+    if mismatched:
+        print(f"{len(mismatched)} requests returned a different status than captured, e.g.")
+        for r in mismatched[:5]:
+            print(f"  #{r.index} {r.path}: captured {records[r.index].status}, replayed {r.status}")
+
+
+def compare(results: list[Replayed], baseline_path: Path, tolerance: float) -> int:
+    with baseline_path.open("r", encoding="utf-8") as f:
+        baseline = {row["index"]: row for row in map(json.loads, filter(str.strip, f))}
+    differing = []
+    for r in results:
+        base = baseline.get(r.index)
+        if base is None or base["path"] != r.path:
+            differing.append((r, "not in baseline"))
+        elif base["status"] != r.status:
+            differing.append((r, f"status {base['status']} -> {r.status}"))
+        else:
+            where = first_difference(base["output"], r.output, tolerance)
+            if where is not None:
+                differing.append((r, f"output differs at {where}"))
+    print(f"\noutputs: {len(results) - len(differing)} match {baseline_path.name}, {len(differing)} differ")
+    for r, why in differing[:10]:
+        print(f"  #{r.index} {r.path}: {why}")
+    return len(differing)
+
+
+def save(results: list[Replayed], path: Path) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({"index": r.index, "path": r.path, "status": r.status, "output": r.output}) + "\n")
+    print(f"\nsaved {len(results)} outputs to {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="NDJSON capture written with WYTG_CAPTURE_PATH")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing multiplier; 0 sends as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight requests with --speed 0")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N records")
+    parser.add_argument("--save", type=Path, default=None, help="write each response to this NDJSON file")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare responses against a --save file")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="absolute tolerance for numbers in --baseline")
+    args = parser.parse_args()
+
+    records = load_capture(args.capture, args.limit)
+    if not records:
+        print(f"{args.capture}: no records")
+        return 1
+    results, elapsed = asyncio.run(replay(records, args.speed, max(1, args.concurrency)))
+    report(records, results, elapsed)
+    if args.save is not None:
+        save(results, args.save)
+    if args.baseline is not None and compare(results, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
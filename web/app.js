@@ -139,7 +139,30 @@ const STUDENT_LOAN_PLAN = {
     postgrad: [21000.0, 0.06],
 }
 
+const SCOTTISH_INCOME_TAX = {
+    bands: [
+        [2306, 0.19],
+        [13991 - 2306, 0.2],
+        [31092 - 13991, 0.21],
+        [62943 - 31092, 0.42],
+    ],
+    top_rate: 0.47,
+}
+
+const SELF_EMPLOYED_NI = {
+    class2_gbp: 179.4,
+    lower_profits_limit: 12570,
+    upper_profits_limit: 50270,
+    main_rate: 0.06,
+    upper_rate: 0.02,
+}
+
+let MARRIAGE_ALLOWANCE_CREDIT_GBP = 252
+
+const TAX_SCHEDULE_VERSION = 1
+
 const FRONTEND_BUNDLE_PATH = "./data/frontend_bundle.json"
+const FRONTEND_MANIFEST_PATH = "./data/frontend_manifest.json"
 const postcodeCache = new Map()
 
 const THEME_KEY = "taxes_theme"
@@ -374,20 +397,14 @@ function estimateIncomeTaxScotland(annualIncome, p) {
     const taper = Math.max(0, annualIncome - 100000) / 2
     const personalAllowance = Math.max(0, p.personal_allowance - taper)
     let remaining = Math.max(0, annualIncome - personalAllowance)
-    const bands = [
-        [2306, 0.19],
-        [13991 - 2306, 0.2],
-        [31092 - 13991, 0.21],
-        [62943 - 31092, 0.42],
-    ]
     let total = 0
-    for (const [width, rate] of bands) {
+    for (const [width, rate] of SCOTTISH_INCOME_TAX.bands) {
         const take = Math.min(remaining, width)
         if (take <= 0) break
         total += take * rate
         remaining -= take
     }
-    if (remaining > 0) total += remaining * 0.47
+    if (remaining > 0) total += remaining * SCOTTISH_INCOME_TAX.top_rate
     return round2(total)
 }
 
@@ -403,9 +420,12 @@ function estimateNationalInsurance(annualIncome, p) {
 }
 
 function estimateSelfEmployedNI(annualIncome) {
-    const class2 = annualIncome >= 12570 ? 179.4 : 0
-    const class4main = Math.max(0, Math.min(annualIncome, 50270) - 12570) * 0.06
-    const class4upper = Math.max(0, annualIncome - 50270) * 0.02
+    const s = SELF_EMPLOYED_NI
+    const class2 = annualIncome >= s.lower_profits_limit ? s.class2_gbp : 0
+    const class4main =
+        Math.max(0, Math.min(annualIncome, s.upper_profits_limit) - s.lower_profits_limit) *
+        s.main_rate
+    const class4upper = Math.max(0, annualIncome - s.upper_profits_limit) * s.upper_rate
     return round2(class2 + class4main + class4upper)
 }
 
@@ -452,9 +472,13 @@ function estimateStudentLoan(annualIncome, plan) {
     return round2(Math.max(0, annualIncome - threshold) * rate)
 }
 
+const FULL_POSTCODE = /^[A-Z]{1,2}[0-9][A-Z0-9]?[0-9][A-Z]{2}$/
+
 async function lookupPostcode(postcode) {
     const p = String(postcode || "").trim()
-    if (!p) return null
+    // Partial postcodes are typed on the way to full ones; only complete
+    // postcodes are worth a network lookup.
+    if (!FULL_POSTCODE.test(p.replace(/\s+/g, "").toUpperCase())) return null
     if (postcodeCache.has(p)) return postcodeCache.get(p)
     try {
         const r = await fetch(`https://api.postcodes.io/postcodes/${encodeURIComponent(p)}`)
@@ -473,11 +497,60 @@ async function lookupPostcode(postcode) {
     }
 }
 
+async function fetchJson(path, cache) {
+    const r = await fetch(path, { cache })
+    if (!r.ok) throw new Error(`Failed to load ${path}`)
+    return r.json()
+}
+
+async function loadChunkedBundle() {
+    // Manifest is revalidated; chunk paths are content-hashed so they can be
+    // served from cache forever.
+    const manifest = await fetchJson(FRONTEND_MANIFEST_PATH, "no-cache")
+    const names = ["services", "regional", "borrowing", "population", "schedule"]
+    const [services, regional, borrowing, population, schedule] = await Promise.all(
+        names.map((name) =>
+            fetchJson(`./data/${manifest.chunks[name].path}`, "force-cache"),
+        ),
+    )
+    return {
+        meta: services.meta,
+        total_uk_revenue_m_gbp: services.total_uk_revenue_m_gbp,
+        services: services.services,
+        regional: {
+            year: regional.year,
+            population_year: population.population_year,
+            population_source_url: population.population_source_url,
+            population_by_region: population.population_by_region,
+            balances: regional.balances,
+            flows: regional.flows,
+            official_borrowing: borrowing.official_borrowing,
+        },
+        tax_schedule: schedule,
+    }
+}
+
+function applyTaxSchedule(schedule) {
+    // The bundle's schedule is exported from api/tax_model.py; the constants
+    // above are only a fallback for bundles that predate it.
+    if (!schedule || schedule.version !== TAX_SCHEDULE_VERSION) return
+    Object.assign(TAX_PARAMS_BY_YEAR, schedule.tax_parameters_by_year)
+    Object.assign(STUDENT_LOAN_PLAN, schedule.student_loan_plans)
+    Object.assign(COUNCIL_TAX_AVERAGE_BY_REGION, schedule.council_tax.average_by_region)
+    Object.assign(COUNCIL_TAX_BAND_MULTIPLIER, schedule.council_tax.band_multiplier)
+    Object.assign(SCOTTISH_INCOME_TAX, schedule.scottish_income_tax)
+    Object.assign(SELF_EMPLOYED_NI, schedule.self_employed_ni)
+    MARRIAGE_ALLOWANCE_CREDIT_GBP = schedule.marriage_allowance_credit_gbp
+}
+
 async function ensureFrontendBundle() {
     if (state.frontendBundle) return state.frontendBundle
-    const r = await fetch(FRONTEND_BUNDLE_PATH, { cache: "no-store" })
-    if (!r.ok) throw new Error(`Failed to load ${FRONTEND_BUNDLE_PATH}`)
-    state.frontendBundle = await r.json()
+    try {
+        state.frontendBundle = await loadChunkedBundle()
+    } catch {
+        state.frontendBundle = await fetchJson(FRONTEND_BUNDLE_PATH, "no-store")
+    }
+    applyTaxSchedule(state.frontendBundle.tax_schedule)
     return state.frontendBundle
 }
 
@@ -511,6 +584,7 @@ async function localTaxEstimate(req) {
 }
 
 async function localTaxEstimateCore(req) {
+    await ensureFrontendBundle()
     const p = {
         ...getTaxParams(req.tax_year || "2025-26"),
         ...(req.policy_overrides || {}),
@@ -541,7 +615,10 @@ async function localTaxEstimateCore(req) {
         const lower = Math.min(adjustedIncome, adjustedPartner)
         const higher = Math.max(adjustedIncome, adjustedPartner)
         if (lower <= p.personal_allowance && higher <= p.higher_rate_threshold) {
-            marriageCredit = Math.min(252, Math.max(primaryIncomeTax, partnerIncomeTax))
+            marriageCredit = Math.min(
+                MARRIAGE_ALLOWANCE_CREDIT_GBP,
+                Math.max(primaryIncomeTax, partnerIncomeTax),
+            )
             if (primaryIncomeTax >= partnerIncomeTax) {
                 primaryIncomeTax = round2(primaryIncomeTax - marriageCredit)
             } else {